@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark the native binary save decoder in MB/s.
+
+By default a large binary save is built by encoding the sample production block
+("SOV save file.txt") under many country tags, with a token table covering its
+field names. Pass --save (and --tokens) to time a real binary save instead.
+"""
+
+import os
+import time
+import argparse
+import tempfile
+import itertools
+import string
+from collections import deque
+
+import pyradox
+from src.utils.binary_decoder import (
+    encode_text, iter_tokens, iter_text, decode_to_text, parse_binary_file, load_token_table
+)
+
+SAMPLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "SOV save file.txt")
+
+def build_save(copies, output_dir):
+    """Write a synthetic binary save with `copies` countries and its token table; return both paths."""
+    with open(SAMPLE_PATH, 'r', encoding='utf-8') as f:
+        sample = f.read()
+
+    tags = (''.join(letters) for letters in itertools.product(string.ascii_uppercase, repeat=3))
+    text = 'date=1940.11.1.1\ncountries={\n' + ''.join(
+        f'{tag}={{\n{sample}\n}}\n' for tag in itertools.islice(tags, copies)
+    ) + '}\n'
+
+    # Give every field name a token id, as the game's own table does
+    names = sorted({token_string for token_type, token_string, _ in pyradox.filetype.txt.lex_iter(sample.splitlines(), SAMPLE_PATH)
+                    if token_type == 'str' and not token_string.startswith('"')} | {'date', 'countries'})
+    tokens = {0x2000 + i: name for i, name in enumerate(names)}
+
+    tokens_path = os.path.join(output_dir, "tokens.txt")
+    with open(tokens_path, 'w', encoding='utf-8') as f:
+        f.writelines(f"0x{token_id:04x} {name}\n" for token_id, name in tokens.items())
+    save_path = os.path.join(output_dir, "synthetic.hoi4")
+    with open(save_path, 'wb') as f:
+        f.write(encode_text(text, tokens))
+    return save_path, tokens_path
+
+def timed(label, func, size, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<28} {best * 1000:10.1f} ms {size / (1024 * 1024) / best:8.1f} MB/s")
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the native binary save decoder")
+    parser.add_argument("--save", help="Existing binary save to decode")
+    parser.add_argument("--tokens", help="Token table for --save (default: HOI4_TOKENS or hoi4_tokens.txt)")
+    parser.add_argument("--copies", type=int, default=100, help="Number of countries in the synthetic save")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of runs per measurement (best is reported)")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="hoi4_bench_")
+    save_path, tokens_path = args.save, args.tokens
+    if not save_path:
+        print(f"Building synthetic binary save with {args.copies} countries...")
+        save_path, tokens_path = build_save(args.copies, work_dir)
+    tokens = load_token_table(tokens_path)
+
+    size = os.path.getsize(save_path)
+    print(f"Save: {save_path} ({size / (1024 * 1024):.1f} MB, {len(tokens)} tokens)")
+    with open(save_path, 'rb') as f:
+        data = f.read()
+
+    timed("tokens only", lambda: deque(iter_tokens(data, tokens), maxlen=0), size, args.repeat)
+    timed("tokens + text formatting", lambda: deque(iter_text(iter_tokens(data, tokens)), maxlen=0), size, args.repeat)
+    output_path = os.path.join(work_dir, "melted.txt")
+    timed("decode_to_text (file)", lambda: decode_to_text(save_path, output_path, tokens), size, args.repeat)
+    timed("parse_binary_file (Tree)", lambda: parse_binary_file(save_path, tokens), size, args.repeat)
+
+if __name__ == "__main__":
+    main()
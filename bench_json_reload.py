@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark reloading a JSON export: regex date conversion vs. the type sidecar.
+
+By default a large export is built by repeating the sample production block
+("SOV save file.txt") plus a block of unquoted dates under many country tags. Pass --export to time an existing
+export written by read_with_pyradox.save_to_json instead.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import itertools
+import string
+
+import pyradox
+from read_with_pyradox import save_to_json, get_types_path, convert_dates, TYPES_VERSION
+
+SAMPLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "SOV save file.txt")
+
+def build_export(copies, output_path):
+    """Write a synthetic export with `copies` countries and return its path."""
+    with open(SAMPLE_PATH, 'r', encoding='utf-8') as f:
+        sample = pyradox.parse(f.read(), SAMPLE_PATH)
+
+    # The sample only has quoted dates, so add unquoted ones as found elsewhere in real saves
+    flags = pyradox.Tree()
+    for i in range(50):
+        flags.append(f"flag_{i}", pyradox.Time(1936 + i % 10, 1 + i % 12, 1 + i % 28, 1 + i % 24))
+    country = pyradox.Tree(sample)
+    country.append('flags', flags)
+
+    countries = pyradox.Tree()
+    tags = (''.join(letters) for letters in itertools.product(string.ascii_uppercase, repeat=3))
+    for tag in itertools.islice(tags, copies):
+        countries.append(tag, country)
+
+    save = pyradox.Tree()
+    save.append('date', pyradox.Time('1940.11.1.1'))
+    save.append('countries', countries)
+
+    save_to_json(save, output_path)
+    return output_path
+
+def timed(label, func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<32} {best * 1000:10.1f} ms")
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark typed JSON reload against regex date conversion")
+    parser.add_argument("--export", help="Existing JSON export with a type sidecar")
+    parser.add_argument("--copies", type=int, default=200, help="Number of countries in the synthetic export")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of runs per measurement (best is reported)")
+    args = parser.parse_args()
+
+    export_path = args.export
+    if not export_path:
+        export_path = os.path.join(tempfile.mkdtemp(prefix="hoi4_bench_"), "export.json")
+        print(f"Building synthetic export with {args.copies} countries...")
+        build_export(args.copies, export_path)
+
+    types_path = get_types_path(export_path)
+    if not os.path.exists(types_path):
+        print(f"No type sidecar found at {types_path}")
+        sys.exit(1)
+    with open(types_path, 'r', encoding='utf-8') as f:
+        sidecar = json.load(f)
+    if sidecar.get('version') != TYPES_VERSION:
+        print(f"Unsupported type sidecar version: {sidecar.get('version')}")
+        sys.exit(1)
+    types = sidecar['types']
+
+    print(f"Export: {export_path} ({os.path.getsize(export_path) / (1024 * 1024):.1f} MB, "
+          f"sidecar {os.path.getsize(types_path)} bytes)")
+
+    def load():
+        with open(export_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    load_time = timed("json.load only", load, args.repeat)
+
+    # Time the conversion step on freshly loaded data each run
+    def convert_with(func):
+        data = load()
+        start = time.perf_counter()
+        func(data)
+        return time.perf_counter() - start
+
+    results = {}
+    for label, func in [
+        ("regex convert_dates", convert_dates),
+        ("sidecar apply_types", lambda data: pyradox.json.apply_types(data, types)),
+        ("sidecar lazy (wrap only)", lambda data: pyradox.json.LazyTimeDict(data, types)),
+    ]:
+        best = min(convert_with(func) for _ in range(args.repeat))
+        results[label] = best
+        print(f"{label:<32} {best * 1000:10.1f} ms (+ {load_time * 1000:.1f} ms load)")
+
+    speedup = results["regex convert_dates"] / max(results["sidecar apply_types"], 1e-9)
+    print(f"\nSidecar conversion is {speedup:.1f}x faster than the regex walk")
+
+if __name__ == "__main__":
+    main()
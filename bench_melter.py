@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark batch melting through the melter backends, offline.
+
+A synthetic binary save (see bench_binary_decoder.py) is copied a number of
+times and melted with iter_melt_files at several pool sizes. The fixture
+backend stands in for melt.exe: it writes the save's melted text after
+sleeping as long as a melter of --melt-speed MB/s would take, so pool
+scaling can be measured without Windows or melt.exe. Pass --melt-path to
+also time a real melter executable.
+"""
+
+import os
+import time
+import shutil
+import argparse
+import tempfile
+
+from bench_binary_decoder import build_save
+from src.utils.binary_decoder import decode_to_text, load_token_table
+from src.utils.melt_backends import DecoderBackend, ExecutableBackend, FixtureBackend
+from src.utils.melter import iter_melt_files, summarize_melt_results
+
+def run_batch(label, backend, file_paths, output_dir, jobs, compression):
+    shutil.rmtree(output_dir, ignore_errors=True)
+    os.makedirs(output_dir)
+    start = time.perf_counter()
+    results = list(iter_melt_files(file_paths, output_dir, jobs, compression, backend))
+    summary = summarize_melt_results(results, time.perf_counter() - start)
+    stages = " ".join(f"{stage}={seconds:.2f}s" for stage, seconds in summary['stages'].items())
+    print(f"{label:<22} jobs={jobs:<3} {summary['elapsed']:7.2f} s {summary['mb_per_second']:8.1f} MB/s "
+          f"{summary['worker_seconds'] / summary['elapsed']:5.1f}x  failed={summary['failed']}  {stages}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batch melting through the melter backends")
+    parser.add_argument("--files", type=int, default=8, help="Number of saves in the batch")
+    parser.add_argument("--copies", type=int, default=30, help="Number of countries in each synthetic save")
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1, 2, 4, 8], help="Pool sizes to time")
+    parser.add_argument("--melt-speed", type=float, default=20.0,
+                        help="Simulated speed of the stand-in melter in MB/s of input")
+    parser.add_argument("--melt-path", help="Also time this melter executable")
+    parser.add_argument("--compress", choices=["gzip", "lzma", "zstd"], help="Compress the melted files")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="hoi4_bench_")
+    save_path, tokens_path = build_save(args.copies, work_dir)
+    file_paths = []
+    for i in range(args.files):
+        file_paths.append(os.path.join(work_dir, f"autosave_{i}.hoi4"))
+        shutil.copyfile(save_path, file_paths[-1])
+    fixture_path = decode_to_text(save_path, os.path.join(work_dir, "fixture.txt"), load_token_table(tokens_path))
+    size = os.path.getsize(save_path)
+    print(f"{args.files} saves of {size / (1024 * 1024):.1f} MB, {os.cpu_count()} cores")
+
+    backends = [
+        (f"fixture @{args.melt_speed:g} MB/s", FixtureBackend(fixture_path, args.melt_speed)),
+        ("decoder", DecoderBackend(load_token_table(tokens_path))),
+    ]
+    if args.melt_path:
+        backends.append(("executable", ExecutableBackend(args.melt_path)))
+
+    output_dir = os.path.join(work_dir, "melted")
+    for label, backend in backends:
+        for jobs in args.jobs:
+            run_batch(label, backend, file_paths, output_dir, jobs, args.compress)
+    shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
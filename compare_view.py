@@ -1,18 +1,32 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import os
-import json
-from src.utils.melter import melt_save_file, is_binary_file, ensure_melted_saves_dir
-from read_with_pyradox import load_save_file, save_to_json
+import numpy as np
+from src.utils.comparison import OrgTimeSeries
+from src.utils.equipment_index import EquipmentIndex, save_equipment_index
+from src.utils.localisation import equipment_localisation
+from src.utils.save_sections import SectionsResult, iter_load_sections
+from src.utils.save_store import SaveStore
+from store_dialog import ask_stored_saves
+from virtual_table import VirtualTable
+import pyradox
 import threading
-import time
 import hashlib
 
 class CompareView:
+    # Saves shown side by side in the industrial organizations table; the others are a page away
+    SAVES_PER_PAGE = 12
+    # Choices of the industrial organizations table: label -> OrgTimeSeries metric or mode
+    SERIES_METRICS = {"Units": "units", "Funds": "funds", "Size": "size", "Units by equipment": OrgTimeSeries.EQUIPMENT}
+    SERIES_MODES = {"Value": "value", "Change": "change", "Per day": "rate"}
+    
     def __init__(self, parent, notebook):
         self.parent = parent
         self.notebook = notebook
-        self.loaded_files = {}  # {file_id: {'path': path, 'data': data, 'name': display_name}}
+        self.loaded_files = {}  # {file_id: {'path': path, 'data': data, 'name': display_name, 'equipment': EquipmentIndex, 'fingerprint': content hash}}
+        # Paths of loaded and loading files, and content hashes of loaded saves, for skipping files loaded twice
+        self.loaded_paths = set()
+        self.loaded_fingerprints = set()
         self.file_counter = 0
         self.cache_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache')
         
@@ -36,6 +50,7 @@ class CompareView:
         btn_frame.pack(fill="x", pady=5)
         
         ttk.Button(btn_frame, text="Add File", command=self.add_file).pack(side="left", padx=5)
+        ttk.Button(btn_frame, text="Add From Store", command=self.add_from_store).pack(side="left", padx=5)
         ttk.Button(btn_frame, text="Remove Selected", command=self.remove_selected_file).pack(side="left", padx=5)
         ttk.Button(btn_frame, text="Compare", command=self.compare_files).pack(side="left", padx=5)
         
@@ -86,131 +101,105 @@ class CompareView:
         if not file_paths:
             return
         
-        # Start a thread to process all files
-        threading.Thread(target=self._process_multiple_files, args=(file_paths,), daemon=True).start()
+        # Files already loaded or still loading are skipped by path; copies of a loaded save by content, once read
+        new_paths = []
+        for file_path in dict.fromkeys(file_paths):
+            key = self.path_key(file_path)
+            if key not in self.loaded_paths:
+                self.loaded_paths.add(key)
+                new_paths.append(file_path)
+        skipped = len(file_paths) - len(new_paths)
+        if not new_paths:
+            self.progress_label.config(text=f"Skipped {skipped} already loaded files")
+            return
+        
+        # Start a thread to load all files in a worker pool
+        threading.Thread(target=self._process_multiple_files, args=(new_paths, skipped), daemon=True).start()
+    
+    def add_from_store(self):
+        """Add saves from the SQLite save store without re-reading the save files"""
+        saves = ask_stored_saves(self.parent.root)
+        if not saves:
+            return
+        
+        with SaveStore() as store:
+            for save in saves:
+                data = store.build_compare_data(save['id'])
+                equipment_index = EquipmentIndex.from_equipments(data.get('equipments', {}), equipment_localisation())
+                self._finalize_file_load_ui(save['path'], data, notify=False, equipment_index=equipment_index)
+        
+        self.progress_label.config(text=f"Loaded {len(saves)} saves from the store")
     
-    def _process_multiple_files(self, file_paths):
-        """Process multiple files in the background"""
+    def _process_multiple_files(self, file_paths, skipped=0):
+        """Load files in a bounded worker pool, adding each to the list as soon as it is ready"""
         total_files = len(file_paths)
-        for i, file_path in enumerate(file_paths):
-            # Check if the file is already loaded
-            skip_file = False
-            for file_info in self.loaded_files.values():
-                if file_info['path'] == file_path:
-                    self.update_progress(
-                        (i / total_files) * 100, 
-                        f"Skipping already loaded file ({i+1}/{total_files}): {os.path.basename(file_path)}"
-                    )
-                    skip_file = True
-                    break
-            
-            if skip_file:
-                time.sleep(0.5)  # Brief pause to show skipped message
+        # Filled in by the UI thread as files are added, read when the batch finishes
+        batch = {'loaded': 0, 'copies': [], 'failed': []}
+        self.update_progress(0, f"Loading {total_files} files...")
+        
+        tasks = []
+        for file_path in file_paths:
+            try:
+                # JSON exports are read as they are, saves through their sections cache
+                cache_path = None if file_path.lower().endswith('.json') else self.get_cache_path(file_path)
+            except OSError as e:
+                self.parent.root.after(0, lambda file_path=file_path, error=str(e): self._add_loaded_file(
+                    batch, SectionsResult(file_path, None, None, False, 0.0, error)))
                 continue
-            
-            # Update progress
-            self.update_progress(
-                (i / total_files) * 100, 
-                f"Processing file {i+1}/{total_files}: {os.path.basename(file_path)}"
-            )
-            
-            # Check if JSON or needs to be parsed
-            if file_path.lower().endswith('.json'):
-                self._load_json_file(file_path, i+1, total_files)
-            else:
-                self._load_hoi4_save(file_path, i+1, total_files)
-        
-        # Final update
-        self.update_progress(100, f"Completed loading {total_files} files")
-        time.sleep(1)  # Show completion message briefly
-        self.update_progress(0, "Ready")
-    
-    def _load_hoi4_save(self, file_path, current_file=1, total_files=1):
-        """Load and process a HOI4 save file with progress reporting"""
+            tasks.append((file_path, cache_path))
+        cache_paths = dict(tasks)
+        
+        done = total_files - len(tasks)
         try:
-            file_name = os.path.basename(file_path)
-            # Update UI
-            self.update_progress(0, f"Processing {file_name} ({current_file}/{total_files})...")
-            
-            # Check if we already have a cached version of this file
-            cache_path = self.check_cache(file_path)
-            if cache_path:
-                self.update_progress(30, f"Loading {file_name} from cache...")
-                with open(cache_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                self.update_progress(100, f"Loaded {file_name} from cache")
-                time.sleep(0.5)  # Brief pause to show completion
-                self.finalize_file_load(file_path, data)
-                return
-                
-            # No cache, process the file
-            self.update_progress(10, f"Checking file type for {file_name}...")
-            
-            # Check if file is binary and melt if necessary
-            if is_binary_file(file_path):
-                self.update_progress(20, f"Melting binary file {file_name}...")
-                melted_saves_dir = ensure_melted_saves_dir()
-                output_path = os.path.join(melted_saves_dir, os.path.basename(file_path) + ".txt")
-                success, melted_path = melt_save_file(file_path, output_path)
-                if not success:
-                    self.show_error(f"Failed to melt the binary file: {file_name}")
-                    return
-                file_path = melted_path
-                
-            # Define a progress callback
-            def progress_callback(percent, message):
-                # Scale the progress to fit within the overall progress (30% to 80%)
-                overall = 30 + (percent * 0.5)
-                self.update_progress(overall, f"{message} - {file_name} ({current_file}/{total_files})")
-            
-            # Parse the save file
-            self.update_progress(30, f"Parsing {file_name}...")
-            save_data = load_save_file(file_path, callback=progress_callback)
-            
-            # Convert pyradox Tree to dictionary
-            self.update_progress(80, f"Converting data for {file_name}...")
-            data = {}
-            for key, value in save_data.items():
-                if hasattr(value, 'to_python'):
-                    data[key] = value.to_python()
-                else:
-                    data[key] = value
-            
-            # Save to cache
-            self.update_progress(90, f"Saving {file_name} to cache...")
-            cache_path = self.get_cache_path(file_path)
-            with open(cache_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f)
-            
-            self.update_progress(100, f"Completed processing {file_name}")
-            time.sleep(0.5)  # Brief pause to show completion
-            
-            # Finalize loading
-            self.finalize_file_load(file_path, data)
-            
+            for result in iter_load_sections(tasks, self.parent.melt_cache.cache_dir):
+                done += 1
+                cache_path = cache_paths.pop(result.file_path)
+                equipment_index = None
+                if result.error is None:
+                    # Built once per save and stored next to its cache entry
+                    equipment_index = save_equipment_index(cache_path, result.data.get("equipments", {}),
+                                                           equipment_localisation())
+                self.update_progress(done / total_files * 100,
+                                     f"Read {done}/{total_files} files ({os.path.basename(result.file_path)})")
+                self.parent.root.after(0, lambda result=result, equipment_index=equipment_index:
+                                       self._add_loaded_file(batch, result, equipment_index))
         except Exception as e:
-            self.show_error(f"Failed to load file {os.path.basename(file_path)}: {str(e)}")
+            # The files the pool didn't return are reported as failed
+            for file_path in cache_paths:
+                self.parent.root.after(0, lambda file_path=file_path, error=str(e): self._add_loaded_file(
+                    batch, SectionsResult(file_path, None, None, False, 0.0, error)))
+        
+        self.parent.root.after(0, lambda: self._finish_loading(batch, total_files, skipped))
     
-    def _load_json_file(self, file_path, current_file=1, total_files=1):
-        """Load a JSON file for comparison"""
-        try:
-            file_name = os.path.basename(file_path)
-            self.update_progress(0, f"Loading {file_name} ({current_file}/{total_files})...")
-            
-            with open(file_path, 'r', encoding='utf-8') as f:
-                self.update_progress(50, f"Parsing JSON for {file_name}...")
-                data = json.load(f)
-            
-            self.update_progress(100, f"Completed loading {file_name}")
-            time.sleep(0.5)  # Brief pause to show completion
-            
-            # Finalize loading
-            self.finalize_file_load(file_path, data)
-            
-        except Exception as e:
-            self.show_error(f"Failed to load JSON file {os.path.basename(file_path)}: {str(e)}")
-            self.update_progress(0, "Ready")
+    def _add_loaded_file(self, batch, result, equipment_index=None):
+        """Add one loaded file to the list, unless it failed or is a copy of a loaded save (UI thread)"""
+        if result.error is not None:
+            self.loaded_paths.discard(self.path_key(result.file_path))
+            batch['failed'].append(f"{os.path.basename(result.file_path)}: {result.error}")
+            return
+        if result.fingerprint in self.loaded_fingerprints:
+            self.loaded_paths.discard(self.path_key(result.file_path))
+            batch['copies'].append(os.path.basename(result.file_path))
+            return
+        batch['loaded'] += 1
+        self._finalize_file_load_ui(result.file_path, result.data, notify=False, equipment_index=equipment_index,
+                                    fingerprint=result.fingerprint)
+    
+    def _finish_loading(self, batch, total_files, skipped):
+        """Report a finished batch (UI thread)"""
+        summary = f"Loaded {batch['loaded']} of {total_files} files"
+        if skipped:
+            summary += f", skipped {skipped} already loaded"
+        if batch['copies']:
+            summary += f", skipped {len(batch['copies'])} copies of loaded saves ({', '.join(batch['copies'])})"
+        self.progress_var.set(0)
+        self.progress_label.config(text=summary)
+        if batch['failed']:
+            self.show_error("Failed to load:\n" + "\n".join(batch['failed']))
+    
+    def path_key(self, file_path):
+        """Key of a file path for spotting files that are already loaded"""
+        return os.path.normcase(os.path.abspath(file_path))
     
     def get_cache_path(self, file_path):
         """Generate a cache file path based on the input file's path and modification time"""
@@ -218,13 +207,6 @@ class CompareView:
         file_hash = hashlib.md5((file_path + str(file_stat.st_mtime)).encode()).hexdigest()
         return os.path.join(self.cache_dir, file_hash + '.json')
     
-    def check_cache(self, file_path):
-        """Check if a valid cached version exists for the file"""
-        cache_path = self.get_cache_path(file_path)
-        if os.path.exists(cache_path):
-            return cache_path
-        return None
-    
     def update_progress(self, value, text):
         """Update the progress bar and label (thread-safe)"""
         self.parent.root.after(0, lambda: self._update_progress_ui(value, text))
@@ -243,11 +225,7 @@ class CompareView:
         """Show info message (thread-safe)"""
         self.parent.root.after(0, lambda: messagebox.showinfo("Info", message))
     
-    def finalize_file_load(self, file_path, data):
-        """Add loaded file data to the UI (thread-safe)"""
-        self.parent.root.after(0, lambda: self._finalize_file_load_ui(file_path, data))
-    
-    def _finalize_file_load_ui(self, file_path, data):
+    def _finalize_file_load_ui(self, file_path, data, notify=True, equipment_index=None, fingerprint=None):
         """Finalize file loading in the UI thread"""
         # Add to loaded files
         file_id = self.file_counter
@@ -256,8 +234,13 @@ class CompareView:
         self.loaded_files[file_id] = {
             'path': file_path,
             'data': data,
-            'name': display_name
+            'name': display_name,
+            'equipment': equipment_index or EquipmentIndex.from_equipments(data.get('equipments', {}), equipment_localisation()),
+            'fingerprint': fingerprint
         }
+        self.loaded_paths.add(self.path_key(file_path))
+        if fingerprint is not None:
+            self.loaded_fingerprints.add(fingerprint)
         
         # Add to listbox
         self.files_listbox.insert(tk.END, display_name)
@@ -267,7 +250,8 @@ class CompareView:
         self.progress_label.config(text=f"Successfully loaded {display_name}")
         
         # Notify user
-        self.show_info(f"File loaded: {display_name}")
+        if notify:
+            self.show_info(f"File loaded: {display_name}")
     
     def remove_selected_file(self):
         """Remove selected files from the comparison"""
@@ -279,7 +263,9 @@ class CompareView:
         # Remove from end to beginning to avoid index issues
         for i in sorted(selected_indices, reverse=True):
             file_id = list(self.loaded_files.keys())[i]
-            del self.loaded_files[file_id]
+            file_info = self.loaded_files.pop(file_id)
+            self.loaded_paths.discard(self.path_key(file_info['path']))
+            self.loaded_fingerprints.discard(file_info['fingerprint'])
             self.files_listbox.delete(i)
         
         messagebox.showinfo("Success", "Selected files removed")
@@ -303,135 +289,149 @@ class CompareView:
         
         # Create tab for industrial organizations comparison
         self.compare_industrial_orgs(selected_files)
+        self.show_org_changes(selected_files)
     
     def compare_industrial_orgs(self, selected_files):
-        """Compare industrial organizations between files"""
+        """Compare industrial organizations across the selected files, aligned into one time series"""
         # Create a tab for this comparison
         orgs_frame = ttk.Frame(self.results_notebook)
         self.results_notebook.add(orgs_frame, text="Industrial Organizations")
         
-        # Create a treeview for the comparison
-        columns = ["Organization", "Country"]
-        for file_id, file_info in selected_files.items():
-            columns.append(f"File: {file_info['name']}")
-        
-        tree = ttk.Treeview(orgs_frame, columns=columns, show="headings")
-        for col in columns:
-            tree.heading(col, text=col)
-            tree.column(col, width=100)
-        
-        scrollbar = ttk.Scrollbar(orgs_frame, orient="vertical", command=tree.yview)
-        tree.configure(yscrollcommand=scrollbar.set)
-        
-        tree.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
+        # Only the numbers of each file go into the series (see src/utils/comparison.py)
+        files = list(selected_files.values())
+        self.series = OrgTimeSeries((file_info['name'], file_info['data'].get('date'),
+                                     self.get_industrial_orgs(file_info['data'])) for file_info in files)
+        self.series_files = [files[source] for source in self.series.sources]
+        self.series_page = 0
+        
+        # Equipment is named from the last save that has it
+        self.series_equipment_names = {
+            "orgs": [self.get_equipment_name(self.series_files[latest[0]], latest[1], latest[2]) if latest else ""
+                     for latest in self.series.latest_equipment],
+            OrgTimeSeries.EQUIPMENT: [
+                self.get_equipment_name(self.series_files[column], equipment_id, equipment_type)
+                for column, (_, equipment_id, equipment_type) in zip(self.series.last_seen[OrgTimeSeries.EQUIPMENT],
+                                                                     self.series.equipment)
+            ],
+        }
         
-        # Extract and compare organizations data
-        all_orgs = {}  # {(org_name, country): {file_id: {unit_count, equipment_details}}}
-        
-        for file_id, file_info in selected_files.items():
-            countries = file_info['data'].get('countries', {})
-            
-            for country_code, country_data in countries.items():
-                if not isinstance(country_data, dict):
-                    continue
-                
-                production = country_data.get('production', {})
-                organizations = production.get('industrial_organisations', {})
-                
-                if not organizations:
-                    continue
-                
-                for org_name, org_data in organizations.items():
-                    if not isinstance(org_data, dict):
-                        continue
-                    
-                    # Get the latest entry in history for this organization
-                    history = org_data.get('history', [])
-                    if not isinstance(history, list) or not history:
-                        continue
-                    
-                    # Sort history by date if possible
-                    try:
-                        history = sorted(history, key=lambda x: x.get('data', {}).get('date', ''), reverse=True)
-                    except Exception:
-                        pass
-                    
-                    latest_entry = history[0]
-                    equipment = latest_entry.get('equipment', {})
-                    data = latest_entry.get('data', {})
-                    
-                    equipment_id = equipment.get('id')
-                    equipment_type = equipment.get('type')
-                    equipment_name = self.get_equipment_name(file_info['data'], equipment_id, equipment_type)
-                    
-                    org_key = (org_name, country_code)
-                    if org_key not in all_orgs:
-                        all_orgs[org_key] = {}
-                    
-                    all_orgs[org_key][file_id] = {
-                        'units': data.get('units', 0),
-                        'equipment': equipment_name,
-                        'date': data.get('date', '---')
-                    }
-        
-        # Populate the treeview
-        for (org_name, country_code), file_data in all_orgs.items():
-            row_values = [org_name, country_code]
-            
-            for file_id, file_info in selected_files.items():
-                if file_id in file_data:
-                    org_info = file_data[file_id]
-                    row_values.append(f"{org_info['units']} {org_info['equipment']}")
-                else:
-                    row_values.append("N/A")
-            
-            tree.insert("", "end", values=row_values)
+        # Metric, mode and page of saves
+        controls = ttk.Frame(orgs_frame)
+        controls.pack(fill="x", pady=5)
+        ttk.Label(controls, text="Metric:").pack(side="left", padx=5)
+        self.series_metric_var = tk.StringVar(value=next(iter(self.SERIES_METRICS)))
+        metric_box = ttk.Combobox(controls, textvariable=self.series_metric_var, values=list(self.SERIES_METRICS),
+                                  state="readonly", width=18)
+        metric_box.pack(side="left", padx=5)
+        ttk.Label(controls, text="Show:").pack(side="left", padx=5)
+        self.series_mode_var = tk.StringVar(value=next(iter(self.SERIES_MODES)))
+        mode_box = ttk.Combobox(controls, textvariable=self.series_mode_var, values=list(self.SERIES_MODES),
+                                state="readonly", width=10)
+        mode_box.pack(side="left", padx=5)
+        for box in (metric_box, mode_box):
+            box.bind("<<ComboboxSelected>>", lambda event: self.show_series_page(self.series_page))
+        ttk.Button(controls, text=">", width=3,
+                   command=lambda: self.show_series_page(self.series_page + 1)).pack(side="right", padx=5)
+        self.series_page_label = ttk.Label(controls)
+        self.series_page_label.pack(side="right", padx=5)
+        ttk.Button(controls, text="<", width=3,
+                   command=lambda: self.show_series_page(self.series_page - 1)).pack(side="right", padx=5)
+        
+        # One column per save of a page; their headings change with the page
+        columns = ["Organization", "Country", "Equipment"] + [f"save{index}" for index in range(self.SAVES_PER_PAGE)]
+        self.series_table = VirtualTable(orgs_frame, columns=columns)
+        self.series_table.pack(fill="both", expand=True)
+        self.show_series_page(0)
     
-    def get_equipment_name(self, save_data, equipment_id, equipment_type):
-        """Convert equipment ID and type to its name"""
-        equipment_data = save_data.get("equipments", {})
-        
-        # Build equipment name map
-        equipment_name_map = {}
-        if equipment_data:
-            for name, items in equipment_data.items():
-                if isinstance(items, dict):
-                    # Handle direct equipment entries
-                    if "id" in items and isinstance(items["id"], dict):
-                        item_id = items["id"].get("id")
-                        item_type = items["id"].get("type")
-                        if item_id is not None and item_type is not None:
-                            equipment_name_map[(item_id, item_type)] = name
-                elif isinstance(items, list):
-                    # Handle list of equipment entries
-                    for item in items:
-                        if isinstance(item, dict):
-                            item_id = item.get("id", {}).get("id")
-                            item_type = item.get("id", {}).get("type")
-                            if item_id is not None and item_type is not None:
-                                equipment_name_map[(item_id, item_type)] = name
-        
-        # Try to find the name in the map
-        name = equipment_name_map.get((equipment_id, equipment_type))
-        if name:
-            return name
+    def show_series_page(self, page):
+        """Fill the time series table with one page of saves of the chosen metric and mode"""
+        series = self.series
+        page_count = max(1, -(-len(series.labels) // self.SAVES_PER_PAGE))
+        self.series_page = max(0, min(page, page_count - 1))
+        start = self.series_page * self.SAVES_PER_PAGE
+        stop = min(start + self.SAVES_PER_PAGE, len(series.labels))
+        metric = self.SERIES_METRICS[self.series_metric_var.get()]
+        mode = self.SERIES_MODES[self.series_mode_var.get()]
+        
+        # Only the page's cells become table values: whole numbers as ints, the rest rounded
+        values = series.matrix(metric, mode)[:, start:stop]
+        missing = np.isnan(values)
+        if metric != "funds" and mode != "rate":
+            cells = np.where(missing, 0, values).astype(np.int64).astype(object)
         else:
-            # Try to find the equipment directly in the equipment_data
-            for key, value in equipment_data.items():
-                if isinstance(value, dict) and "id" in value:
-                    if value["id"].get("id") == equipment_id and value["id"].get("type") == equipment_type:
-                        name = key
-                        break
-                elif isinstance(value, list):
-                    for item in value:
-                        if isinstance(item, dict) and "id" in item:
-                            if item["id"].get("id") == equipment_id and item["id"].get("type") == equipment_type:
-                                name = key
-                                break
-                        if name:
-                            break
-                if name:
-                    break
+            cells = values.round(2).astype(object)
+        cells[missing] = None
         
+        if metric == OrgTimeSeries.EQUIPMENT:
+            names = self.series_equipment_names[OrgTimeSeries.EQUIPMENT]
+            keys = [org for org, _, _ in series.equipment]
+        else:
+            names = self.series_equipment_names["orgs"]
+            keys = series.orgs
+        # The last page may have fewer saves than columns
+        padding = [None] * (self.SAVES_PER_PAGE - (stop - start))
+        rows = [[org_name, country_code, name] + row_cells + padding
+                for (country_code, org_name), name, row_cells in zip(keys, names, cells.tolist())]
+        
+        table = self.series_table
+        for index in range(self.SAVES_PER_PAGE):
+            table.headings[3 + index] = series.labels[start + index] if start + index < stop else ""
+        table.clear()
+        table.model.extend(rows)
+        table.refresh()
+        self.series_page_label.config(
+            text=f"Saves {start + 1}-{stop} of {len(series.labels)} (page {self.series_page + 1}/{page_count})")
+    
+    def get_industrial_orgs(self, save_data):
+        """Get the industrial organizations of each country as {country_code: {org_name: org_data}}"""
+        result = {}
+        for country_code, country_data in save_data.get('countries', {}).items():
+            if not isinstance(country_data, dict):
+                continue
+            production = country_data.get('production', {})
+            organizations = production.get('industrial_organisations', {}) if isinstance(production, dict) else {}
+            if organizations:
+                result[country_code] = organizations
+        return result
+    
+    def show_org_changes(self, selected_files):
+        """Show what changed in industrial organizations between consecutive selected files"""
+        changes_frame = ttk.Frame(self.results_notebook)
+        self.results_notebook.add(changes_frame, text="Changes")
+        
+        columns = ["From", "To", "Country", "Organization", "Change", "Field", "Old", "New"]
+        table = VirtualTable(changes_frame, columns=columns)
+        table.pack(fill="both", expand=True)
+        
+        rows = []
+        files = list(selected_files.values())
+        for before, after in zip(files, files[1:]):
+            # History entries are matched by equipment, organizations and traits by their id
+            changes = pyradox.diff.diff(self.get_industrial_orgs(before['data']),
+                                        self.get_industrial_orgs(after['data']),
+                                        identity_keys=('equipment', 'id', 'trait'))
+            for change in changes:
+                country_code = change.path[0]
+                org_name = change.path[1] if len(change.path) > 1 else ""
+                field = "/".join(str(part) for part in change.path[2:])
+                rows.append([
+                    before['name'], after['name'], country_code, org_name, change.kind, field,
+                    self.describe_value(change.old), self.describe_value(change.new)
+                ])
+        table.model.extend(rows)
+        table.refresh()
+    
+    def describe_value(self, value):
+        """Short text for a value shown in the changes table"""
+        if value is None:
+            return ""
+        if isinstance(value, dict):
+            return "{ " + " ".join(f"{key}={self.describe_value(item)}" for key, item in value.items()) + " }"
+        if isinstance(value, list):
+            return ", ".join(self.describe_value(item) for item in value)
+        return str(value)
+    
+    def get_equipment_name(self, file_info, equipment_id, equipment_type):
+        """Convert equipment ID and type to its localised name, using the file's equipment index"""
+        name = file_info['equipment'].display_name(equipment_id, equipment_type)
         return name or f"Unknown ({equipment_id}, {equipment_type})" 
\ No newline at end of file
@@ -1,33 +1,19 @@
-import re
 import sys
+from src.utils.compression import open_text
+# The pattern and the index are shared with the extractor pipeline and engine of the MIO reader
+from src.utils.extractors import find_equipment_mappings_in_text
+from src.utils.equipment_index import EquipmentIndex
 
 def find_equipment_mappings(file_path) -> dict[str, tuple[int, int]]:
-    # Pattern for text_text={ followed by nested id structure with type=70
-    pattern = r'([a-zA-Z0-9_]+)=\{\s*id=\{\s*id=(\d+)\s*type=70\s*\}'
-    equipment_mappings = {}
-    
     try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
-            content = file.read()
-            matches = re.finditer(pattern, content)
-            
-            for match in matches:
-                prefix = match.group(1)  # The text_text part
-                # Skip if prefix is exactly 'equipment'
-                if prefix == 'equipment':
-                    continue
-                    
-                id_num = match.group(2)  # The inner id number
-                print(f"Found: {prefix}={{\n\tid={{\n\t\tid={id_num}\n\t\ttype=70\n\t}}\n}}")
-
-                equipment_mappings[prefix] = (int(id_num), 70)
-                
+        with open_text(file_path, encoding='utf-8', errors='ignore') as file:
+            return find_equipment_mappings_in_text(file.read())
     except FileNotFoundError:
         print(f"Error: File '{file_path}' not found")
     except Exception as e:
         print(f"Error: {str(e)}")
 
-    return equipment_mappings
+    return {}
 
 if __name__ == "__main__":
     if len(sys.argv) != 2:
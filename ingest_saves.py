@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+HOI4 Save Ingestion - CLI Tool
+Extracts countries, industrial organisations, history and equipment from
+save files into a local SQLite database for cross-save queries.
+"""
+
+import os
+import json
+import argparse
+import multiprocessing
+from src.utils.save_extract import extract_save, file_content_hash
+from src.utils.save_store import SaveStore, default_db_path
+from src.utils.save_files import expand_paths
+from src.utils.save_watcher import SaveWatcher, DEFAULT_PATTERN
+
+def print_rows(rows):
+    """Print query rows as aligned columns."""
+    if not rows:
+        print("No results")
+        return
+    columns = list(rows[0].keys())
+    widths = [max(len(str(col)), *(len(str(row[col])) for row in rows)) for col in columns]
+    print("  ".join(str(col).ljust(width) for col, width in zip(columns, widths)))
+    for row in rows:
+        print("  ".join(str(row[col]).ljust(width) for col, width in zip(columns, widths)))
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest HOI4 save files into a SQLite analytics store")
+    parser.add_argument("paths", nargs="*", help="Save files, directories or glob patterns to ingest")
+    parser.add_argument("--db", help=f"Path to the database (default: {default_db_path()})")
+    parser.add_argument("--list", "-l", action="store_true", help="List ingested saves")
+    parser.add_argument("--units-per-month", action="store_true",
+                        help="Show units produced per organisation per month")
+    parser.add_argument("--country", "-c", help="Restrict queries to a country tag")
+    parser.add_argument("--campaign", help="Restrict queries to a campaign (game_unique_id)")
+    parser.add_argument("--watch", "-w", metavar="DIR", help="Keep polling a save directory and ingest new saves")
+    parser.add_argument("--pattern", default=DEFAULT_PATTERN, help=f"Saves to watch (default: {DEFAULT_PATTERN})")
+    parser.add_argument("--interval", type=float, default=30.0, help="Seconds between polls in watch mode")
+    parser.add_argument("--jobs", "-j", type=int, help="Worker processes in watch mode (default: core count)")
+    parser.add_argument("--snapshots", action="store_true",
+                        help="Also store whole saves as deltas against the previous save of the campaign")
+    parser.add_argument("--restore", type=int, metavar="SAVE_ID", help="Rebuild a stored snapshot as JSON")
+    parser.add_argument("--section", action="append", help="Only restore these top-level sections")
+    parser.add_argument("--output", "-o", help="Output JSON file for --restore (default: stdout)")
+    parser.add_argument("--sizes", action="store_true", help="Show snapshot storage per campaign")
+
+    args = parser.parse_args()
+
+    if not (args.paths or args.list or args.units_per_month or args.watch or args.sizes
+            or args.restore is not None):
+        parser.print_help()
+        return
+
+    with SaveStore(args.db) as store:
+        for file_path in expand_paths(args.paths):
+            content_hash = file_content_hash(file_path)
+            if store.has_save(content_hash):
+                print(f"Skipping {os.path.basename(file_path)}: already ingested")
+                continue
+            try:
+                print(f"Ingesting: {file_path}")
+                extracted = extract_save(file_path, content_hash=content_hash, snapshot=args.snapshots)
+                save_id = store.ingest(extracted)
+                print(f"✓ Stored as save {save_id}")
+            except Exception as e:
+                print(f"✗ Failed to ingest {file_path}: {str(e)}")
+
+        if args.list:
+            print_rows(store.list_saves(args.campaign))
+
+        if args.units_per_month:
+            print_rows(store.units_per_organisation_per_month(args.campaign, args.country))
+
+        if args.sizes:
+            print_rows(store.snapshot_sizes())
+
+        if args.restore is not None:
+            try:
+                snapshot = store.load_snapshot(args.restore, args.section)
+            except KeyError as e:
+                print(f"Error: {e.args[0]}")
+                return
+            if args.output:
+                with open(args.output, 'w', encoding='utf-8') as f:
+                    json.dump(snapshot, f, separators=(',', ':'), ensure_ascii=False)
+                print(f"✓ Restored save {args.restore} to {args.output}")
+            else:
+                print(json.dumps(snapshot, indent=2, ensure_ascii=False))
+
+    if args.watch:
+        def report(save_id, extracted):
+            print(f"✓ Stored {os.path.basename(extracted['path'])} ({extracted.get('date')}) as save {save_id}")
+
+        watcher = SaveWatcher(args.watch, db_path=args.db, pattern=args.pattern,
+                              interval=args.interval, jobs=args.jobs, snapshot=args.snapshots,
+                              on_ingested=report)
+        print(f"Watching {args.watch} for {args.pattern} (Ctrl+C to stop)")
+        try:
+            watcher.run()
+        except KeyboardInterrupt:
+            print("Stopped watching")
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    main()
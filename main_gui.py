@@ -3,9 +3,15 @@ from tkinter import ttk, filedialog, messagebox
 import os
 from pathlib import Path
 import json
-from src.utils.melter import melt_save_file, is_binary_file, ensure_melted_saves_dir
-from read_with_pyradox import load_save_file, save_to_json, clear_cache
+from src.utils.melter import is_binary_file, ensure_melted_saves_dir
+from read_with_pyradox import load_save_file, load_json_file, save_to_json, clear_cache
 from compare_view import CompareView
+from virtual_table import VirtualTable
+from src.utils import instrument
+from src.utils.equipment_index import EquipmentIndex, forget_save_indexes, save_equipment_index
+from src.utils.localisation import equipment_localisation
+from src.utils.melt_cache import shared_melt_cache
+from src.utils.save_sections import load_cached_sections, read_sections, sections_path, write_cached_sections
 import threading
 import time
 import hashlib
@@ -17,12 +23,16 @@ class HOI4StatsGUI:
         self.root.geometry("900x700")
         
         self.save_data = None
-        self.equipment_data = None
+        # Equipment names of the loaded save, built once per save (see src/utils/equipment_index.py)
+        self.equipment_index = EquipmentIndex()
         self.cache_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache')
         
         # Ensure cache directory exists
         if not os.path.exists(self.cache_dir):
             os.makedirs(self.cache_dir)
+        # Binary saves are melted once per content, so reloading one only re-reads its text;
+        # the compare tab and its loader workers melt into the same directory
+        self.melt_cache = shared_melt_cache(os.path.join(self.cache_dir, 'melted'))
         
         # Create a notebook for tabs
         self.notebook = ttk.Notebook(self.root)
@@ -47,6 +57,9 @@ class HOI4StatsGUI:
         ttk.Button(file_frame, text="Browse", command=self.browse_file).pack(side="left", padx=5)
         ttk.Button(file_frame, text="Load", command=self.load_file).pack(side="left", padx=5)
         ttk.Button(file_frame, text="Load JSON", command=self.load_json).pack(side="left", padx=5)
+        # Loading reads only the sections the tabs show; a full conversion also exports the whole save as JSON
+        self.full_conversion_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(file_frame, text="Full conversion", variable=self.full_conversion_var).pack(side="left", padx=5)
         
         # Progress bar for file loading
         progress_frame = ttk.Frame(self.main_tab)
@@ -70,17 +83,26 @@ class HOI4StatsGUI:
         ttk.Label(filter_frame, text="Country:").pack(side="left", padx=5)
         self.country_var = tk.StringVar()
         ttk.Entry(filter_frame, textvariable=self.country_var, width=10).pack(side="left", padx=5)
+        # Organization and equipment filter as you type (by prefix)
+        ttk.Label(filter_frame, text="Organization:").pack(side="left", padx=5)
+        self.org_search_var = tk.StringVar()
+        ttk.Entry(filter_frame, textvariable=self.org_search_var, width=20).pack(side="left", padx=5)
+        ttk.Label(filter_frame, text="Equipment:").pack(side="left", padx=5)
+        self.equipment_search_var = tk.StringVar()
+        ttk.Entry(filter_frame, textvariable=self.equipment_search_var, width=20).pack(side="left", padx=5)
         ttk.Button(filter_frame, text="Search", command=self.filter_organizations).pack(side="left", padx=5)
         ttk.Button(filter_frame, text="Clear Cache", command=self.clear_cache).pack(side="right", padx=5)
+        for var in (self.country_var, self.org_search_var, self.equipment_search_var):
+            var.trace_add("write", lambda *args: self.filter_organizations())
         
-        # Organizations Treeview
-        self.tree = ttk.Treeview(analysis_frame, columns=("Organization", "Country", "Date", "Equipment", "Amount"), show="headings")
-        self.tree.heading("Organization", text="Organization")
-        self.tree.heading("Country", text="Country")
-        self.tree.heading("Date", text="Date")
-        self.tree.heading("Equipment", text="Equipment")
-        self.tree.heading("Amount", text="Amount")
-        self.tree.pack(fill="both", expand=True, pady=5)
+        # Organizations table; searching filters its model instead of re-inserting rows
+        self.orgs_table = VirtualTable(analysis_frame, columns=("Organization", "Country", "Date", "Equipment", "Amount"))
+        self.orgs_table.pack(fill="both", expand=True, pady=5)
+        # Rows are partitioned by country and indexed by organization and equipment when added,
+        # so each filter only visits the rows it keeps
+        self.orgs_table.model.index_column("Country", key=lambda code: str(code).upper())
+        self.orgs_table.model.index_column("Organization")
+        self.orgs_table.model.index_column("Equipment")
         
         # Status Bar
         self.status_var = tk.StringVar()
@@ -102,75 +124,86 @@ class HOI4StatsGUI:
             return
         
         # Start loading in a background thread
-        threading.Thread(target=self._load_file_thread, args=(file_path,), daemon=True).start()
+        threading.Thread(target=self._load_file_thread, args=(file_path, self.full_conversion_var.get()),
+                         daemon=True).start()
     
-    def _load_file_thread(self, file_path):
+    def _load_file_thread(self, file_path, full_conversion=False):
         """Process file loading in a background thread"""
         try:
             self.update_progress(0, "Processing...")
             
-            # Check for cached file
             cache_path = self.get_cache_path(file_path)
-            if os.path.exists(cache_path):
-                self.update_progress(30, "Loading from cache...")
-                with open(cache_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                self.update_progress(100, "Loaded from cache")
-                self.root.after(0, lambda: self.finalize_load(data))
-                return
-            
-            # Check if file is binary and melt if necessary
-            if is_binary_file(file_path):
-                self.update_progress(10, "Melting binary file...")
-                melted_saves_dir = ensure_melted_saves_dir()
-                output_path = os.path.join(melted_saves_dir, os.path.basename(file_path) + ".txt")
-                success, melted_path = melt_save_file(file_path, output_path)
-                if not success:
-                    self.root.after(0, lambda: messagebox.showerror("Error", "Failed to melt the binary file"))
-                    self.update_progress(0, "Ready")
-                    return
-                file_path = melted_path
-                
-            # Parse the save file with progress updates
-            self.update_progress(20, "Parsing save file...")
-            
-            def progress_callback(percent, message):
-                # Calculate overall progress (parsing is 20-80% of total process)
-                overall_percent = 20 + (percent * 0.6)  # Scale from 20-80%
-                self.update_progress(overall_percent, message)
-            
-            save_data = load_save_file(file_path, callback=progress_callback)
-            
-            # Convert pyradox Tree to dictionary
-            self.update_progress(80, "Converting data...")
-            data = {}
-            for key, value in save_data.items():
-                if hasattr(value, 'to_python'):
-                    data[key] = value.to_python()
-                else:
-                    data[key] = value
-            
-            # Save to cache
-            self.update_progress(90, "Saving to cache...")
-            cache_path = self.get_cache_path(file_path)
-            with open(cache_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f)
-            
-            # Save to JSON
-            json_path = os.path.splitext(file_path)[0] + ".json"
-            if save_to_json(data, json_path):
-                self.update_status(f"Successfully saved to {json_path}")
+            if full_conversion:
+                data = self._load_full_save(file_path, cache_path)
+            else:
+                data = self._load_save_sections(file_path, cache_path)
+            equipment_index = save_equipment_index(cache_path, data.get("equipments", {}), equipment_localisation())
             
             self.update_progress(100, "Complete")
             
             # Update the UI with the processed data
-            self.root.after(0, lambda: self.finalize_load(data))
+            self.root.after(0, lambda: self.finalize_load(data, equipment_index))
             
         except Exception as e:
             self.root.after(0, lambda: messagebox.showerror("Error", f"Failed to process file: {str(e)}"))
             self.update_progress(0, "Error")
     
+    def _load_save_sections(self, file_path, cache_path):
+        """Extract only the sections the tabs show (see src/utils/save_sections.py), cached on their own"""
+        cached_path = sections_path(cache_path)
+        data = load_cached_sections(cached_path)
+        if data is not None:
+            self.update_progress(30, "Loaded from cache")
+            return data
+        
+        # Binary saves are melted once into the cache, then only the declared sections are parsed
+        self.update_progress(20, "Extracting organisations and equipment...")
+        data = read_sections(file_path, self.melt_cache)
+        
+        self.update_progress(90, "Saving to cache...")
+        write_cached_sections(cached_path, data)
+        return data
+    
+    def _load_full_save(self, file_path, cache_path):
+        """Parse and convert the whole save, caching it and exporting it as JSON"""
+        # Check for cached file (its type sidecar turns the dates back into Time objects)
+        if os.path.exists(cache_path):
+            self.update_progress(30, "Loading from cache...")
+            data = load_json_file(cache_path)
+            if data is not None:
+                return data
+        
+        # Parse the save file with progress updates (binary saves are melted on the fly)
+        self.update_progress(20, "Parsing save file...")
+        
+        def progress_callback(percent, message):
+            # Calculate overall progress (parsing is 20-80% of total process)
+            overall_percent = 20 + (percent * 0.6)  # Scale from 20-80%
+            self.update_progress(overall_percent, message)
+        
+        save_data = load_save_file(file_path, callback=progress_callback)
+        
+        # Convert pyradox Tree to dictionary
+        self.update_progress(80, "Converting data...")
+        data = {}
+        for key, value in save_data.items():
+            if hasattr(value, 'to_python'):
+                data[key] = value.to_python()
+            else:
+                data[key] = value
+        
+        # Save to cache, streamed from the Tree so the type sidecar records where the dates are
+        self.update_progress(90, "Saving to cache...")
+        save_to_json(save_data, cache_path)
+        
+        # Save to JSON (binary saves keep their JSON in melted_saves, as before)
+        json_path = os.path.splitext(file_path)[0] + ".json"
+        if is_binary_file(file_path):
+            json_path = os.path.join(ensure_melted_saves_dir(), os.path.basename(file_path) + ".json")
+        if save_to_json(save_data, json_path):
+            self.update_status(f"Successfully saved to {json_path}")
+        return data
+    
     def update_progress(self, value, text):
         """Update the progress bar (thread-safe)"""
         self.root.after(0, lambda: self._update_progress_ui(value, text))
@@ -186,10 +219,10 @@ class HOI4StatsGUI:
         """Update the status bar (thread-safe)"""
         self.root.after(0, lambda: self.status_var.set(text))
     
-    def finalize_load(self, data):
+    def finalize_load(self, data, equipment_index):
         """Process the loaded data in the main thread"""
         self.save_data = data
-        self.equipment_data = self.save_data.get("equipments", {})
+        self.equipment_index = equipment_index
         self.update_organizations_list()
         self.status_var.set("Ready")
     
@@ -204,6 +237,7 @@ class HOI4StatsGUI:
         try:
             # Clear memory cache
             clear_cache()
+            forget_save_indexes()
             
             # Clear file cache
             cache_files = os.listdir(self.cache_dir)
@@ -216,51 +250,8 @@ class HOI4StatsGUI:
             messagebox.showerror("Error", f"Failed to clear cache: {str(e)}")
             
     def get_equipment_name(self, equipment_id, equipment_type):
-        """Convert equipment ID and type to its name"""
-        if not hasattr(self, 'equipment_name_map'):
-            self.equipment_name_map = {}
-            if self.equipment_data:
-                for name, items in self.equipment_data.items():
-                    if isinstance(items, dict):
-                        # Handle direct equipment entries
-                        if "id" in items and isinstance(items["id"], dict):
-                            item_id = items["id"].get("id")
-                            item_type = items["id"].get("type")
-                            if item_id is not None and item_type is not None:
-                                self.equipment_name_map[(item_id, item_type)] = name
-                    elif isinstance(items, list):
-                        # Handle list of equipment entries
-                        for item in items:
-                            if isinstance(item, dict):
-                                item_id = item.get("id", {}).get("id")
-                                item_type = item.get("id", {}).get("type")
-                                if item_id is not None and item_type is not None:
-                                    self.equipment_name_map[(item_id, item_type)] = name
-            else:
-                print("No equipment data available")
-        
-        # Try to find the name in the map
-        name = self.equipment_name_map.get((equipment_id, equipment_type))
-        if name:
-            return name
-        else:
-            # Try to find the equipment directly in the equipment_data
-            for key, value in self.equipment_data.items():
-                if isinstance(value, dict) and "id" in value:
-                    if value["id"].get("id") == equipment_id and value["id"].get("type") == equipment_type:
-                        name = key
-                        break
-                elif isinstance(value, list):
-                    for item in value:
-                        if isinstance(item, dict) and "id" in item:
-                            if item["id"].get("id") == equipment_id and item["id"].get("type") == equipment_type:
-                                name = key
-                                break
-                        if name:
-                            break
-                if name:
-                    break
-        
+        """Convert equipment ID and type to its localised name"""
+        name = self.equipment_index.display_name(equipment_id, equipment_type)
         return name or f"Unknown ({equipment_id}, {equipment_type})"
         
     def update_organizations_list(self):
@@ -268,20 +259,22 @@ class HOI4StatsGUI:
             print("No save data available")
             return
             
-        # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        populate_start = time.perf_counter()
+        # Clear existing rows
+        self.orgs_table.clear()
             
         # Get countries data
         countries = self.save_data.get("countries", {})
         if not countries:
             print("No countries found in save data")
             return
+        
+        rows = []
             
         # Add organization items
         for country_code, country_data in countries.items():
             if not isinstance(country_data, dict):
-                print(f"Invalid country_data type: {type(country_data)}")
+                instrument.trace("Invalid country_data type: %s", type(country_data))
                 continue
                 
             # Get industrial organizations from production
@@ -292,7 +285,7 @@ class HOI4StatsGUI:
                 
             for org_name, org_data in organizations.items():
                 if not isinstance(org_data, dict):
-                    print(f"Invalid org_data type: {type(org_data)}")
+                    instrument.trace("Invalid org_data type: %s", type(org_data))
                     continue
                     
                 history = org_data.get("history", [])
@@ -301,7 +294,7 @@ class HOI4StatsGUI:
                     
                 for entry in history:
                     if not isinstance(entry, dict):
-                        print(f"Invalid entry type: {type(entry)}")
+                        instrument.trace("Invalid entry type: %s", type(entry))
                         continue
                         
                     equipment = entry.get("equipment", {})
@@ -319,73 +312,26 @@ class HOI4StatsGUI:
                     if units == 0:
                         continue
                         
-                    self.tree.insert("", "end", values=(
+                    rows.append((
                         org_name,
                         country_code,
                         date,
                         equipment_name,
                         units
                     ))
+        
+        self.orgs_table.model.extend(rows)
+        self.filter_organizations()
+        instrument.record("ui populate", time.perf_counter() - populate_start)
                 
     def filter_organizations(self):
-        country = self.country_var.get().upper()
-        if not country:
-            self.update_organizations_list()
-            return
-            
-        # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-            
-        # Get countries data
-        countries = self.save_data.get("countries", {})
-        if not countries:
-            return
-            
-        # Add filtered items
-        for country_code, country_data in countries.items():
-            if country_code.upper() != country:
-                continue
-                
-            if not isinstance(country_data, dict):
-                continue
-                
-            # Get industrial organizations from production
-            production = country_data.get("production", {})
-            organizations = production.get("industrial_organisations", {})
-            if not organizations:
-                continue
-                
-            for org_name, org_data in organizations.items():
-                if not isinstance(org_data, dict):
-                    continue
-                    
-                history = org_data.get("history", [])
-                if not isinstance(history, list):
-                    continue
-                    
-                for entry in history:
-                    if not isinstance(entry, dict):
-                        continue
-                        
-                    equipment = entry.get("equipment", {})
-                    data = entry.get("data", {})
-                    
-                    equipment_id = equipment.get("id")
-                    equipment_type = equipment.get("type")
-                    equipment_name = self.get_equipment_name(equipment_id, equipment_type)
-                    
-                    # Skip if units is 0
-                    if data.get("units", 0) == 0:
-                        continue
-                        
-                    self.tree.insert("", "end", values=(
-                        org_name,
-                        country_code,
-                        data.get("date", "---"),
-                        equipment_name,
-                        data.get("units", "---")
-                    ))
+        # Filter the table's model by country, organization and equipment; empty fields show every row
+        model = self.orgs_table.model
+        with model.filters():
+            model.filter_equals("Country", self.country_var.get().strip())
+            model.filter_prefix("Organization", self.org_search_var.get().strip())
+            model.filter_prefix("Equipment", self.equipment_search_var.get().strip())
+        self.orgs_table.refresh()
 
     def load_json(self):
         file_path = filedialog.askopenfilename(
@@ -402,7 +348,7 @@ class HOI4StatsGUI:
                 self.update_progress(50, "Parsing JSON...")
                 self.save_data = json.load(f)
                 
-            self.equipment_data = self.save_data.get("equipments", {})
+            self.equipment_index = EquipmentIndex.from_equipments(self.save_data.get("equipments", {}), equipment_localisation())
             self.update_progress(90, "Updating display...")
             self.update_organizations_list()
             self.update_progress(100, "Complete")
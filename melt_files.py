@@ -6,8 +6,14 @@ A utility to melt binary HOI4 save files to text format.
 
 import os
 import sys
+import time
 import argparse
-from src.utils.melter import melt_save_file, is_binary_file, ensure_melted_saves_dir, melt_multiple_files
+from src.utils.melter import (
+    is_binary_file, ensure_melted_saves_dir, iter_melt_files, summarize_melt_results, format_melt_summary
+)
+from src.utils import instrument
+from src.utils.compression import COMPRESSION_SUFFIXES, check_compression
+from src.utils.melt_backends import BACKENDS, get_melt_backend
 
 def main():
     parser = argparse.ArgumentParser(description="Melt binary HOI4 save files to text format")
@@ -15,8 +21,18 @@ def main():
     parser.add_argument("--output-dir", "-o", help="Directory to save melted files")
     parser.add_argument("--check", "-c", action="store_true", help="Check if files are binary or text")
     parser.add_argument("--verbose", "-v", action="store_true", help="Enable verbose output")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1,
+                        help="Number of files to melt at once (default: number of CPU cores)")
+    parser.add_argument("--compress", choices=list(COMPRESSION_SUFFIXES),
+                        help="Compress the melted files (zstd needs the zstandard package)")
+    parser.add_argument("--backend", choices=list(BACKENDS),
+                        help="Melter to use (default: melt.exe where it can run, otherwise the native decoder)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Print a per-stage timing breakdown when done")
     
     args = parser.parse_args()
+    if args.profile:
+        instrument.enable()
     
     # If no files were provided, show help and exit
     if not args.files:
@@ -27,7 +43,8 @@ def main():
     output_dir = args.output_dir or ensure_melted_saves_dir()
     print(f"Using output directory: {output_dir}")
     
-    # Process each file
+    # Check which files exist
+    file_paths = []
     for file_path in args.files:
         if not os.path.exists(file_path):
             print(f"Error: File not found: {file_path}")
@@ -40,21 +57,38 @@ def main():
             else:
                 print(f"{file_path}: TEXT")
             continue
-        
-        # Process the file
-        print(f"Processing: {file_path}")
-        if not is_binary_file(file_path):
-            print(f"Skipping {os.path.basename(file_path)}: already in text format")
-            continue
-        
-        # Melt the file
-        output_path = os.path.join(output_dir, os.path.basename(file_path) + ".txt")
-        success, melted_path = melt_save_file(file_path, output_path)
-        
-        if success:
-            print(f"✓ Successfully melted to: {melted_path}")
+        file_paths.append(file_path)
+    
+    if not file_paths:
+        return
+    
+    try:
+        if args.compress:
+            check_compression(args.compress)
+        backend = get_melt_backend(args.backend)
+    except (ValueError, FileNotFoundError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    
+    # Melt the files, reporting each one as it finishes
+    print(f"Melting {len(file_paths)} files with up to {args.jobs} workers")
+    start = time.perf_counter()
+    results = []
+    for result in iter_melt_files(file_paths, output_dir, args.jobs, args.compress, backend):
+        results.append(result)
+        if result.status == "melted":
+            print(f"✓ Successfully melted to: {result.output_path} ({result.seconds:.1f}s)")
+        elif result.status == "skipped":
+            print(f"Skipping {os.path.basename(result.file_path)}: already in text format")
         else:
-            print(f"✗ Failed to melt: {file_path}")
+            print(f"✗ Failed to melt: {result.file_path} ({result.error})")
+    
+    summary = summarize_melt_results(results, time.perf_counter() - start)
+    print(format_melt_summary(summary))
+    if args.profile:
+        print(instrument.format_report())
+    if summary['failed']:
+        sys.exit(1)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
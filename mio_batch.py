@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+HOI4 MIO Batch - CLI Tool
+Melts and scans a directory (or glob) of saves with a worker pool and writes
+every industrial organisation's production history to CSV, NDJSON or SQLite,
+without the GUI. An interrupted run resumes where it stopped.
+"""
+
+import os
+import sys
+import time
+import argparse
+import multiprocessing
+from src.utils import instrument
+from src.utils.compression import COMPRESSION_SUFFIXES, check_compression, preferred_compression
+from src.utils.equipment_index import EquipmentIndex
+from src.utils.mio_engine import default_save_extractors, iter_process_saves, merge_save_result, sort_by_save_date
+from src.utils.mio_output import WRITERS, RunManifest, entry_rows, guess_format, open_writer
+from src.utils.save_files import expand_paths
+
+def default_melt_cache_dir():
+    """The melt cache of the MIO reader, so melts are shared with the GUI."""
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "melted")
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract industrial organisation production from HOI4 saves")
+    parser.add_argument("paths", nargs="+", help="Save files, directories (all *.hoi4 files) or glob patterns")
+    parser.add_argument("--output", "-o", required=True, help="Output file (.csv, .ndjson/.jsonl or .db/.sqlite)")
+    parser.add_argument("--format", "-f", choices=list(WRITERS), help="Output format (default: from the output suffix)")
+    parser.add_argument("--tag", "-t", action="append", dest="tags",
+                        help="Only extract organisations of this country tag (repeatable, default: all countries)")
+    parser.add_argument("--jobs", "-j", type=int, help="Worker processes (default: core count)")
+    parser.add_argument("--melt-cache", default=default_melt_cache_dir(),
+                        help="Directory of melted saves (default: the MIO reader's cache)")
+    parser.add_argument("--compress", choices=list(COMPRESSION_SUFFIXES),
+                        help=f"Compression of new melts (default: {preferred_compression()})")
+    parser.add_argument("--no-melt", action="store_true", help="Read the saves as they are (already melted text)")
+    parser.add_argument("--manifest", help="Manifest of finished saves (default: <output>.manifest.jsonl)")
+    parser.add_argument("--restart", action="store_true",
+                        help="Ignore the manifest and start the output over instead of resuming")
+    parser.add_argument("--profile", action="store_true", help="Print a per-stage timing breakdown when done")
+
+    args = parser.parse_args()
+    if args.profile:
+        instrument.enable()
+
+    try:
+        output_format = args.format or guess_format(args.output)
+        compression = args.compress or preferred_compression()
+        check_compression(compression)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(2)
+
+    file_paths = expand_paths(args.paths)
+    manifest_path = args.manifest or f"{args.output}.manifest.jsonl"
+    start = time.perf_counter()
+    saves = failed = entries = 0
+    organisations = set()
+
+    with RunManifest(manifest_path, resume=not args.restart) as manifest, \
+            open_writer(args.output, output_format, append=not args.restart) as writer:
+        pending = [file_path for file_path in file_paths if not manifest.is_done(file_path)]
+        skipped = len(file_paths) - len(pending)
+        if skipped:
+            print(f"Resuming: {skipped} of {len(file_paths)} saves already done")
+
+        try:
+            # Saves read by an interrupted run are not read again
+            save_results = []
+            to_read = []
+            for file_path in pending:
+                result = manifest.read_result(file_path)
+                if result is None:
+                    to_read.append(file_path)
+                else:
+                    save_results.append(result)
+            if save_results:
+                print(f"Resuming: {len(save_results)} saves already read")
+
+            for result in iter_process_saves(to_read, args.melt_cache, melt=not args.no_melt,
+                                             compression=compression,
+                                             extractors=default_save_extractors(args.tags), jobs=args.jobs):
+                save_results.append(result)
+                if result.error is None:
+                    manifest.mark_read(result.file_path, result)
+                outcome = "failed" if result.error else f"{result.seconds:.1f}s"
+                print(f"Read {len(save_results)} / {len(pending)}: {os.path.basename(result.file_path)} ({outcome})")
+
+            # Merge in save-date order, so equipment names resolve against the saves before each one,
+            # the save's own mappings first, whatever order the workers finished in
+            equipment_index = EquipmentIndex()
+            for result in sort_by_save_date(save_results):
+                name = os.path.basename(result.file_path)
+                try:
+                    merged = merge_save_result(result, equipment_index, args.tags)
+                except RuntimeError as e:
+                    failed += 1
+                    print(f"✗ Failed: {name} ({e})")
+                    continue
+                rows = entry_rows(result.file_path, merged.save_date, merged.entries)
+                writer.write_save(result.file_path, rows)
+                manifest.mark_done(result.file_path, save_date=merged.save_date, rows=len(rows))
+                saves += 1
+                entries += len(rows)
+                organisations.update((row["tag"], row["org_key"]) for row in rows)
+                print(f"✓ {name} ({merged.save_date}): {len(rows)} entries in {result.seconds:.1f}s")
+        except KeyboardInterrupt:
+            print(f"Interrupted; run again to resume from {manifest_path}")
+            sys.exit(130)
+
+    print(f"Done in {time.perf_counter() - start:.1f}s: {saves} saves written, {failed} failed, "
+          f"{skipped} already done; {len(organisations)} organisations, {entries} entries -> {args.output}")
+    if args.profile:
+        print(instrument.format_report())
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    main()
@@ -2,11 +2,12 @@ __version__ = '5.0.1'
 
 from pyradox.datatype import Color, Time, Tree
 from pyradox.filetype import csv, json, table, txt, yml
-from pyradox.filetype.txt import parse, parse_file, parse_dir, parse_merge
+from pyradox.filetype.txt import parse, parse_file, parse_stream, parse_dir, parse_merge
 from pyradox.filetype.yml import get_localisation
 
 from pyradox.config import get_language, get_game_from_path, get_game_directory
 from pyradox.worldmap import ProvinceMap
 
+import pyradox.diff
 import pyradox.format
 import pyradox.image
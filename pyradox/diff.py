@@ -0,0 +1,349 @@
+import pyradox.datatype.color
+import pyradox.datatype.time
+import pyradox.datatype.tree
+
+import hashlib
+
+# Structural diff between two Trees, or between two results of Tree.to_python.
+
+ADDED = 'added'
+REMOVED = 'removed'
+CHANGED = 'changed'
+
+class Change():
+    """
+    One difference between two trees.
+    path is a tuple of keys from the root. When a key occurs more than once at a level,
+    the key is followed by the index of the item among the items with that key
+    (in the new tree, or in the old tree for removed items).
+    """
+
+    __slots__ = ('kind', 'path', 'old', 'new')
+
+    def __init__(self, kind, path, old = None, new = None):
+        self.kind = kind
+        self.path = path
+        self.old = old
+        self.new = new
+
+    def __repr__(self):
+        return 'Change(%r, %r, %r, %r)' % (self.kind, self.path, self.old, self.new)
+
+    def __str__(self):
+        path = '/'.join(str(x) for x in self.path)
+        if self.kind == ADDED:
+            return '+ %s' % path
+        elif self.kind == REMOVED:
+            return '- %s' % path
+        else:
+            return '~ %s: %s -> %s' % (path, _summarize(self.old), _summarize(self.new))
+
+class TreeDiff():
+    """
+    The result of diff(). Iterates over all Changes in document order.
+    """
+
+    def __init__(self):
+        self.changes = []
+
+    def __iter__(self):
+        return iter(self.changes)
+
+    def __len__(self):
+        return len(self.changes)
+
+    def __bool__(self):
+        return len(self.changes) > 0
+
+    def __str__(self):
+        return '\n'.join(str(change) for change in self.changes)
+
+    @property
+    def added(self):
+        return [change for change in self.changes if change.kind == ADDED]
+
+    @property
+    def removed(self):
+        return [change for change in self.changes if change.kind == REMOVED]
+
+    @property
+    def changed(self):
+        return [change for change in self.changes if change.kind == CHANGED]
+
+    def paths(self, kind = None):
+        """All changed paths, optionally only those of one kind."""
+        return [change.path for change in self.changes if kind is None or change.kind == kind]
+
+def diff(old, new, identity_keys = ('id',)):
+    """
+    Compares two Trees (or dicts produced by to_python) and returns a TreeDiff.
+
+    Items are aligned by key. When a key occurs more than once, items are aligned by identity:
+    the value of the first of identity_keys that the item has, e.g. id = { id = 45 type = 79 }.
+    An entry of identity_keys may also be a tuple of keys whose values are combined.
+    Items without an identity are aligned with identical items first, then in order.
+    Subtrees are hashed so identical subtrees are skipped without walking them twice.
+    """
+    differ = _Differ(identity_keys)
+    differ.diff_value(old, new, ())
+    return differ.result
+
+def _is_tree(value):
+    return isinstance(value, pyradox.datatype.tree.Tree) or isinstance(value, dict)
+
+def _normalize_key(key):
+    # Tree keys are matched non-case-sensitively.
+    if isinstance(key, str): return key.lower()
+    elif isinstance(key, pyradox.datatype.time.Time): return str(key)
+    return key
+
+def _scalar(value):
+    if isinstance(value, pyradox.datatype.time.Time) or isinstance(value, pyradox.datatype.color.Color):
+        return str(value)
+    return value
+
+def _encode_scalar(value):
+    """Type-tagged encoding of a scalar, so values that compare equal across types (1, 1.0, True) differ."""
+    return ('%s:%r' % (type(value).__name__, value)).encode('utf-8')
+
+def _same_scalar(old, new):
+    old, new = _scalar(old), _scalar(new)
+    return type(old) is type(new) and old == new
+
+def _children(value):
+    """
+    Iterates over (normalized key, key, value, from_list) of a Tree or dict.
+    Lists in dicts are treated as duplicate keys.
+    """
+    if isinstance(value, pyradox.datatype.tree.Tree):
+        for key, subvalue in value.items():
+            yield _normalize_key(key), key, subvalue, False
+    else:
+        for key, subvalue in value.items():
+            normalized_key = _normalize_key(key)
+            if isinstance(subvalue, list):
+                for element in subvalue:
+                    yield normalized_key, key, element, True
+            else:
+                yield normalized_key, key, subvalue, False
+
+def _lookup(value, key):
+    if isinstance(value, pyradox.datatype.tree.Tree):
+        return value[key]
+    return value.get(key)
+
+def _summarize(value):
+    if _is_tree(value):
+        return '{...}'
+    return _scalar(value)
+
+class _Differ():
+    """Internal class holding the state of one diff."""
+
+    def __init__(self, identity_keys):
+        self.identity_keys = identity_keys
+        self.digests = {} # id(tree) -> hash of its content
+        self.result = TreeDiff()
+
+    def digest(self, value):
+        """
+        Digest of a value, equal only for equal values of the same types (1, 1.0 and True all differ).
+        Scalars are their type-tagged encoding; trees and lists are hashed with hashlib, once per tree.
+        """
+        if _is_tree(value):
+            value_id = id(value)
+            result = self.digests.get(value_id)
+            if result is None:
+                h = hashlib.blake2b(digest_size = 16)
+                for normalized_key, key, subvalue, from_list in _children(value):
+                    h.update(repr((_encode_scalar(normalized_key), self.digest(subvalue))).encode('utf-8'))
+                result = b'T' + h.digest()
+                self.digests[value_id] = result
+            return result
+        elif isinstance(value, list):
+            h = hashlib.blake2b(digest_size = 16)
+            for subvalue in value:
+                h.update(repr(self.digest(subvalue)).encode('utf-8'))
+            return b'L' + h.digest()
+        return _encode_scalar(_scalar(value))
+
+    def identity(self, value):
+        if not _is_tree(value):
+            return None
+        for spec in self.identity_keys:
+            if isinstance(spec, tuple):
+                parts = [_lookup(value, key) for key in spec]
+                if all(part is not None for part in parts):
+                    return (spec, tuple(self.digest(part) for part in parts))
+            else:
+                part = _lookup(value, spec)
+                if part is not None:
+                    return (spec, self.digest(part))
+        return None
+
+    def diff_value(self, old, new, path):
+        if _is_tree(old) and _is_tree(new):
+            if self.digest(old) != self.digest(new):
+                self.diff_tree(old, new, path)
+        elif _is_tree(old) or _is_tree(new) or not _same_scalar(old, new):
+            self.result.changes.append(Change(CHANGED, path, old, new))
+
+    def diff_tree(self, old, new, path):
+        old_groups = {}
+        listed = set()
+        for normalized_key, key, value, from_list in _children(old):
+            old_groups.setdefault(normalized_key, []).append((key, value))
+            if from_list: listed.add(normalized_key)
+        new_groups = {}
+        for normalized_key, key, value, from_list in _children(new):
+            new_groups.setdefault(normalized_key, []).append((key, value))
+            if from_list: listed.add(normalized_key)
+
+        for normalized_key, new_items in new_groups.items():
+            old_items = old_groups.get(normalized_key, [])
+            self.diff_group(old_items, new_items, path, normalized_key in listed)
+
+        for normalized_key, old_items in old_groups.items():
+            if normalized_key not in new_groups:
+                self.diff_group(old_items, [], path, normalized_key in listed)
+
+    def diff_group(self, old_items, new_items, path, listed):
+        """Compares all items that share a key. listed is True if the items came from a list in a dict."""
+        is_duplicate = listed or len(old_items) > 1 or len(new_items) > 1
+
+        def item_path(items, i):
+            key = items[i][0]
+            if is_duplicate: return path + (key, i)
+            return path + (key,)
+
+        if not is_duplicate and len(old_items) == 1 and len(new_items) == 1:
+            self.diff_value(old_items[0][1], new_items[0][1], item_path(new_items, 0))
+            return
+
+        pairs, removed, added = self.align(old_items, new_items)
+        for i, j in pairs:
+            self.diff_value(old_items[i][1], new_items[j][1], item_path(new_items, j))
+        for i in removed:
+            self.result.changes.append(Change(REMOVED, item_path(old_items, i), old = old_items[i][1]))
+        for j in added:
+            self.result.changes.append(Change(ADDED, item_path(new_items, j), new = new_items[j][1]))
+
+    def align(self, old_items, new_items):
+        """Returns (pairs of (old index, new index), unmatched old indices, unmatched new indices)."""
+        pairs = []
+
+        # Align by identity first.
+        old_by_identity = {}
+        old_anonymous = []
+        for i, (key, value) in enumerate(old_items):
+            identity = self.identity(value)
+            if identity is None: old_anonymous.append(i)
+            else: old_by_identity.setdefault(identity, []).append(i)
+
+        new_anonymous = []
+        added = []
+        for j, (key, value) in enumerate(new_items):
+            identity = self.identity(value)
+            if identity is None:
+                new_anonymous.append(j)
+            elif old_by_identity.get(identity):
+                pairs.append((old_by_identity[identity].pop(0), j))
+            else:
+                added.append(j)
+        removed = [i for indices in old_by_identity.values() for i in indices]
+
+        # Then align identical anonymous items, wherever they are.
+        old_by_digest = {}
+        for i in old_anonymous:
+            old_by_digest.setdefault(self.digest(old_items[i][1]), []).append(i)
+        unmatched_new = []
+        for j in new_anonymous:
+            candidates = old_by_digest.get(self.digest(new_items[j][1]))
+            if candidates:
+                pairs.append((candidates.pop(0), j))
+            else:
+                unmatched_new.append(j)
+        unmatched_old = sorted(i for indices in old_by_digest.values() for i in indices)
+
+        # Remaining anonymous items are aligned in order.
+        for i, j in zip(unmatched_old, unmatched_new):
+            pairs.append((i, j))
+        removed += unmatched_old[len(unmatched_new):]
+        added += unmatched_new[len(unmatched_old):]
+
+        pairs.sort(key = lambda pair: pair[1])
+        return pairs, sorted(removed), sorted(added)
+
+def make_patch(old, new):
+    """
+    Returns a patch that turns old into new, or None if they are equal.
+    old and new are built-in Python values such as the result of Tree.to_python or json.load.
+    Dicts are patched by key and lists by position, so appending to a list is cheap.
+    The patch itself is made of built-in types and can be stored as JSON.
+    Values of different types are never equal here, so 1 -> True or 1 -> 1.0 is kept.
+    """
+    if old is new:
+        return None
+    if type(old) is not type(new):
+        return {'value': new}
+    if isinstance(old, dict):
+        patch = {}
+        changed = {}
+        added = {}
+        for key, value in new.items():
+            if key in old:
+                subpatch = make_patch(old[key], value)
+                if subpatch is not None: changed[key] = subpatch
+            else:
+                added[key] = value
+        removed = [key for key in old if key not in new]
+        if changed: patch['sub'] = changed
+        if added: patch['set'] = added
+        if removed: patch['del'] = removed
+        # apply_patch keeps old keys in place and appends new ones; record the order only if that is not enough.
+        if [key for key in old if key in new] + list(added) != list(new):
+            patch['order'] = list(new)
+        return patch or None
+    if isinstance(old, list):
+        patch = {'len': len(new)}
+        changed = {}
+        for i, value in enumerate(new[:len(old)]):
+            subpatch = make_patch(old[i], value)
+            if subpatch is not None: changed[i] = subpatch
+        if changed: patch['sub'] = changed
+        if len(new) > len(old): patch['set'] = new[len(old):]
+        if len(patch) == 1 and len(new) == len(old):
+            return None
+        return patch
+    if old == new:
+        return None
+    return {'value': new}
+
+def apply_patch(old, patch):
+    """
+    Returns the result of applying a patch from make_patch to old. old is not modified;
+    parts that the patch does not touch are shared with the result.
+    Patches that went through JSON (with list indices turned into strings) are accepted.
+    """
+    if patch is None:
+        return old
+    if 'value' in patch:
+        return patch['value']
+    if isinstance(old, list):
+        result = old[:patch['len']]
+        for i, subpatch in patch.get('sub', {}).items():
+            i = int(i)
+            result[i] = apply_patch(result[i], subpatch)
+        result += patch.get('set', [])
+        return result
+    removed = set(patch.get('del', []))
+    changed = patch.get('sub', {})
+    result = {}
+    for key, value in old.items():
+        if key in removed: continue
+        if key in changed: value = apply_patch(value, changed[key])
+        result[key] = value
+    result.update(patch.get('set', {}))
+    if 'order' in patch:
+        result = {key: result[key] for key in patch['order']}
+    return result
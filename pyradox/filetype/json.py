@@ -1,19 +1,282 @@
+import pyradox.datatype.color
+import pyradox.datatype.time
+import pyradox.datatype.tree
+import pyradox.datatype.util
+
+import collections.abc
 import json
+import re
+
+STREAM_MODES = ['compact', 'ndjson']
+
+# Key used in a types trie to mark that the values at a path are Times.
+TIME_MARKER = '$time'
+
+# Quoted strings that look like dates, which the parser leaves as strings.
+DATE_STRING = re.compile(r'^-?\d+\.\d+\.\d+(\.\d+)?$')
 
 def dump_tree(tree, fp, duplicate_action = 'list', **kwargs):
-    """ 
+    """
     Dumps a Tree as json.dump.
     First converts to_python using duplicate_action.
     Additional kwargs are sent to json.dump.
     """
     obj = tree.to_python(duplicate_action = duplicate_action)
     json.dump(obj, fp, **kwargs)
-    
+
 def dumps_tree(tree, duplicate_action = 'list', **kwargs):
-    """ 
+    """
     Dumps a Tree as json.dumps.
     First converts to_python using duplicate_action.
     Additional kwargs are sent to json.dumps.
     """
     obj = tree.to_python(duplicate_action = duplicate_action)
-    return json.dumps(obj, **kwargs)
\ No newline at end of file
+    return json.dumps(obj, **kwargs)
+
+def stream_tree(tree, fp, duplicate_action = 'list', mode = 'compact', types = None):
+    """
+    Writes a Tree as JSON directly to fp without building the to_python result first.
+    The output is the same as dump_tree with compact separators; duplicate keys follow duplicate_action as in to_python.
+    Time and Color values are written as strings.
+
+    mode:
+        'compact': A single JSON object.
+        'ndjson': One JSON object per line, one line per top-level key.
+    types: If a dict is given, it is filled with a trie of the key paths whose values are Times,
+        or quoted strings that look like dates. Lists are transparent in the trie. Pass it to apply_types or LazyTimeDict when reloading.
+    """
+    if mode not in STREAM_MODES:
+        raise ValueError('Invalid stream mode "%s". Must be one of %s.' % (mode, STREAM_MODES))
+
+    writer = _TreeWriter(fp.write, duplicate_action, types)
+    if mode == 'ndjson':
+        for python_key, items, as_list in _plan_level(tree, duplicate_action):
+            writer.write('{')
+            writer.write_member(python_key, items, as_list, None)
+            writer.write('}\n')
+    else:
+        writer.write_tree(tree, None)
+
+def apply_types(obj, types):
+    """
+    Converts the values of a loaded JSON object in place according to a types trie from stream_tree.
+    Only the marked paths are visited. Returns obj.
+    """
+    if isinstance(obj, dict):
+        for key, subtypes in types.items():
+            if key != TIME_MARKER and key in obj:
+                obj[key] = _apply_value(obj[key], subtypes)
+    elif isinstance(obj, list):
+        for i, value in enumerate(obj):
+            obj[i] = apply_types(value, types)
+    return obj
+
+def _apply_value(value, types):
+    if isinstance(value, str):
+        if TIME_MARKER in types:
+            return pyradox.datatype.time.Time.from_string(value) or value
+        return value
+    elif isinstance(value, list):
+        return [_apply_value(subvalue, types) for subvalue in value]
+    return apply_types(value, types)
+
+class LazyTimeDict(collections.abc.MutableMapping):
+    """
+    A mapping loaded from JSON whose marked values are converted to Time on first access.
+    Nested dicts on marked paths are wrapped as well, so untouched sections are never visited.
+    Each value is converted once and stored back, so repeated accesses return the same object.
+    """
+
+    def __init__(self, data, types):
+        self._data = dict(data)
+        self._types = types
+        self._converted = set()
+
+    def __getitem__(self, key):
+        value = self._data[key]
+        if key not in self._converted:
+            subtypes = self._types.get(key)
+            if subtypes:
+                value = _lazy_value(value, subtypes)
+                self._data[key] = value
+            self._converted.add(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self._data[key] = value
+        self._converted.add(key)
+
+    def __delitem__(self, key):
+        del self._data[key]
+        self._converted.discard(key)
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __repr__(self):
+        return 'LazyTimeDict(%r)' % self._data
+
+    def copy(self):
+        """A shallow copy as a plain dict, with every marked value converted."""
+        return dict(self.items())
+
+    def to_python(self):
+        """The whole mapping as plain dicts and lists, with every marked value converted."""
+        return _lazy_to_python(self)
+
+def _lazy_value(value, types):
+    if isinstance(value, dict):
+        return LazyTimeDict(value, types)
+    elif isinstance(value, list):
+        return [_lazy_value(subvalue, types) for subvalue in value]
+    return _apply_value(value, types)
+
+def _lazy_to_python(value):
+    if isinstance(value, LazyTimeDict):
+        return {key : _lazy_to_python(subvalue) for key, subvalue in value.items()}
+    elif isinstance(value, list):
+        return [_lazy_to_python(subvalue) for subvalue in value]
+    return value
+
+def _plan_level(tree, duplicate_action):
+    """
+    Groups the items of one level of a Tree the same way Tree.to_python does, without converting any values.
+    Returns (python_key, items, as_list) in output order.
+    """
+    allowed_duplicate_actions = ['error', 'overwrite', 'one_group', 'list']
+    if duplicate_action not in allowed_duplicate_actions:
+        raise ValueError(
+            'Invalid duplicate action "%s". Must be one of %s.' %
+            (duplicate_action, allowed_duplicate_actions))
+
+    entries = {} # python_key -> [items, as_list]
+    group_key = None # The key corresponding to the current group. None if no group in progress.
+
+    for item in tree._data:
+        python_key = pyradox.datatype.util.to_python(item.key)
+        if group_key is not None: # Last item was in a one_group.
+            if item.in_group and pyradox.datatype.util.match(item.key, group_key) and not isinstance(item.value, pyradox.datatype.tree.Tree):
+                # Continue the previous one_group.
+                entries[python_key][0].append(item)
+                continue
+            else:
+                # End the one_group.
+                group_key = None
+        if item.in_group and duplicate_action == 'one_group':
+            if python_key in entries:
+                raise ValueError(
+                    'to_python produced duplicate for key "%s". All but the last value will be overwritten.'
+                    % python_key)
+            # Start a group.
+            group_key = item.key
+            entries[python_key] = [[item], True]
+        elif python_key in entries:
+            if duplicate_action == 'list':
+                entry = entries[python_key]
+                entry[0].append(item)
+                entry[1] = True
+            elif duplicate_action == 'overwrite':
+                entries[python_key] = [[item], False]
+            else:
+                raise ValueError(
+                    'to_python produced duplicate for key "%s". All but the last value will be overwritten.'
+                    % python_key)
+        else:
+            entries[python_key] = [[item], False]
+
+    return [(python_key, items, as_list) for python_key, (items, as_list) in entries.items()]
+
+class _TreeWriter():
+    """
+    Internal class that writes one Tree.
+    Paths are tracked as (parent, key) links only when a types trie is being collected.
+    """
+
+    def __init__(self, write, duplicate_action, types):
+        self.write = write
+        self.duplicate_action = duplicate_action
+        self.types = types
+
+    def write_tree(self, tree, path):
+        write = self.write
+        write('{')
+        first = True
+        for python_key, items, as_list in _plan_level(tree, self.duplicate_action):
+            if first: first = False
+            else: write(',')
+            self.write_member(python_key, items, as_list, path)
+        write('}')
+
+    def write_member(self, python_key, items, as_list, path):
+        write = self.write
+        key_string = _key_string(python_key)
+        write(_encode_string(key_string))
+        write(':')
+        if self.types is not None:
+            path = (path, key_string)
+        if as_list:
+            write('[')
+            first = True
+            for item in items:
+                if first: first = False
+                else: write(',')
+                self.write_value(item.value, path)
+            write(']')
+        else:
+            self.write_value(items[0].value, path)
+
+    def write_value(self, value, path):
+        write = self.write
+        if isinstance(value, pyradox.datatype.tree.Tree):
+            self.write_tree(value, path)
+        elif isinstance(value, str):
+            if path is not None and DATE_STRING.match(value):
+                self.mark_time(path)
+            write(_encode_string(value))
+        elif value is True:
+            write('true')
+        elif value is False:
+            write('false')
+        elif isinstance(value, int):
+            write(int.__repr__(value))
+        elif isinstance(value, float):
+            write(_encode_float(value))
+        elif value is None:
+            write('null')
+        else:
+            # Time, Color and anything else are written as their string form.
+            if path is not None and isinstance(value, pyradox.datatype.time.Time):
+                self.mark_time(path)
+            write(_encode_string(str(value)))
+
+    def mark_time(self, path):
+        keys = []
+        while path is not None:
+            path, key = path
+            keys.append(key)
+        node = self.types
+        for key in reversed(keys):
+            node = node.setdefault(key, {})
+        node[TIME_MARKER] = 1
+
+def _key_string(key):
+    """The string JSON uses for a dict key."""
+    if isinstance(key, str):
+        return key
+    elif isinstance(key, float):
+        return _encode_float(key)
+    return str(key)
+
+def _encode_float(value):
+    if value != value:
+        return 'NaN'
+    elif value == float('inf'):
+        return 'Infinity'
+    elif value == -float('inf'):
+        return '-Infinity'
+    return float.__repr__(value)
+
+_encode_string = json.encoder.encode_basestring_ascii
@@ -32,6 +32,14 @@ def parse(s, filename="<string>"):
     token_data = lex(lines, filename)
     return parse_tree(token_data, filename)
 
+def parse_stream(lines, filename="<stream>"):
+    """
+    Parse an iterable of lines, such as an open file or a pipe.
+    Lines are lexed as they arrive, so the producer can still be writing while lexing runs.
+    """
+    token_data = lex(lines, filename)
+    return parse_tree(token_data, filename)
+
 def should_parse(fullpath, filename, filter_pattern = None):
     if not os.path.isfile(fullpath): return False
     _, ext = os.path.splitext(fullpath)
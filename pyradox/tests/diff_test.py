@@ -0,0 +1,113 @@
+import _initpath
+import pyradox
+
+old = pyradox.parse("""
+date = 1936.1.1.12
+SOV_tula_arms_plant_organization = {
+    id = { id = 1 type = 74 }
+    funds = 10.5
+    size = 2
+    unlocked = { trait = a }
+    history = { equipment = { id = 45 type = 79 } data = { date = "1936.1.1.12" units = 10 } }
+    history = { equipment = { id = 46 type = 79 } data = { date = "1936.1.1.12" units = 5 } }
+}
+SOV_unchanged_organization = {
+    id = { id = 2 type = 74 }
+    history = { equipment = { id = 45 type = 79 } data = { date = "1936.1.1.12" units = 1 } }
+}
+""")
+
+new = pyradox.parse("""
+date = 1936.2.1.12
+SOV_tula_arms_plant_organization = {
+    id = { id = 1 type = 74 }
+    funds = 10.5
+    size = 3
+    unlocked = { trait = a }
+    unlocked = { trait = b }
+    history = { equipment = { id = 46 type = 79 } data = { date = "1936.1.1.12" units = 5 } }
+    history = { equipment = { id = 47 type = 79 } data = { date = "1936.2.1.12" units = 3 } }
+    history = { equipment = { id = 45 type = 79 } data = { date = "1936.1.1.12" units = 30 } }
+}
+SOV_unchanged_organization = {
+    id = { id = 2 type = 74 }
+    history = { equipment = { id = 45 type = 79 } data = { date = "1936.1.1.12" units = 1 } }
+}
+""")
+
+def test_tree_diff():
+    result = pyradox.diff.diff(old, new, identity_keys = ('equipment', 'id'))
+    assert len(result) == 5
+    assert str(result).splitlines()[0] == '~ date: 1936.1.1.12 -> 1936.2.1.12'
+    assert ('date',) in result.paths('changed')
+    assert ('SOV_tula_arms_plant_organization', 'size') in result.paths('changed')
+    # History entries are aligned by equipment, not by position.
+    assert ('SOV_tula_arms_plant_organization', 'history', 2, 'data', 'units') in result.paths('changed')
+    assert ('SOV_tula_arms_plant_organization', 'history', 1) in result.paths('added')
+    assert ('SOV_tula_arms_plant_organization', 'unlocked', 1) in result.paths('added')
+    assert not result.removed
+    assert not any(path[0] == 'SOV_unchanged_organization' for path in result.paths())
+
+    units = [change for change in result.changed if change.path[-1] == 'units'][0]
+    assert (units.old, units.new) == (10, 30)
+
+def test_identical():
+    assert not pyradox.diff.diff(old, old)
+
+def test_python_diff():
+    old_python = old.to_python()
+    new_python = new.to_python()
+    result = pyradox.diff.diff(old_python, new_python, identity_keys = ('equipment', 'id'))
+    tree_result = pyradox.diff.diff(old, new, identity_keys = ('equipment', 'id'))
+    assert sorted(map(str, result)) == sorted(map(str, tree_result))
+
+def test_removed():
+    result = pyradox.diff.diff(new, old, identity_keys = ('equipment', 'id'))
+    assert ('SOV_tula_arms_plant_organization', 'history', 1) in result.paths('removed')
+    assert ('SOV_tula_arms_plant_organization', 'unlocked', 1) in result.paths('removed')
+
+def test_compound_identity():
+    old_entries = {'history': [{'equipment_id': 1, 'equipment_type': 2, 'units': 5}]}
+    new_entries = {'history': [{'equipment_id': 1, 'equipment_type': 3, 'units': 5},
+                               {'equipment_id': 1, 'equipment_type': 2, 'units': 7}]}
+    result = pyradox.diff.diff(old_entries, new_entries, identity_keys = (('equipment_id', 'equipment_type'),))
+    assert result.paths('changed') == [('history', 1, 'units')]
+    assert result.paths('added') == [('history', 0)]
+
+def test_patch():
+    old_python = old.to_python()
+    new_python = new.to_python()
+    patch = pyradox.diff.make_patch(old_python, new_python)
+    assert pyradox.diff.apply_patch(old_python, patch) == new_python
+    assert pyradox.diff.apply_patch(new_python, pyradox.diff.make_patch(new_python, old_python)) == old_python
+    assert pyradox.diff.make_patch(old_python, old_python) is None
+    # The unchanged organization is not part of the patch.
+    assert 'SOV_unchanged_organization' not in str(patch)
+
+def test_patch_json():
+    import json
+    old_python = {'b': [1, 2, {'x': 1}], 'a': 1, 'gone': 0}
+    new_python = {'a': 2, 'b': [1, 3, {'x': 2}, 4], 'new': 5}
+    patch = json.loads(json.dumps(pyradox.diff.make_patch(old_python, new_python)))
+    result = pyradox.diff.apply_patch(old_python, patch)
+    assert result == new_python
+    assert list(result) == list(new_python)
+    assert old_python == {'b': [1, 2, {'x': 1}], 'a': 1, 'gone': 0}
+
+def test_patch_types():
+    old_python = {'flag': 1, 'ratio': 1, 'nested': [{'x': 0}]}
+    new_python = {'flag': True, 'ratio': 1.0, 'nested': [{'x': False}]}
+    result = pyradox.diff.apply_patch(old_python, pyradox.diff.make_patch(old_python, new_python))
+    assert [type(value) for value in (result['flag'], result['ratio'], result['nested'][0]['x'])] == [bool, float, bool]
+    assert pyradox.diff.make_patch(new_python, {'flag': True, 'ratio': 1.0, 'nested': [{'x': False}]}) is None
+
+def test_diff_scalars():
+    # hash(-1) == hash(-2) in CPython; 1, 1.0 and True compare equal but are different values.
+    for old_value, new_value in (('-1', '-2'), ('1', '1.0'), ('1', 'yes'), ('1.0', 'yes')):
+        result = pyradox.diff.diff(pyradox.parse('org = { funds = %s }' % old_value),
+                                   pyradox.parse('org = { funds = %s }' % new_value))
+        assert result.paths('changed') == [('org', 'funds')], (old_value, new_value)
+    for old_value, new_value in ((-1, -2), (1, 1.0), (1, True)):
+        result = pyradox.diff.diff({'org': [{'funds': old_value}]}, {'org': [{'funds': new_value}]})
+        assert len(result) == 1, (old_value, new_value)
+    assert not pyradox.diff.diff(pyradox.parse('org = { funds = -1 }'), pyradox.parse('org = { funds = -1 }'))
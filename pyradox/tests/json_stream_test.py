@@ -0,0 +1,56 @@
+import _initpath
+import pyradox
+
+import io
+import json
+
+result = pyradox.parse("""
+date = 1936.1.1.12
+color = rgb { 1 100 200 }
+flag = yes
+regular_group = { 1 2 3 }
+unlocked = { trait = a }
+unlocked = { trait = b }
+history = {
+    equipment = { id = 5 type = 70 }
+    data = { date = "1940.3.1.1" units = 1679 }
+}
+empty_tree = {}
+""")
+
+for duplicate_action in ('list', 'overwrite'):
+    stream = io.StringIO()
+    pyradox.json.stream_tree(result, stream, duplicate_action = duplicate_action)
+    assert stream.getvalue() == pyradox.json.dumps_tree(result, duplicate_action = duplicate_action, separators = (',', ':'))
+
+stream = io.StringIO()
+pyradox.json.stream_tree(result, stream, mode = 'ndjson')
+lines = stream.getvalue().splitlines()
+assert len(lines) == 7
+assert json.loads(lines[4]) == {'unlocked' : [{'trait' : 'a'}, {'trait' : 'b'}]}
+
+print(stream.getvalue())
+
+types = {}
+stream = io.StringIO()
+pyradox.json.stream_tree(result, stream, types = types)
+# Quoted dates are strings in the Tree, but are marked as well
+assert types == {'date' : {pyradox.json.TIME_MARKER : 1}, 'history' : {'data' : {'date' : {pyradox.json.TIME_MARKER : 1}}}}
+
+reloaded = pyradox.json.apply_types(json.loads(stream.getvalue()), types)
+assert isinstance(reloaded['date'], pyradox.Time)
+assert isinstance(reloaded['history']['data']['date'], pyradox.Time)
+
+lazy = pyradox.json.LazyTimeDict(json.loads(stream.getvalue()), types)
+assert isinstance(lazy['date'], pyradox.Time)
+
+lazy = pyradox.json.LazyTimeDict({'unlocked' : [{'date' : '1936.1.1.12'}], 'flag' : True},
+                                 {'unlocked' : {'date' : {pyradox.json.TIME_MARKER : 1}}})
+assert lazy['unlocked'] is lazy['unlocked']
+lazy['unlocked'][0]['seen'] = True
+assert lazy['unlocked'][0]['seen']
+assert isinstance(dict(lazy)['unlocked'][0]['date'], pyradox.Time)
+assert isinstance(lazy.copy()['unlocked'][0]['date'], pyradox.Time)
+assert isinstance({**lazy}['unlocked'][0]['date'], pyradox.Time)
+assert lazy.pop('flag') is True and 'flag' not in lazy
+assert lazy.to_python()['unlocked'][0]['date'] == reloaded['date']
@@ -9,7 +9,9 @@ import shutil
 import traceback
 import sys
 import argparse
-from src.utils.melter import melt_save_file, is_binary_file, ensure_melted_saves_dir
+from src.utils.melter import melt_save_file, is_binary_file, ensure_melted_saves_dir, parse_save_stream
+from src.utils.compression import COMPRESSION_SUFFIXES, compressed_path
+from src.utils import instrument
 import re
 import time
 
@@ -19,13 +21,22 @@ sys.setrecursionlimit(10000)
 # Global cache for parsed files
 _file_cache = {}
 
-def load_save_file(save_path, callback=None):
+# Pattern for strings that look like dates, used when an export has no type sidecar
+DATE_PATTERN = re.compile(r'^-?\d+\.\d+\.\d+(\.\d+)?$')
+
+# Version of the type sidecar format written by save_to_json
+TYPES_VERSION = 1
+
+def load_save_file(save_path, callback=None, tee_path=None):
     """
     Load a HOI4 save file and return the parsed data.
     
+    Binary saves are melted on the fly and streamed into the parser, without a melted copy on disk.
+    
     Args:
         save_path: Path to the save file
         callback: Optional callback function to report progress (takes percentage and status message)
+        tee_path: Optional path to also write the melted text of a binary save to
     
     Returns:
         Parsed save file data
@@ -55,25 +66,20 @@ def load_save_file(save_path, callback=None):
             callback(10, "Preparing to parse file")
             
         print(f"Parsing file: {save_path}")
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         # Manual progress updates for better UI feedback
         if callback:
             callback(20, "Starting parse operation")
         
         # Parse the file (without token_callback which isn't supported)
-        result = pyradox.parse_file(
-            save_path, 
-            game='HoI4', 
-            path_relative_to_game=False, 
-            verbose=True
-        )
+        result = parse_save_stream(save_path, tee_path=tee_path)
         
         # Simulate progress updates since we can't get real-time feedback
         if callback:
             callback(80, "Parse completed, finalizing")
         
-        parse_time = time.time() - start_time
+        parse_time = time.perf_counter() - start_time
         print(f"\nSuccessfully parsed {save_path} in {parse_time:.2f} seconds")
         
         if callback:
@@ -91,41 +97,55 @@ def load_save_file(save_path, callback=None):
         traceback.print_exc()
         raise
 
-def save_to_json(data, output_path):
-    """Save the parsed data to a JSON file."""
+class PyradoxJSONEncoder(json.JSONEncoder):
+    """JSON encoder that handles pyradox types in already-converted data."""
+    def default(self, obj):
+        # Handle Time objects
+        if isinstance(obj, pyradox.datatype.time.Time):
+            return str(obj)  # Convert to string format like "1936.1.1.12"
+        # Handle other pyradox types by converting to Python types
+        elif hasattr(obj, "to_python"):
+            return obj.to_python()
+        # Default string conversion for any other non-serializable types
+        else:
+            return str(obj)
+
+def save_to_json(data, output_path, mode='compact'):
+    """
+    Save the parsed data to a JSON file.
+    
+    Args:
+        data: A pyradox Tree, or a dictionary that was already converted with to_python()
+        output_path: Path of the JSON file to write
+        mode: 'compact' for a single JSON object, 'ndjson' for one line per top-level section
+    
+    Trees are streamed straight to the file, so the converted save is never held in memory.
+    For Trees, a small type sidecar (see get_types_path) records which paths hold dates.
+    """
     try:
-        # Custom JSON encoder to handle pyradox types
-        class PyradoxJSONEncoder(json.JSONEncoder):
-            def default(self, obj):
-                # Handle Time objects
-                if isinstance(obj, pyradox.datatype.time.Time):
-                    return str(obj)  # Convert to string format like "1936.1.1.12"
-                # Handle other pyradox types by converting to Python types
-                elif hasattr(obj, "to_python"):
-                    return obj.to_python()
-                # Default string conversion for any other non-serializable types
-                else:
-                    return str(obj)
-        
-        # Convert to a serializable format
-        serializable_data = {}
-        for key, value in data.items():
-            # Convert keys to appropriate Python types
-            if isinstance(key, pyradox.datatype.time.Time):
-                # Format date keys in a sortable way
-                py_key = str(key)
-            else:
-                # Use string representation for other keys
-                py_key = str(key)
-            
-            # Use the key and value
-            serializable_data[py_key] = value
-        
         # Ensure the output directory exists
         os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
         
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(serializable_data, f, indent=2, cls=PyradoxJSONEncoder)
+        types = None
+        with instrument.span("convert"), open(output_path, 'w', encoding='utf-8') as f:
+            if isinstance(data, pyradox.Tree):
+                types = {}
+                pyradox.json.stream_tree(data, f, mode=mode, types=types)
+            elif mode == 'ndjson':
+                for key, value in data.items():
+                    json.dump({str(key): value}, f, separators=(',', ':'), cls=PyradoxJSONEncoder)
+                    f.write('\n')
+            else:
+                json.dump(data, f, separators=(',', ':'), cls=PyradoxJSONEncoder)
+        
+        # Record which paths hold dates so load_json_file does not have to guess. Dictionaries
+        # have lost the types in to_python, so their exports are left to the date pattern.
+        types_path = get_types_path(output_path)
+        if types is not None:
+            with open(types_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': TYPES_VERSION, 'types': types}, f, separators=(',', ':'))
+        elif os.path.exists(types_path):
+            os.remove(types_path)
         print(f"Successfully saved parsed data to {output_path}")
         return True
     except Exception as e:
@@ -133,29 +153,67 @@ def save_to_json(data, output_path):
         traceback.print_exc()
         return False
 
-def load_json_file(file_path):
-    """Load a JSON file and convert date strings back to Time objects."""
+def get_types_path(json_path):
+    """Path of the type sidecar written next to a JSON export."""
+    return json_path + ".types.json"
+
+def _read_json(file_path):
+    """Read a compact or NDJSON export into a single dictionary."""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        if not file_path.lower().endswith('.ndjson'):
+            return json.load(f)
+        data = {}
+        for line in f:
+            if line.strip():
+                data.update(json.loads(line))
+        return data
+
+def convert_dates(obj):
+    """Convert every string that looks like a date back to a Time object (used when there is no type sidecar)."""
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            if isinstance(value, str):
+                if DATE_PATTERN.match(value):
+                    obj[key] = pyradox.datatype.time.Time.from_string(value)
+            elif isinstance(value, (dict, list)):
+                convert_dates(value)
+    elif isinstance(obj, list):
+        for i, item in enumerate(obj):
+            if isinstance(item, str):
+                if DATE_PATTERN.match(item):
+                    obj[i] = pyradox.datatype.time.Time.from_string(item)
+            elif isinstance(item, (dict, list)):
+                convert_dates(item)
+    return obj
+
+def load_json_file(file_path, lazy=False):
+    """
+    Load a JSON file and convert date strings back to Time objects.
+    
+    Args:
+        file_path: Path to a JSON or NDJSON export
+        lazy: If True and a type sidecar exists, return a dictionary that converts dates on first access
+    
+    If the export has a type sidecar, only the paths it marks are converted.
+    Otherwise every string is checked against the date pattern.
+    """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            
-        # Convert date strings back to Time objects
-        def convert_dates(obj):
-            if isinstance(obj, dict):
-                for key, value in obj.items():
-                    if isinstance(value, str) and re.match(r'^-?\d+\.\d+\.\d+(\.\d+)?$', value):
-                        obj[key] = pyradox.datatype.time.Time.from_string(value)
-                    elif isinstance(value, dict):
-                        convert_dates(value)
-                    elif isinstance(value, list):
-                        for i, item in enumerate(value):
-                            if isinstance(item, str) and re.match(r'^-?\d+\.\d+\.\d+(\.\d+)?$', item):
-                                value[i] = pyradox.datatype.time.Time.from_string(item)
-                            elif isinstance(item, dict):
-                                convert_dates(item)
-            return obj
+        with instrument.span("read"):
+            data = _read_json(file_path)
+        instrument.count("bytes.read", os.path.getsize(file_path))
+        
+        types_path = get_types_path(file_path)
+        if os.path.exists(types_path):
+            with open(types_path, 'r', encoding='utf-8') as f:
+                sidecar = json.load(f)
+            if sidecar.get('version') == TYPES_VERSION:
+                if lazy:
+                    return pyradox.json.LazyTimeDict(data, sidecar['types'])
+                with instrument.span("convert"):
+                    return pyradox.json.apply_types(data, sidecar['types'])
             
-        return convert_dates(data)
+        with instrument.span("convert"):
+            return convert_dates(data)
     except Exception as e:
         print(f"Error loading JSON file: {str(e)}")
         traceback.print_exc()
@@ -175,9 +233,31 @@ def main():
     parser.add_argument('--output', '-o', 
                         help='Path to save the output JSON file (default: input_filename.json)')
     parser.add_argument('--melt-only', action='store_true', help='Only melt the file, do not parse it')
+    parser.add_argument('--keep-melted', action='store_true',
+                        help='Also write the melted text of a binary save to melted_saves while parsing')
+    parser.add_argument('--compress', choices=list(COMPRESSION_SUFFIXES),
+                        help='Compress melted output written by --melt-only or --keep-melted')
     parser.add_argument('--no-json', action='store_true', help='Do not save JSON output')
+    parser.add_argument('--ndjson', action='store_true',
+                        help='Write one JSON object per top-level section (one per line) instead of a single object')
+    parser.add_argument('--profile', action='store_true',
+                        help='Print a breakdown of the time spent per stage (also enabled by HOI4_PROFILE=1)')
+    parser.add_argument('--profile-output', help='Also write the stage breakdown to this JSON file')
     args = parser.parse_args()
     
+    if args.profile or args.profile_output:
+        instrument.enable()
+    instrument.reset()
+    try:
+        return process_save_file(args)
+    finally:
+        if instrument.is_enabled():
+            print("\n" + instrument.format_report())
+            if args.profile_output:
+                print(f"Stage breakdown saved to: {instrument.export_report(args.profile_output)}")
+
+def process_save_file(args):
+    """Melt, parse and export a save as requested on the command line (see main)."""
     save_path = args.save_path
     print(f"Attempting to process save file: {save_path}")
     
@@ -186,8 +266,9 @@ def main():
         if is_binary_file(save_path):
             print(f"Melting binary file: {save_path}")
             melted_saves_dir = ensure_melted_saves_dir()
-            output_path = os.path.join(melted_saves_dir, os.path.basename(save_path) + ".txt")
-            success, melted_path = melt_save_file(save_path, output_path)
+            output_path = compressed_path(os.path.join(melted_saves_dir, os.path.basename(save_path) + ".txt"),
+                                          args.compress)
+            success, melted_path = melt_save_file(save_path, output_path, compression=args.compress)
             if success:
                 print(f"Successfully melted file to: {melted_path}")
                 return None
@@ -204,9 +285,14 @@ def main():
         def report_progress(percent, message):
             print(f"\rProgress: [{percent:3d}%] {message}", end="")
         
-        start_time = time.time()
-        savegame = load_save_file(save_path, callback=report_progress)
-        total_time = time.time() - start_time
+        tee_path = None
+        if args.keep_melted and is_binary_file(save_path):
+            tee_path = compressed_path(os.path.join(ensure_melted_saves_dir(), os.path.basename(save_path) + ".txt"),
+                                       args.compress)
+        
+        start_time = time.perf_counter()
+        savegame = load_save_file(save_path, callback=report_progress, tee_path=tee_path)
+        total_time = time.perf_counter() - start_time
         
         # If we get here, parsing is successful
         print(f"\nSuccessfully processed the save file in {total_time:.2f} seconds!")
@@ -229,7 +315,7 @@ def main():
                 output_path = f"{base_name}.json"
                 
             # Save the data
-            if save_to_json(savegame, output_path):
+            if save_to_json(savegame, output_path, mode='ndjson' if args.ndjson else 'compact'):
                 print(f"JSON data saved to: {output_path}")
             else:
                 print("Failed to save JSON data")
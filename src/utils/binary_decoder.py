@@ -0,0 +1,479 @@
+import os
+import re
+import mmap
+import time
+import struct
+import itertools
+import collections
+import logging
+from typing import Iterator, Optional
+
+import pyradox
+from pyradox.filetype.txt import lex_iter, parse_tree
+from src.utils import instrument
+from src.utils.compression import open_text
+
+logger = logging.getLogger(__name__)
+
+BINARY_MAGIC = b"HOI4bin"
+TEXT_MAGIC = "HOI4txt"
+
+TOKEN_TABLE_ENV = "HOI4_TOKENS"
+DEFAULT_TOKEN_TABLE = "hoi4_tokens.txt"
+
+# Control tokens
+EQUAL = 0x0001
+OPEN = 0x0003
+CLOSE = 0x0004
+
+# Value tokens, each followed by its payload
+I32 = 0x000c
+F32 = 0x000d
+BOOL = 0x000e
+QUOTED = 0x000f
+U32 = 0x0014
+UNQUOTED = 0x0017
+F64 = 0x0167
+RGB = 0x0243
+U64 = 0x029c
+I64 = 0x0317
+
+RESERVED_TOKENS = frozenset([EQUAL, OPEN, CLOSE, I32, F32, BOOL, QUOTED, U32, UNQUOTED, F64, RGB, U64, I64])
+
+# Dates are stored as i32 hours; only values in this year range are read as dates
+DATE_MIN_YEAR = 1800
+DATE_MAX_YEAR = 2200
+DATE_YEAR_OFFSET = 5000
+MONTH_DAYS = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+MONTH_STARTS = tuple(sum(MONTH_DAYS[:i]) for i in range(12))
+
+_U16 = struct.Struct('<H')
+_I32 = struct.Struct('<i')
+_U32 = struct.Struct('<I')
+_I64 = struct.Struct('<q')
+_U64 = struct.Struct('<Q')
+
+_NEEDS_QUOTES = re.compile(r'[\s=\{\}#"]')
+
+_token_tables = {}
+
+def find_token_table() -> Optional[str]:
+    """
+    Find the token table file.
+
+    The HOI4_TOKENS environment variable is checked first, then hoi4_tokens.txt
+    in the project directory.
+
+    Returns:
+        Path to the token table if found, None otherwise
+    """
+    env_path = os.environ.get(TOKEN_TABLE_ENV)
+    if env_path and os.path.exists(env_path):
+        return env_path
+    project_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    path = os.path.join(project_dir, DEFAULT_TOKEN_TABLE)
+    if os.path.exists(path):
+        return path
+    return None
+
+def load_token_table(path: Optional[str] = None) -> dict:
+    """
+    Load a token id -> name table.
+
+    Each line holds a token id (decimal or 0x hex) and its name, in either
+    order, separated by whitespace. Blank lines and lines starting with # are
+    ignored. Tables are cached per path, so a table can be swapped per game
+    version by pointing at a different file.
+
+    Args:
+        path: Path to the token table (optional, see find_token_table)
+
+    Returns:
+        Dictionary of {token_id: name}, empty if no table is found
+    """
+    if path is None:
+        path = find_token_table()
+        if path is None:
+            logger.warning("No token table found; field names will be written as __unknown_0x.... "
+                           f"Set {TOKEN_TABLE_ENV} or add {DEFAULT_TOKEN_TABLE} to the project directory.")
+            return {}
+    path = os.path.abspath(path)
+    if path in _token_tables:
+        return _token_tables[path]
+
+    tokens = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            parts = line.split()
+            if len(parts) != 2:
+                logger.warning(f"{path}, line {line_number}: expected 'id name', got {line!r}")
+                continue
+            try:
+                token_id, name = int(parts[0], 0), parts[1]
+            except ValueError:
+                try:
+                    token_id, name = int(parts[1], 0), parts[0]
+                except ValueError:
+                    logger.warning(f"{path}, line {line_number}: no token id in {line!r}")
+                    continue
+            tokens[token_id] = name
+
+    logger.info(f"Loaded {len(tokens)} tokens from {path}")
+    _token_tables[path] = tokens
+    return tokens
+
+def decode_date(value: int) -> Optional[str]:
+    """
+    Convert an i32 date value to a date string like "1936.1.1.12".
+
+    Returns:
+        The date string, or None if the value is outside the date range
+    """
+    if value <= 0:
+        return None
+    days, hour = divmod(value, 24)
+    year, day_of_year = divmod(days, 365)
+    year -= DATE_YEAR_OFFSET
+    if year < DATE_MIN_YEAR or year > DATE_MAX_YEAR:
+        return None
+    month = 0
+    while month < 11 and day_of_year >= MONTH_STARTS[month + 1]:
+        month += 1
+    return f"{year}.{month + 1}.{day_of_year - MONTH_STARTS[month] + 1}.{hour}"
+
+def encode_date(date: str) -> int:
+    """Convert a date string like "1936.1.1.12" to its i32 value (the inverse of decode_date)."""
+    parts = [int(part) for part in date.split('.')]
+    year, month, day = parts[:3]
+    hour = parts[3] if len(parts) > 3 else 0
+    days = (year + DATE_YEAR_OFFSET) * 365 + MONTH_STARTS[month - 1] + day - 1
+    return days * 24 + hour
+
+def _decode_string(raw: bytes) -> str:
+    try:
+        return raw.decode('utf-8')
+    except UnicodeDecodeError:
+        return raw.decode('cp1252')
+
+def iter_tokens(data, tokens: Optional[dict] = None) -> Iterator[tuple]:
+    """
+    Decode binary save data into lexer tokens.
+
+    The tokens are the (token_type, token_string, line_number) tuples produced
+    by pyradox's text lexer, so they can be fed to the parser without a text
+    intermediate. The line number is the byte offset of the token.
+
+    Args:
+        data: Binary save content (bytes or mmap), with or without the HOI4bin header
+        tokens: Token id -> name table (optional, see load_token_table)
+
+    Yields:
+        (token_type, token_string, byte_offset) tuples
+    """
+    if tokens is None:
+        tokens = {}
+    elif not RESERVED_TOKENS.isdisjoint(tokens):
+        tokens = {token_id: name for token_id, name in tokens.items() if token_id not in RESERVED_TOKENS}
+    pos = len(BINARY_MAGIC) if data[:len(BINARY_MAGIC)] == BINARY_MAGIC else 0
+    end = len(data)
+    u16 = _U16.unpack_from
+    i32 = _I32.unpack_from
+    u32 = _U32.unpack_from
+    i64 = _I64.unpack_from
+    u64 = _U64.unpack_from
+
+    while pos + 2 <= end:
+        offset = pos
+        token, = u16(data, pos)
+        pos += 2
+
+        # Field names are the most common tokens; the table never holds the reserved ids below
+        name = tokens.get(token)
+        if name is not None:
+            yield 'str', name, offset
+        elif token == EQUAL:
+            yield 'operator', '=', offset
+        elif token == OPEN:
+            yield 'begin', '{', offset
+        elif token == CLOSE:
+            yield 'end', '}', offset
+        elif token == I32:
+            value, = i32(data, pos)
+            pos += 4
+            date = None
+            # Dates only occur as values, never as keys
+            if pos + 2 > end or u16(data, pos)[0] != EQUAL:
+                date = decode_date(value)
+            if date is None:
+                yield 'int', str(value), offset
+            else:
+                yield 'time', date, offset
+        elif token == QUOTED or token == UNQUOTED:
+            length, = u16(data, pos)
+            pos += 2
+            text = _decode_string(bytes(data[pos:pos + length]))
+            pos += length
+            if token == QUOTED:
+                yield 'str', '"' + text + '"', offset
+            else:
+                yield 'str', text, offset
+        elif token == F32:
+            value, = i32(data, pos)
+            pos += 4
+            yield 'float', '%.3f' % (value / 1000), offset
+        elif token == U32:
+            value, = u32(data, pos)
+            pos += 4
+            yield 'int', str(value), offset
+        elif token == BOOL:
+            yield 'bool', 'yes' if data[pos] else 'no', offset
+            pos += 1
+        elif token == F64:
+            value, = i64(data, pos)
+            pos += 8
+            yield 'float', '%.5f' % (value / 32768), offset
+        elif token == U64:
+            value, = u64(data, pos)
+            pos += 8
+            yield 'int', str(value), offset
+        elif token == I64:
+            value, = i64(data, pos)
+            pos += 8
+            yield 'int', str(value), offset
+        elif token == RGB:
+            # Followed by { r g b }, which decode as ordinary tokens
+            yield 'str', 'rgb', offset
+        else:
+            yield 'str', f"__unknown_0x{token:04x}", offset
+
+    if pos < end:
+        logger.warning(f"Ignoring {end - pos} trailing byte(s) at offset {pos}")
+
+def iter_text(token_iter: Iterator[tuple]) -> Iterator[str]:
+    """
+    Format lexer tokens as save text, one assignment per line.
+
+    Yields:
+        Chunks of text
+    """
+    depth = 0
+    after_operator = False
+    pending = None
+    # A trailing sentinel gives every real token a lookahead
+    for token in itertools.chain(token_iter, [(None, None, None)]):
+        if pending is None:
+            pending = token
+            continue
+        token_type, token_string, _ = pending
+        next_type = token[0]
+        pending = token
+
+        if token_type == 'operator':
+            yield token_string
+            after_operator = True
+            continue
+        if token_type == 'begin':
+            yield '{\n' if after_operator else '\t' * depth + '{\n'
+            depth += 1
+        elif token_type == 'end':
+            depth = max(depth - 1, 0)
+            yield '\t' * depth + '}\n'
+        else:
+            if token_type == 'str' and not token_string.startswith('"') and _NEEDS_QUOTES.search(token_string):
+                token_string = '"' + token_string + '"'
+            if after_operator:
+                yield token_string + '\n'
+            elif next_type == 'operator':
+                yield '\t' * depth + token_string
+            else:
+                yield '\t' * depth + token_string + '\n'
+        after_operator = False
+
+def tee_text(token_iter: Iterator[tuple], write) -> Iterator[tuple]:
+    """
+    Pass tokens through unchanged while writing them as save text.
+
+    Args:
+        token_iter: Lexer tokens, e.g. from iter_tokens
+        write: Called with each chunk of text (e.g. the write method of a file)
+
+    Yields:
+        The tokens of token_iter
+    """
+    queue = collections.deque()
+
+    def recorded():
+        for token in token_iter:
+            queue.append(token)
+            yield token
+
+    for chunk in iter_text(recorded()):
+        write(chunk)
+        while queue:
+            yield queue.popleft()
+    while queue:
+        yield queue.popleft()
+
+def _open_binary(file_path: str):
+    """Map a binary save file into memory (empty files are read normally)."""
+    f = open(file_path, 'rb')
+    try:
+        if os.fstat(f.fileno()).st_size == 0:
+            return f, b""
+        return f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except Exception:
+        f.close()
+        raise
+
+def _check_magic(data, file_path: str):
+    if data[:2] == b"PK":
+        raise ValueError(f"{file_path} is a compressed save; save it uncompressed to decode it")
+
+def decode_to_text(file_path: str, output_path: str, tokens: Optional[dict] = None,
+                   compression: Optional[str] = None, timings: Optional[dict] = None) -> str:
+    """
+    Decode a binary save file to a text save file.
+
+    The file is memory-mapped and decoded as a stream, so memory use does not
+    grow with the save size.
+
+    Args:
+        file_path: Path to the binary save
+        output_path: Path of the text file to write
+        tokens: Token id -> name table (optional, defaults to load_token_table())
+        compression: Compress the text with 'gzip', 'lzma' or 'zstd' (optional,
+            defaults to the compression implied by the output path's suffix)
+        timings: Dictionary to add the seconds spent writing to, under 'write' (optional)
+
+    Returns:
+        The output path
+    """
+    if tokens is None:
+        tokens = load_token_table()
+    f, data = _open_binary(file_path)
+    try:
+        _check_magic(data, file_path)
+        output_dir = os.path.dirname(output_path)
+        if output_dir and not os.path.exists(output_dir):
+            os.makedirs(output_dir)
+        with open_text(output_path, 'w', compression, newline='\n') as out:
+            out.write(TEXT_MAGIC + '\n')
+            # Write in batches, so timing the writes costs next to nothing
+            write_seconds = 0.0
+            batch = []
+            for chunk in iter_text(iter_tokens(data, tokens)):
+                batch.append(chunk)
+                if len(batch) >= 4096:
+                    start = time.perf_counter()
+                    out.write(''.join(batch))
+                    write_seconds += time.perf_counter() - start
+                    batch.clear()
+            start = time.perf_counter()
+            out.write(''.join(batch))
+            out.flush()
+            write_seconds += time.perf_counter() - start
+            if timings is not None:
+                timings['write'] = timings.get('write', 0.0) + write_seconds
+    finally:
+        if isinstance(data, mmap.mmap):
+            data.close()
+        f.close()
+    return output_path
+
+def parse_binary_file(file_path: str, tokens: Optional[dict] = None, tee_path: Optional[str] = None):
+    """
+    Parse a binary save file into a pyradox Tree without a text intermediate.
+
+    Args:
+        file_path: Path to the binary save
+        tokens: Token id -> name table (optional, defaults to load_token_table())
+        tee_path: Also write the melted text here while parsing, compressed if the
+            name ends in .gz, .xz or .zst (optional)
+
+    Returns:
+        Parsed save (pyradox Tree)
+    """
+    if tokens is None:
+        tokens = load_token_table()
+    f, data = _open_binary(file_path)
+    tee = None
+    try:
+        _check_magic(data, file_path)
+        token_iter = iter_tokens(data, tokens)
+        if tee_path is not None:
+            tee_dir = os.path.dirname(tee_path)
+            if tee_dir and not os.path.exists(tee_dir):
+                os.makedirs(tee_dir)
+            tee = open_text(tee_path, 'w', newline='\n')
+            tee.write(TEXT_MAGIC + '\n')
+            token_iter = tee_text(token_iter, tee.write)
+        with instrument.span("decode"):
+            token_data = list(token_iter)
+        instrument.count("bytes.decoded", len(data))
+        instrument.count("tokens", len(token_data))
+    finally:
+        if tee is not None:
+            tee.close()
+        if isinstance(data, mmap.mmap):
+            data.close()
+        f.close()
+    with instrument.span("parse"):
+        return parse_tree(token_data, file_path)
+
+def encode_text(text: str, tokens: Optional[dict] = None) -> bytes:
+    """
+    Encode save text in the binary format. Used to build fixtures and benchmarks.
+
+    Keys found in the token table are written as token ids, other unquoted
+    strings as unquoted string values.
+
+    Args:
+        text: Save text
+        tokens: Token id -> name table (optional)
+
+    Returns:
+        Binary save content including the HOI4bin header
+    """
+    ids = {name: token_id for token_id, name in (tokens or {}).items()}
+    out = bytearray(BINARY_MAGIC)
+    pack_u16 = _U16.pack
+    for token_type, token_string, _ in lex_iter(text.splitlines(), "<string>"):
+        if token_type == 'comment' or token_string == TEXT_MAGIC:
+            continue
+        if token_type == 'operator':
+            out += pack_u16(EQUAL)
+        elif token_type == 'begin':
+            out += pack_u16(OPEN)
+        elif token_type == 'end':
+            out += pack_u16(CLOSE)
+        elif token_type == 'int':
+            value = int(token_string)
+            if -2 ** 31 <= value < 2 ** 31:
+                out += pack_u16(I32) + _I32.pack(value)
+            else:
+                out += pack_u16(I64) + _I64.pack(value)
+        elif token_type == 'float':
+            value = float(token_string)
+            # Values with up to 3 decimals fit the i32 / 1000 format, others need the i64 / 32768 one
+            if round(value, 3) == value and -2 ** 31 <= value * 1000 < 2 ** 31:
+                out += pack_u16(F32) + _I32.pack(round(value * 1000))
+            else:
+                out += pack_u16(F64) + _I64.pack(round(value * 32768))
+        elif token_type == 'bool':
+            out += pack_u16(BOOL) + bytes([token_string == 'yes'])
+        elif token_type == 'time':
+            out += pack_u16(I32) + _I32.pack(encode_date(token_string))
+        elif token_string.startswith('"'):
+            raw = pyradox.token.make_string(token_string).encode('utf-8')
+            out += pack_u16(QUOTED) + pack_u16(len(raw)) + raw
+        elif token_string.lower() == 'rgb':
+            out += pack_u16(RGB)
+        elif token_string in ids:
+            out += pack_u16(ids[token_string])
+        else:
+            raw = token_string.encode('utf-8')
+            out += pack_u16(UNQUOTED) + pack_u16(len(raw)) + raw
+    return bytes(out)
@@ -0,0 +1,277 @@
+import itertools
+from typing import Iterable, Optional
+
+import numpy as np
+from pyradox.datatype.time import DAYS_PER_MONTH_0, DAYS_PER_YEAR, HOURS_PER_DAY
+
+from src.utils.mio_engine import save_date_key
+
+# Days before each month in the game calendar (no leap years)
+_MONTH_STARTS = [0] + list(itertools.accumulate(DAYS_PER_MONTH_0))
+
+def unit_count(units) -> int:
+    """Units of an entry as a number (0 for "N/A" and other non-numbers)."""
+    return int(units) if str(units).isdigit() else 0
+
+def _number(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+def format_change(delta: int) -> str:
+    """A units change as shown in the comparison view: +5, -3 or 0."""
+    return f"+{delta}" if delta > 0 else str(delta)
+
+def save_day(save_date: Optional[str]) -> float:
+    """
+    Days since 1.1.1 of a save date like 1939.11.7.1, in the game calendar.
+
+    Returns:
+        Day number (hours as fractions), or NaN for unknown dates
+    """
+    try:
+        parts = [int(part) for part in save_date.split(".")]
+        year, month, day = parts[:3]
+        hour = parts[3] if len(parts) > 3 else 1
+        return (year - 1) * DAYS_PER_YEAR + _MONTH_STARTS[month - 1] + day - 1 + (hour - 1) / HOURS_PER_DAY
+    except (AttributeError, ValueError, IndexError):
+        return float("nan")
+
+class _OrgSeries:
+    """
+    One organisation's history entries across the saves that have it, as arrays.
+
+    Entries are aligned between saves by (equipment_id, equipment_type), the
+    k-th entry of a key in one save with the k-th entry of that key in the
+    next. Each aligned position is a column (slot) of the units matrix, each
+    save a row, so the changes of every entry are one subtraction of adjacent rows.
+    """
+
+    def __init__(self, entry_lists: list):
+        """
+        Args:
+            entry_lists: The organisation's entry lists, one per save that has it, in save order
+        """
+        slots = {}  # (equipment_id, equipment_type, occurrence) -> column
+        self.entry_slots = []
+        self.unnamed = []  # per save: mask of entries without equipment, which never show a change
+        cells = []  # (row, slot, units)
+        for row, entries in enumerate(entry_lists):
+            occurrences = {}
+            row_slots = np.empty(len(entries), dtype=np.int64)
+            for position, entry in enumerate(entries):
+                key = (entry.get("equipment_id", "N/A"), entry.get("equipment_type", "N/A"))
+                occurrence = occurrences.get(key, 0)
+                occurrences[key] = occurrence + 1
+                slot = slots.setdefault(key + (occurrence,), len(slots))
+                row_slots[position] = slot
+                cells.append((row, slot, unit_count(entry.get("units", "0"))))
+            self.entry_slots.append(row_slots)
+            self.unnamed.append(np.array([entry.get("equipment_id", "N/A") == "N/A" for entry in entries], dtype=bool))
+
+        units = np.zeros((len(entry_lists), len(slots)), dtype=np.int64)
+        present = np.zeros(units.shape, dtype=bool)
+        if cells:
+            rows, columns, values = np.array(cells, dtype=np.int64).T
+            units[rows, columns] = values
+            present[rows, columns] = True
+        # Change from the previous save, valid where the entry exists in both
+        self.deltas = units[1:] - units[:-1]
+        self.matched = present[1:] & present[:-1]
+
+    def changes(self, row: int) -> list:
+        """Change strings of the entries of one save ("" for the first save, new equipment and no equipment)."""
+        slots = self.entry_slots[row]
+        if row == 0:
+            return [""] * len(slots)
+        deltas = self.deltas[row - 1, slots]
+        shown = self.matched[row - 1, slots] & ~self.unnamed[row]
+        return [format_change(int(delta)) if show else "" for delta, show in zip(deltas, shown)]
+
+class ComparisonData:
+    """
+    Production entries of many saves by organisation, with the units change of
+    each entry since the previous save that had the organisation.
+
+    Changes are computed once, when the data is built, so views can show any
+    organisation or save without recomputing them.
+    """
+
+    def __init__(self, save_data: dict):
+        """
+        Args:
+            save_data: {save_date: {organisation: [entry dicts]}} as collected by the MIO reader
+        """
+        self.save_dates = sorted(save_data, key=save_date_key)
+        self.organisations = sorted({org for orgs in save_data.values() for org in orgs})
+        self._save_data = save_data
+        self._series = {}  # organisation -> (_OrgSeries, {save_date: row})
+        for org in self.organisations:
+            dates = [save_date for save_date in self.save_dates if org in save_data[save_date]]
+            series = _OrgSeries([save_data[save_date][org] for save_date in dates])
+            self._series[org] = (series, {save_date: row for row, save_date in enumerate(dates)})
+
+    def has(self, org: str, save_date: str) -> bool:
+        """Whether a save has the organisation."""
+        return save_date in self._series[org][1]
+
+    def entries(self, org: str, save_date: str) -> list:
+        """The organisation's entries in one save ([] if the save doesn't have it)."""
+        return self._save_data[save_date].get(org, [])
+
+    def changes(self, org: str, save_date: str) -> Optional[list]:
+        """
+        Units change of each of the organisation's entries in one save.
+
+        Returns:
+            List of change strings (see _OrgSeries.changes), or None if the save doesn't have the organisation
+        """
+        series, rows = self._series[org]
+        row = rows.get(save_date)
+        return series.changes(row) if row is not None else None
+
+def _history_entries(org_data: dict) -> list:
+    """An organisation's history entries (a single entry is converted as a dict, not a list)."""
+    history = org_data.get('history', [])
+    if isinstance(history, dict):
+        return [history]
+    return [entry for entry in history if isinstance(entry, dict)] if isinstance(history, list) else []
+
+class OrgTimeSeries:
+    """
+    Industrial organisations of many saves, aligned into organisation × save matrices.
+
+    Saves are put in date order and organisations are aligned by (tag, name),
+    equipment lines by (organisation, equipment id, equipment type). Only the
+    numbers are kept: one float per cell of each metric, NaN where a save
+    doesn't have the organisation, so memory grows with organisations × saves
+    and not with the size of the saves. Changes and rates of any metric are one
+    array operation over all organisations and saves.
+    """
+
+    # Metrics of organisations: total units of their history, funds and size
+    METRICS = ("units", "funds", "size")
+    # Units per equipment line of an organisation
+    EQUIPMENT = "equipment"
+    # value: as in the save, change: since the previous save, rate: change per day since the previous save
+    MODES = ("value", "change", "rate")
+
+    def __init__(self, saves: Iterable[tuple]):
+        """
+        Args:
+            saves: (label, save_date, organisations) per save in any order, organisations being
+                {tag: {org_name: org_data}} with org_data as converted from the save (history, funds, size).
+                Read one at a time and not kept.
+        """
+        org_rows = {}  # (tag, name) -> row
+        equipment_rows = {}  # (org row, equipment_id, equipment_type) -> row
+        # Cells as flat columns: row, save and value(s)
+        cells = ([], [], [], [], [])  # row, save, units, funds, size
+        equipment_cells = ([], [], [])  # row, save, units
+        latest = {}  # org row -> (save order key, save, equipment_id, equipment_type) of its last history entry
+        labels = []
+        save_dates = []
+        for save, (label, save_date, organisations) in enumerate(saves):
+            labels.append(label)
+            save_dates.append(save_date)
+            save_key = (save_date_key(save_date), label)
+            for tag, orgs in organisations.items():
+                for org_name, org_data in orgs.items():
+                    if not isinstance(org_data, dict):
+                        continue
+                    row = org_rows.setdefault((tag, org_name), len(org_rows))
+                    total = 0
+                    key = None
+                    for entry in _history_entries(org_data):
+                        equipment = entry.get('equipment')
+                        data = entry.get('data') or {}
+                        if not isinstance(equipment, dict) or not isinstance(data, dict):
+                            continue
+                        units = data.get('units', 0)
+                        if type(units) is not int:
+                            units = unit_count(units)
+                        total += units
+                        key = (row, equipment.get('id'), equipment.get('type'))
+                        equipment_cells[0].append(equipment_rows.setdefault(key, len(equipment_rows)))
+                        equipment_cells[1].append(save)
+                        equipment_cells[2].append(units)
+                    if key is not None and (row not in latest or latest[row][0] <= save_key):
+                        latest[row] = (save_key, save) + key[1:]
+                    for column, value in zip(cells, (row, save, total, _number(org_data.get('funds')),
+                                                     _number(org_data.get('size')))):
+                        column.append(value)
+
+        # Columns in date order; sources[column] is the position of that save in the input
+        order = sorted(range(len(labels)), key=lambda save: (save_date_key(save_dates[save]), labels[save]))
+        column_of = np.empty(len(labels), dtype=np.int64)
+        column_of[order] = np.arange(len(labels))
+        self.sources = order
+        self.labels = [labels[save] for save in order]
+        self.save_dates = [save_dates[save] for save in order]
+        self.days = np.array([save_day(save_date) for save_date in self.save_dates], dtype=np.float64)
+
+        self.orgs = list(org_rows)
+        self.equipment = [(self.orgs[row], equipment_id, equipment_type)
+                          for row, equipment_id, equipment_type in equipment_rows]
+        # (column, equipment_id, equipment_type) of each organisation's last history entry, None without history
+        self.latest_equipment = [None] * len(self.orgs)
+        for row, (_, save, equipment_id, equipment_type) in latest.items():
+            self.latest_equipment[row] = (int(column_of[save]), equipment_id, equipment_type)
+        self._values = {}
+        rows = np.array(cells[0], dtype=np.int64)
+        columns = column_of[np.array(cells[1], dtype=np.int64)]
+        for metric, values in zip(self.METRICS, cells[2:]):
+            matrix = np.full((len(self.orgs), len(self.labels)), np.nan)
+            matrix[rows, columns] = values
+            self._values[metric] = matrix
+
+        # Several lines of one equipment in a save add up
+        rows = np.array(equipment_cells[0], dtype=np.int64)
+        columns = column_of[np.array(equipment_cells[1], dtype=np.int64)]
+        matrix = np.full((len(self.equipment), len(self.labels)), np.nan)
+        matrix[rows, columns] = 0
+        np.add.at(matrix, (rows, columns), np.array(equipment_cells[2], dtype=np.float64))
+        self._values[self.EQUIPMENT] = matrix
+
+        # Last save with each organisation / equipment line, e.g. to name it from that save
+        self.last_seen = {metric: self._last_seen(matrix) for metric, matrix in self._values.items()}
+
+    @staticmethod
+    def _last_seen(matrix: np.ndarray) -> np.ndarray:
+        """Column of the last save with each row (-1 for none)."""
+        present = ~np.isnan(matrix)
+        if not matrix.shape[1]:
+            return np.full(matrix.shape[0], -1)
+        last = matrix.shape[1] - 1 - np.argmax(present[:, ::-1], axis=1)
+        return np.where(present.any(axis=1), last, -1)
+
+    def row_keys(self, metric: str) -> list:
+        """Keys of the rows of a metric's matrices: (tag, name), or ((tag, name), equipment_id, equipment_type)."""
+        return self.equipment if metric == self.EQUIPMENT else self.orgs
+
+    def matrix(self, metric: str, mode: str = "value") -> np.ndarray:
+        """
+        A metric of every row in every save.
+
+        Args:
+            metric: One of METRICS or EQUIPMENT
+            mode: One of MODES
+
+        Returns:
+            Rows × saves array, NaN where a save (or, for changes and rates, the previous save) lacks the row.
+            Rates are NaN where the dates of the two saves are unknown or not increasing.
+        """
+        values = self._values[metric]
+        if mode == "value":
+            return values
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown mode {mode!r}, expected one of {', '.join(self.MODES)}")
+        changes = np.full(values.shape, np.nan)
+        changes[:, 1:] = values[:, 1:] - values[:, :-1]
+        if mode == "change":
+            return changes
+        gaps = np.full(len(self.days), np.nan)
+        gaps[1:] = np.diff(self.days)
+        gaps[~(gaps > 0)] = np.nan
+        return changes / gaps
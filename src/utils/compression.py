@@ -0,0 +1,148 @@
+import io
+import os
+import gzip
+import lzma
+import shutil
+import logging
+from typing import Optional
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# File suffix of each supported compression
+COMPRESSION_SUFFIXES = {
+    'gzip': '.gz',
+    'lzma': '.xz',
+    'zstd': '.zst',
+}
+
+# Leading bytes of each compressed format
+COMPRESSION_MAGIC = {
+    'gzip': b'\x1f\x8b',
+    'lzma': b'\xfd7zXZ\x00',
+    'zstd': b'\x28\xb5\x2f\xfd',
+}
+
+# Levels that favour speed: melted saves are highly repetitive, so higher levels gain little
+COMPRESSION_LEVELS = {
+    'gzip': 6,
+    'lzma': 1,
+    'zstd': 3,
+}
+
+def available_compressions() -> list:
+    """List the compressions that can be used here (zstd needs the zstandard package)."""
+    return [name for name in COMPRESSION_SUFFIXES if name != 'zstd' or zstandard is not None]
+
+def preferred_compression() -> str:
+    """The fastest available compression: zstd if installed, otherwise gzip."""
+    return 'zstd' if zstandard is not None else 'gzip'
+
+def detect_compression(file_path: str) -> Optional[str]:
+    """
+    Detect the compression of a file from its first bytes.
+
+    Args:
+        file_path: Path to the file
+
+    Returns:
+        Name of the compression, or None for an uncompressed file
+    """
+    with open(file_path, 'rb') as f:
+        header = f.read(6)
+    for name, magic in COMPRESSION_MAGIC.items():
+        if header.startswith(magic):
+            return name
+    return None
+
+def compression_from_suffix(file_path: str) -> Optional[str]:
+    """Get the compression implied by a file name, or None."""
+    for name, suffix in COMPRESSION_SUFFIXES.items():
+        if file_path.endswith(suffix):
+            return name
+    return None
+
+def compressed_path(file_path: str, compression: Optional[str]) -> str:
+    """Add the suffix of a compression to a path (no change for None)."""
+    if compression is None:
+        return file_path
+    return file_path + COMPRESSION_SUFFIXES[compression]
+
+def check_compression(compression: str):
+    """Raise ValueError if a compression is unknown or its package is not installed."""
+    if compression not in COMPRESSION_SUFFIXES:
+        raise ValueError(f"Unknown compression '{compression}', expected one of {', '.join(COMPRESSION_SUFFIXES)}")
+    if compression == 'zstd' and zstandard is None:
+        raise ValueError("zstd compression needs the zstandard package (pip install zstandard)")
+
+def open_binary(file_path: str, mode: str = 'rb', compression: Optional[str] = None):
+    """
+    Open a possibly compressed file as a binary stream.
+
+    Args:
+        file_path: Path to the file
+        mode: 'rb' or 'wb'
+        compression: Compression to write with (optional, defaults to the one implied by
+            the file name). When reading, the compression is detected from the content.
+
+    Returns:
+        Binary file object; closing it also closes the underlying file
+    """
+    if mode == 'rb':
+        compression = detect_compression(file_path)
+    elif compression is None:
+        compression = compression_from_suffix(file_path)
+
+    if compression is None:
+        return open(file_path, mode, buffering=1024 * 1024)
+    check_compression(compression)
+    if compression == 'gzip':
+        return gzip.open(file_path, mode, compresslevel=COMPRESSION_LEVELS['gzip']) if mode == 'wb' \
+            else gzip.open(file_path, mode)
+    if compression == 'lzma':
+        return lzma.open(file_path, mode, preset=COMPRESSION_LEVELS['lzma']) if mode == 'wb' \
+            else lzma.open(file_path, mode)
+    if mode == 'wb':
+        return zstandard.ZstdCompressor(level=COMPRESSION_LEVELS['zstd']).stream_writer(open(file_path, 'wb'))
+    return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(open(file_path, 'rb')))
+
+def open_text(file_path: str, mode: str = 'r', compression: Optional[str] = None,
+              encoding: str = 'utf-8', errors: Optional[str] = None, newline: Optional[str] = None):
+    """
+    Open a possibly compressed file as a text stream.
+
+    Args:
+        file_path: Path to the file
+        mode: 'r' or 'w'
+        compression: Compression to write with, as for open_binary (optional)
+        encoding: Text encoding
+        errors: Error handling of the text encoding (optional)
+        newline: Newline handling, as for open (optional)
+
+    Returns:
+        Text file object
+    """
+    binary = open_binary(file_path, mode + 'b', compression)
+    return io.TextIOWrapper(binary, encoding=encoding, errors=errors, newline=newline)
+
+def compress_file(source_path: str, output_path: str, compression: Optional[str] = None) -> str:
+    """
+    Copy a file through a compressor without reading it into memory.
+
+    Args:
+        source_path: Path to the uncompressed file
+        output_path: Path of the compressed copy
+        compression: Compression to use (optional, defaults to the one implied by output_path)
+
+    Returns:
+        output_path
+    """
+    with open(source_path, 'rb') as source, open_binary(output_path, 'wb', compression) as output:
+        shutil.copyfileobj(source, output, 1024 * 1024)
+    logger.info(f"Compressed {source_path} ({os.path.getsize(source_path)} bytes) to {output_path} "
+                f"({os.path.getsize(output_path)} bytes)")
+    return output_path
@@ -0,0 +1,189 @@
+import os
+import json
+import logging
+import threading
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Version of the index sidecar written next to a save's cache entry
+INDEX_VERSION = 1
+
+class EquipmentIndex:
+    """
+    Equipment names indexed by (id, type) and by id, kept up to date as the mappings of each save are merged.
+
+    Lookups are dictionary hits instead of scans over every known equipment name.
+    """
+
+    def __init__(self, mappings: Optional[dict] = None, localisation: Optional[dict] = None):
+        """
+        Args:
+            mappings: Initial name -> (id, type) mappings (optional)
+            localisation: Lower-case localisation key -> text, for display names (optional, see src/utils/localisation.py)
+        """
+        self.mappings = {}  # name -> (id, type)
+        self.by_key = {}  # (id, type) -> [names]
+        self.by_id = {}  # id -> [names]
+        self.display_names = {}  # name -> localised name
+        self.localisation = localisation
+        if mappings:
+            self.update(mappings)
+
+    def update(self, mappings: dict):
+        """
+        Merge name -> (id, type) mappings; a name seen again with a new id replaces its old entry.
+
+        Args:
+            mappings: Mappings as returned by find_equipment_mappings
+        """
+        for name, key in mappings.items():
+            old_key = self.mappings.get(name)
+            if old_key == key:
+                continue
+            if old_key is not None:
+                self.by_key[old_key].remove(name)
+                self.by_id[old_key[0]].remove(name)
+            self.mappings[name] = key
+            self._index(name, key)
+
+    def add(self, name: str, key: tuple):
+        """Index another (id, type) of a name, keeping the ones it already has (a save can list several)."""
+        if name not in self.mappings:
+            self.mappings[name] = key
+        elif name in self.by_key.get(key, ()):
+            return
+        self._index(name, key)
+
+    def _index(self, name: str, key: tuple):
+        self.by_key.setdefault(key, []).append(name)
+        self.by_id.setdefault(key[0], []).append(name)
+        if self.localisation and name.lower() in self.localisation:
+            self.display_names[name] = self.localisation[name.lower()]
+
+    def lookup(self, equipment_id, equipment_type) -> Optional[str]:
+        """
+        Look up an equipment name by ID and type, falling back to ID only.
+
+        Args:
+            equipment_id: Equipment ID (int or numeric string)
+            equipment_type: Equipment type (int or numeric string)
+
+        Returns:
+            The equipment name, or None if unknown
+        """
+        try:
+            equipment_id = int(equipment_id)
+            equipment_type = int(equipment_type)
+        except (TypeError, ValueError):
+            return None
+        names = self.by_key.get((equipment_id, equipment_type)) or self.by_id.get(equipment_id)
+        return names[0] if names else None
+
+    def __len__(self):
+        return len(self.mappings)
+
+    def display_name(self, equipment_id, equipment_type) -> Optional[str]:
+        """
+        The localised name of equipment (its script name when it has no localisation), or None if unknown.
+        """
+        name = self.lookup(equipment_id, equipment_type)
+        return self.display_names.get(name, name) if name is not None else None
+
+    @classmethod
+    def from_equipments(cls, equipments: dict, localisation: Optional[dict] = None) -> "EquipmentIndex":
+        """
+        Index the equipments section of a parsed save ({name: {id: {id, type}}} or {name: [...]}).
+
+        Args:
+            equipments: The section, as converted by to_python or loaded from JSON
+            localisation: See __init__ (optional)
+        """
+        index = cls(localisation=localisation)
+        for name, items in (equipments or {}).items():
+            for item in items if isinstance(items, list) else [items]:
+                item_id = item.get("id") if isinstance(item, dict) else None
+                if not isinstance(item_id, dict):
+                    continue
+                try:
+                    index.add(name, (int(item_id.get("id")), int(item_id.get("type"))))
+                except (TypeError, ValueError):
+                    continue
+        return index
+
+    def to_json(self) -> dict:
+        return {
+            "version": INDEX_VERSION,
+            "equipment": [[name, key[0], key[1], self.display_names.get(name)]
+                          for key, names in self.by_key.items() for name in names],
+        }
+
+    @classmethod
+    def from_json(cls, data: dict) -> "EquipmentIndex":
+        """
+        Rebuild an index saved with to_json.
+
+        Raises:
+            ValueError: If it was saved in another format version
+        """
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported equipment index version {data.get('version')}")
+        index = cls()
+        for name, equipment_id, equipment_type, display in data["equipment"]:
+            index.add(name, (equipment_id, equipment_type))
+            if display is not None:
+                index.display_names[name] = display
+        return index
+
+# Indexes of the saves loaded in this process by cache entry, shared by every view
+_save_indexes = {}
+_lock = threading.Lock()
+
+def index_path(cache_path: str) -> str:
+    """Path of the index sidecar of a save's cache entry (cache/<hash>.json -> cache/<hash>.equipment.json)."""
+    return os.path.splitext(cache_path)[0] + ".equipment.json"
+
+def save_equipment_index(cache_path: Optional[str], equipments: dict,
+                         localisation: Optional[dict] = None) -> EquipmentIndex:
+    """
+    The equipment index of a loaded save, built once per save.
+
+    Comes from memory if another view already loaded the save, then from the
+    sidecar of its cache entry, and is otherwise built from the equipments
+    section and written to the sidecar.
+
+    Args:
+        cache_path: The save's cache entry (None for data without one, which is indexed but not stored)
+        equipments: The save's equipments section
+        localisation: See EquipmentIndex (optional)
+
+    Returns:
+        EquipmentIndex
+    """
+    if cache_path is None:
+        return EquipmentIndex.from_equipments(equipments, localisation)
+    with _lock:
+        index = _save_indexes.get(cache_path)
+        if index is not None:
+            return index
+        sidecar = index_path(cache_path)
+        if os.path.exists(sidecar):
+            try:
+                with open(sidecar, encoding='utf-8') as f:
+                    index = EquipmentIndex.from_json(json.load(f))
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Rebuilding equipment index {sidecar}: {e}")
+        if index is None:
+            index = EquipmentIndex.from_equipments(equipments, localisation)
+            try:
+                with open(sidecar, 'w', encoding='utf-8') as f:
+                    json.dump(index.to_json(), f)
+            except OSError as e:
+                logger.warning(f"Couldn't save equipment index {sidecar}: {e}")
+        _save_indexes[cache_path] = index
+        return index
+
+def forget_save_indexes():
+    """Drop the indexes kept in memory (e.g. when the cache is cleared)."""
+    with _lock:
+        _save_indexes.clear()
@@ -0,0 +1,250 @@
+import os
+import re
+import mmap
+import logging
+from typing import Iterable, Optional
+
+from src.utils import instrument
+from src.utils.compression import detect_compression, open_text
+from src.utils.mio_scanner import scan_organisations
+
+logger = logging.getLogger(__name__)
+
+# Header sizes searched for header fields, smallest first (they are within the first few lines)
+HEADER_SIZES = (1000, 5000)
+
+# Pattern for text_text={ followed by nested id structure with type=70
+_EQUIPMENT = re.compile(r'([a-zA-Z0-9_]+)=\{\s*id=\{\s*id=(\d+)\s*type=70\s*\}')
+
+_DATE_PATTERNS = [re.compile(pattern) for pattern in (
+    r'date\s*=\s*"([^"]+)"',  # Standard date format
+    r'date\s*=\s*(\d{4}\.\d{1,2}\.\d{1,2})',  # Date without quotes
+    r'date\s*=\s*(\d{4})',  # Just the year
+    r'date\s*=\s*(\d{4}\.\d{1,2})',  # Year and month
+)]
+_PLAYER = re.compile(r'player\s*=\s*"([^"]+)"')
+
+class SaveBuffer:
+    """
+    A melted save opened once and shared by every extractor.
+
+    Uncompressed files are memory-mapped: the header can be read without
+    touching the rest of the file, and the full text is decoded straight from
+    the mapping on first use. Compressed files are decompressed into memory.
+    """
+
+    def __init__(self, file_path: Optional[str] = None, text: Optional[str] = None):
+        """
+        Args:
+            file_path: Path to the (melted, optionally compressed) save
+            text: Save text already in memory, instead of a file
+        """
+        self.file_path = file_path
+        self._text = text
+        self._file = None
+        self._map = None
+        if text is None:
+            if detect_compression(file_path) is not None:
+                with instrument.span("read"), open_text(file_path, encoding='utf_8_sig', errors='ignore') as f:
+                    self._text = f.read()
+                instrument.count("bytes.read", len(self._text))
+            else:
+                self._file = open(file_path, 'rb')
+                if os.fstat(self._file.fileno()).st_size == 0:
+                    self._text = ""
+                else:
+                    self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def head(self, size: int) -> str:
+        """The first size bytes of the save as text, without reading the rest."""
+        if self._text is not None or self._map is None:
+            return self.text[:size]
+        return self._map[:size].decode('utf_8_sig', errors='ignore')
+
+    @property
+    def text(self) -> str:
+        """The whole save as text, decoded once."""
+        if self._text is None:
+            with instrument.span("read"):
+                self._text = str(memoryview(self._map), 'utf_8_sig', 'ignore') if self._map is not None else ""
+            instrument.count("bytes.read", len(self._map) if self._map is not None else 0)
+        return self._text
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class Extractor:
+    """
+    Pulls one kind of data out of a save buffer.
+
+    Subclasses set name (the key of their result) and implement extract().
+    Extractors that only need the header should use buffer.head() so that the
+    whole save is not decoded on their behalf.
+    """
+
+    name = "base"
+
+    def extract(self, buffer: SaveBuffer):
+        raise NotImplementedError
+
+    def cache_key(self) -> str:
+        """
+        Identifies what this extractor returns, for caches of results built from it.
+
+        Subclasses whose results depend on their arguments must include them.
+        """
+        return repr(self)
+
+    def __repr__(self):
+        return f"{type(self).__name__}()"
+
+class HeaderExtractor(Extractor):
+    """Save date and player tag from the header: {'date': str or None, 'player': str or None}"""
+
+    name = "header"
+
+    def extract(self, buffer: SaveBuffer) -> dict:
+        result = {'date': None, 'player': None}
+        for header_size in HEADER_SIZES:
+            header = buffer.head(header_size)
+            if result['date'] is None:
+                for pattern in _DATE_PATTERNS:
+                    match = pattern.search(header)
+                    if match:
+                        result['date'] = match.group(1)
+                        break
+            if result['player'] is None:
+                match = _PLAYER.search(header)
+                if match:
+                    result['player'] = match.group(1)
+            if None not in result.values():
+                break
+        return result
+
+class EquipmentExtractor(Extractor):
+    """Equipment name -> (id, type) mappings"""
+
+    name = "equipment"
+
+    def extract(self, buffer: SaveBuffer) -> dict:
+        mappings = find_equipment_mappings_in_text(buffer.text)
+        instrument.count("items.equipment", len(mappings))
+        return mappings
+
+class OrganisationExtractor(Extractor):
+    """Industrial organisations of every country (or the given tags), see src/utils/mio_scanner.py"""
+
+    name = "organisations"
+
+    def __init__(self, tags: Optional[Iterable[str]] = None):
+        """
+        Args:
+            tags: Only extract organisations of these country tags (optional, default all)
+        """
+        self.tags = tags
+
+    def extract(self, buffer: SaveBuffer) -> list:
+        organisations = scan_organisations(buffer.text, self.tags)
+        instrument.count("items.organisations", len(organisations))
+        instrument.count("entries", sum(len(org['history']) for org in organisations))
+        return organisations
+
+    def cache_key(self) -> str:
+        tags = sorted(set(self.tags)) if self.tags is not None else None
+        return f"OrganisationExtractor({tags!r})"
+
+    def __repr__(self):
+        return f"OrganisationExtractor({self.tags!r})"
+
+def find_equipment_mappings_in_text(content: str) -> dict:
+    """
+    Find equipment name -> (id, type) mappings in save text.
+
+    Args:
+        content: Melted save text
+
+    Returns:
+        Dictionary of equipment name -> (id, 70)
+    """
+    equipment_mappings = {}
+    for match in _EQUIPMENT.finditer(content):
+        prefix = match.group(1)  # The text_text part
+        # Skip if prefix is exactly 'equipment'
+        if prefix == 'equipment':
+            continue
+        equipment_mappings[prefix] = (int(match.group(2)), 70)
+    return equipment_mappings
+
+def default_extractors() -> list:
+    """The header, equipment and organisation extractors."""
+    return [HeaderExtractor(), EquipmentExtractor(), OrganisationExtractor()]
+
+class ExtractorPipeline:
+    """
+    Runs every registered extractor over one read of a save.
+
+    New extractors are added with register() and share the buffer of the others,
+    so adding one never adds a file read.
+    """
+
+    def __init__(self, extractors: Optional[Iterable[Extractor]] = None):
+        """
+        Args:
+            extractors: Extractors to run (optional, defaults to default_extractors())
+        """
+        self.extractors = list(extractors) if extractors is not None else default_extractors()
+
+    def register(self, extractor: Extractor) -> Extractor:
+        """Add an extractor, replacing any registered under the same name."""
+        self.extractors = [existing for existing in self.extractors if existing.name != extractor.name]
+        self.extractors.append(extractor)
+        return extractor
+
+    def run_buffer(self, buffer: SaveBuffer, names: Optional[Iterable[str]] = None) -> dict:
+        """
+        Run the extractors over an open save buffer.
+
+        Args:
+            buffer: The save
+            names: Only run the extractors with these names (optional, default all)
+
+        Returns:
+            Dictionary of extractor name -> result
+        """
+        names = set(names) if names is not None else None
+        results = {}
+        for extractor in self.extractors:
+            if names is None or extractor.name in names:
+                # The first extractor to use the whole text also pays for reading it (the nested "read" span)
+                with instrument.span(f"extract.{extractor.name}"):
+                    results[extractor.name] = extractor.extract(buffer)
+        return results
+
+    def run(self, file_path: str, names: Optional[Iterable[str]] = None) -> dict:
+        """
+        Open a melted save once and run the extractors over it.
+
+        Args:
+            file_path: Path to the melted (optionally compressed) save
+            names: Only run the extractors with these names (optional, default all)
+
+        Returns:
+            Dictionary of extractor name -> result
+        """
+        with SaveBuffer(file_path) as buffer:
+            return self.run_buffer(buffer, names)
+
+    def run_text(self, text: str, names: Optional[Iterable[str]] = None) -> dict:
+        """Run the extractors over save text already in memory; see run()."""
+        return self.run_buffer(SaveBuffer(text=text), names)
@@ -0,0 +1,150 @@
+import os
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager, nullcontext
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Environment variable enabling instrumentation; set by enable(), so worker processes inherit it
+PROFILE_ENV = "HOI4_PROFILE"
+
+# Stage spans in the order they are reported (other spans follow, by name)
+STAGES = ("read", "decode", "melt", "lex", "parse", "extract", "convert", "cache write", "ui populate")
+
+_NULL_SPAN = nullcontext()
+
+_enabled = os.environ.get(PROFILE_ENV, "").lower() not in ("", "0", "false", "no")
+_lock = threading.Lock()
+_spans = {}  # name -> [calls, seconds]
+_counters = {}  # name -> total
+_started = time.perf_counter()
+
+def enable(flag: bool = True):
+    """Turn instrumentation on or off for this process and the worker processes it starts."""
+    global _enabled
+    _enabled = flag
+    if flag:
+        os.environ[PROFILE_ENV] = "1"
+    else:
+        os.environ.pop(PROFILE_ENV, None)
+
+def is_enabled() -> bool:
+    return _enabled
+
+def reset():
+    """Drop everything recorded so far."""
+    global _started
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+        _started = time.perf_counter()
+
+@contextmanager
+def _timed(name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        with _lock:
+            entry = _spans.setdefault(name, [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+
+def span(name: str):
+    """
+    Time a block as a named stage: `with span("parse"): ...`
+
+    Spans of the same name add up. When instrumentation is off this returns a
+    shared do-nothing context manager.
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    return _timed(name)
+
+def record(name: str, seconds: float, calls: int = 1):
+    """Add time measured elsewhere (e.g. melt stage timings) to a span; does nothing when instrumentation is off."""
+    if not _enabled:
+        return
+    with _lock:
+        entry = _spans.setdefault(name, [0, 0.0])
+        entry[0] += calls
+        entry[1] += seconds
+
+def count(name: str, amount: int = 1):
+    """Add to a named counter (bytes, tokens, items, entries...); does nothing when instrumentation is off."""
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+def trace(message: str, *args):
+    """
+    Log a hot-path debug message, only when instrumentation is on.
+
+    Formatting is deferred to logging, so disabled calls only pay for the call itself.
+    """
+    if _enabled:
+        logger.debug(message, *args)
+
+def snapshot() -> dict:
+    """
+    What was recorded so far, as plain data (for reports or to send back from a worker process).
+
+    Returns:
+        {'elapsed': seconds, 'spans': {name: {'calls', 'seconds'}}, 'counters': {name: total}}
+    """
+    with _lock:
+        return {
+            'elapsed': time.perf_counter() - _started,
+            'spans': {name: {'calls': calls, 'seconds': seconds} for name, (calls, seconds) in _spans.items()},
+            'counters': dict(_counters),
+        }
+
+def merge(other: Optional[dict]):
+    """Add a snapshot taken elsewhere (e.g. in a worker process) to this process's records."""
+    if not other:
+        return
+    with _lock:
+        for name, stats in other.get('spans', {}).items():
+            entry = _spans.setdefault(name, [0, 0.0])
+            entry[0] += stats['calls']
+            entry[1] += stats['seconds']
+        for name, total in other.get('counters', {}).items():
+            _counters[name] = _counters.get(name, 0) + total
+
+def _stage_order(name: str) -> tuple:
+    stage = name.split(".", 1)[0]
+    return (STAGES.index(stage) if stage in STAGES else len(STAGES), name)
+
+def format_report(report: Optional[dict] = None) -> str:
+    """
+    Format a per-stage breakdown of a snapshot.
+
+    Args:
+        report: Snapshot to format (optional, defaults to snapshot())
+
+    Returns:
+        Multi-line text
+    """
+    report = report or snapshot()
+    elapsed = report['elapsed']
+    lines = [f"Stage breakdown ({elapsed:.2f}s elapsed):"]
+    for name in sorted(report['spans'], key=_stage_order):
+        stats = report['spans'][name]
+        share = stats['seconds'] / elapsed * 100 if elapsed else 0.0
+        lines.append(f"  {name:<24} {stats['seconds']:9.3f}s {share:6.1f}%  {stats['calls']:>7} calls")
+    if report['counters']:
+        lines.append("Counters:")
+        for name, total in sorted(report['counters'].items()):
+            lines.append(f"  {name:<24} {total:>12,}")
+    return "\n".join(lines)
+
+def export_report(output_path: str, report: Optional[dict] = None) -> str:
+    """Write a snapshot as JSON and return output_path."""
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(report or snapshot(), f, indent=2)
+    return output_path
@@ -0,0 +1,68 @@
+import os
+import glob
+import logging
+import threading
+from typing import Iterable, Optional
+
+import pyradox
+import pyradox.filetype.yml
+
+logger = logging.getLogger(__name__)
+
+# Localisation files shipped with the tools, read after the game's
+BUNDLED_PATTERN = "*_l_english.yml"
+
+# Bundled copies of the game's own files; the other bundled files come from mods and override them
+BUNDLED_GAME_FILES = ("equipment_l_english.yml",)
+
+# Game localisation files with equipment names
+GAME_PATTERN = os.path.join("localisation", "**", "*equipment*_l_english.yml")
+
+_equipment_localisation = None
+_lock = threading.Lock()
+
+def load_localisation(paths: Iterable[str]) -> dict:
+    """
+    Read Paradox .yml localisation files into one dictionary.
+
+    Args:
+        paths: Files to read; later files override earlier ones (as mods override the game)
+
+    Returns:
+        Dictionary of lower-case key -> text
+    """
+    localisation = {}
+    for path in paths:
+        try:
+            localisation.update(pyradox.filetype.yml.parse_file(path))
+        except Exception as e:
+            logger.warning(f"Couldn't read localisation {path}: {e}")
+    return localisation
+
+def localisation_files(base_dir: Optional[str] = None) -> list:
+    """
+    The equipment localisation files of the installed game (if found) followed by the bundled ones, in override order.
+
+    Args:
+        base_dir: Directory of the bundled files (optional, defaults to the project directory)
+    """
+    if base_dir is None:
+        base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    paths = []
+    try:
+        game_dir = pyradox.get_game_directory('HoI4')
+    except FileNotFoundError:
+        game_dir = None
+    if game_dir:
+        paths.extend(sorted(glob.glob(os.path.join(game_dir, GAME_PATTERN), recursive=True)))
+    bundled = sorted(glob.glob(os.path.join(base_dir, BUNDLED_PATTERN)))
+    paths.extend(sorted(bundled, key=lambda path: os.path.basename(path) not in BUNDLED_GAME_FILES))
+    return paths
+
+def equipment_localisation() -> dict:
+    """The localisation of localisation_files(), read once per process."""
+    global _equipment_localisation
+    with _lock:
+        if _equipment_localisation is None:
+            _equipment_localisation = load_localisation(localisation_files())
+        return _equipment_localisation
@@ -0,0 +1,370 @@
+import io
+import os
+import time
+import shutil
+import tempfile
+import subprocess
+import logging
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from pyradox.filetype.txt import lex, parse_tree
+from src.utils import instrument
+from src.utils.binary_decoder import decode_to_text, parse_binary_file
+from src.utils.compression import open_binary, open_text
+
+logger = logging.getLogger(__name__)
+
+# Environment variables selecting the backend used by default, and the fixture of the stub backend
+BACKEND_ENV = "HOI4_MELT_BACKEND"
+FIXTURE_ENV = "HOI4_MELT_FIXTURE"
+
+# Stages reported in melt timings
+STAGES = ("copy", "spawn", "decode", "write")
+
+CHUNK_SIZE = 1024 * 1024
+
+def parse_lines(lines, filename: str):
+    """
+    Lex and parse lines of save text into a pyradox Tree, as pyradox.parse_stream does, timing each step.
+
+    Args:
+        lines: Iterable of lines (a list, an open file or a melter pipe)
+        filename: Name used in parse errors
+
+    Returns:
+        Parsed save (pyradox Tree)
+    """
+    # Lexing consumes the lines, so for a pipe this includes waiting on the melter
+    with instrument.span("lex"):
+        token_data = lex(lines, filename)
+    instrument.count("tokens", len(token_data))
+    with instrument.span("parse"):
+        return parse_tree(token_data, filename)
+
+class StageTimings(dict):
+    """Seconds spent per stage of one melt, filled in with the stage() context manager."""
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self[name] = self.get(name, 0.0) + time.perf_counter() - start
+
+def _ensure_parent_dir(path: str):
+    parent = os.path.dirname(path)
+    if parent and not os.path.exists(parent):
+        os.makedirs(parent)
+
+def find_melt_executable() -> Optional[str]:
+    """
+    Find the melt.exe executable in various locations.
+
+    Returns:
+        Path to melt.exe if found, None otherwise
+    """
+    # Check in current directory
+    melt_path = os.path.abspath("melt.exe")
+    if os.path.exists(melt_path):
+        logger.info(f"Found melt.exe in current directory: {melt_path}")
+        return melt_path
+
+    # Check in script directory
+    script_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    melt_path = os.path.join(script_dir, "melt.exe")
+    if os.path.exists(melt_path):
+        logger.info(f"Found melt.exe in script directory: {melt_path}")
+        return melt_path
+
+    # Check in system PATH
+    melt_in_path = shutil.which("melt.exe") or shutil.which("melt")
+    if melt_in_path:
+        logger.info(f"Found melt.exe in PATH: {melt_in_path}")
+        return melt_in_path
+
+    logger.error("melt.exe not found in application directory or PATH")
+    return None
+
+def can_run_melt_executable() -> bool:
+    """
+    Check whether a melter executable can be used.
+
+    melt.exe is a Windows program; a native `melt` build found elsewhere can run on any platform.
+
+    Returns:
+        True if a runnable melter executable was found
+    """
+    melt_path = find_melt_executable()
+    if melt_path is None:
+        return False
+    return os.name == 'nt' or not melt_path.lower().endswith(".exe")
+
+class MeltBackend:
+    """
+    A way of turning a binary save into melted text.
+
+    Backends are small picklable objects without per-melt state, so one backend
+    can be shared by the threads of a pool or sent to worker processes.
+    """
+
+    name = "base"
+    # Executor best suited to run many melts: "thread" when the work happens outside
+    # the interpreter (a child process, sleeping), "process" for CPU-bound Python
+    pool = "thread"
+
+    def melt(self, file_path: str, output_path: str, compression: Optional[str] = None) -> StageTimings:
+        """
+        Melt a save to a text file.
+
+        Args:
+            file_path: Path to the binary save
+            output_path: Path of the melted file
+            compression: Compress the melted file with 'gzip', 'lzma' or 'zstd' (optional,
+                defaults to the compression implied by the suffix of output_path)
+
+        Returns:
+            Seconds spent per stage
+
+        Raises:
+            Exception if the save could not be melted; no partial output is left behind
+        """
+        raise NotImplementedError
+
+    def iter_lines(self, file_path: str, tee=None) -> Iterator[str]:
+        """
+        Yield the melted text of a save line by line, for parsing without a melted file.
+
+        Backends that can parse without text override parse() instead.
+
+        Args:
+            file_path: Path to the binary save
+            tee: Open text file that also receives every line (optional)
+        """
+        raise NotImplementedError
+
+    def parse(self, file_path: str, tee_path: Optional[str] = None):
+        """
+        Parse a save into a pyradox Tree, streaming the melted text into the parser.
+
+        Args:
+            file_path: Path to the binary save
+            tee_path: Path to also write the melted text to (optional)
+
+        Returns:
+            Parsed save (pyradox Tree)
+        """
+        tee = None
+        if tee_path is not None:
+            _ensure_parent_dir(tee_path)
+            tee = open_text(tee_path, 'w')
+        try:
+            return parse_lines(self.iter_lines(file_path, tee), file_path)
+        finally:
+            if tee is not None:
+                tee.close()
+
+    def __repr__(self):
+        return f"{type(self).__name__}()"
+
+class ExecutableBackend(MeltBackend):
+    """
+    Runs melt.exe (or a compatible program) with an argument list, reading the melted text from its stdout.
+    """
+
+    name = "executable"
+    pool = "thread"
+
+    def __init__(self, melt_path: Optional[str] = None, copy_input: bool = False):
+        """
+        Args:
+            melt_path: Path to the melter (optional, defaults to find_melt_executable())
+            copy_input: Copy the save to a temporary file before melting, so the game
+                can overwrite the original (an autosave) while it is being melted
+        """
+        self.melt_path = melt_path or find_melt_executable()
+        if self.melt_path is None:
+            raise FileNotFoundError("melt.exe not found in application directory or PATH")
+        self.copy_input = copy_input
+
+    def argv(self, file_path: str) -> list:
+        """Command line that melts file_path to stdout."""
+        return [self.melt_path, "melt", "--unknown-key", "stringify", "--to-stdout", file_path]
+
+    @contextmanager
+    def _input_path(self, file_path: str, timings: StageTimings):
+        if not self.copy_input:
+            yield file_path
+            return
+        with timings.stage("copy"):
+            fd, copy_path = tempfile.mkstemp(prefix="hoi4_melt_input_", suffix=".hoi4")
+            os.close(fd)
+            shutil.copyfile(file_path, copy_path)
+        try:
+            yield copy_path
+        finally:
+            os.remove(copy_path)
+
+    @staticmethod
+    def _check_returncode(returncode: int, stderr):
+        # Accept both 0 and 1 as success (melt.exe reports unknown tokens with 1)
+        if returncode != 0 and returncode != 1:
+            stderr.seek(0)
+            raise RuntimeError(f"Melt.exe returned error code {returncode}. Error: "
+                               f"{stderr.read().decode('utf-8', errors='replace')}")
+
+    def melt(self, file_path: str, output_path: str, compression: Optional[str] = None) -> StageTimings:
+        timings = StageTimings()
+        _ensure_parent_dir(output_path)
+        with self._input_path(file_path, timings) as input_path, tempfile.TemporaryFile() as stderr:
+            with timings.stage("spawn"):
+                process = subprocess.Popen(self.argv(input_path), stdout=subprocess.PIPE, stderr=stderr)
+            try:
+                with open_binary(output_path, 'wb', compression) as output:
+                    read = process.stdout.read
+                    while True:
+                        # Time blocked on the pipe is time the melter spends decoding
+                        with timings.stage("decode"):
+                            chunk = read(CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        with timings.stage("write"):
+                            output.write(chunk)
+                with timings.stage("decode"):
+                    returncode = process.wait()
+                self._check_returncode(returncode, stderr)
+                if os.path.getsize(output_path) == 0:
+                    raise RuntimeError(f"Melt didn't produce output for {file_path}")
+            except BaseException:
+                process.kill()
+                process.wait()
+                if os.path.exists(output_path):
+                    os.remove(output_path)
+                raise
+            finally:
+                process.stdout.close()
+        return timings
+
+    def iter_lines(self, file_path: str, tee=None) -> Iterator[str]:
+        """
+        Run the melter with its output on a pipe and yield the melted text line by line.
+
+        The melter keeps melting while the caller consumes lines, so both run at the same time.
+        """
+        with tempfile.TemporaryFile() as stderr:
+            process = subprocess.Popen(self.argv(file_path), stdout=subprocess.PIPE, stderr=stderr)
+            try:
+                for line in io.TextIOWrapper(process.stdout, encoding='utf-8'):
+                    if tee is not None:
+                        tee.write(line)
+                    yield line
+            finally:
+                process.stdout.close()
+                returncode = process.wait()
+            self._check_returncode(returncode, stderr)
+
+    def __repr__(self):
+        return f"ExecutableBackend({self.melt_path!r})"
+
+class DecoderBackend(MeltBackend):
+    """Decodes saves in-process with the native Python decoder (src/utils/binary_decoder.py)."""
+
+    name = "decoder"
+    pool = "process"
+
+    def __init__(self, tokens: Optional[dict] = None):
+        """
+        Args:
+            tokens: Token id -> name table (optional, defaults to load_token_table())
+        """
+        self.tokens = tokens
+
+    def melt(self, file_path: str, output_path: str, compression: Optional[str] = None) -> StageTimings:
+        timings = StageTimings()
+        start = time.perf_counter()
+        try:
+            decode_to_text(file_path, output_path, self.tokens, compression=compression, timings=timings)
+        except BaseException:
+            if os.path.exists(output_path):
+                os.remove(output_path)
+            raise
+        # Decoding and writing are interleaved; whatever was not spent writing was spent decoding
+        timings["decode"] = time.perf_counter() - start - timings.get("write", 0.0)
+        return timings
+
+    def parse(self, file_path: str, tee_path: Optional[str] = None):
+        # The decoder feeds parser tokens directly, skipping text formatting and lexing
+        return parse_binary_file(file_path, self.tokens, tee_path=tee_path)
+
+class FixtureBackend(MeltBackend):
+    """
+    Stand-in melter for tests and benchmarks: "melts" a save into the text of a fixture.
+
+    Optionally sleeps to simulate a melter of a given speed, so pools and pipelines can
+    be measured on machines without melt.exe. Sleeping releases the GIL, as waiting on
+    melt.exe does.
+    """
+
+    name = "fixture"
+    pool = "thread"
+
+    def __init__(self, fixture_path: Optional[str] = None, mb_per_second: Optional[float] = None):
+        """
+        Args:
+            fixture_path: Melted text every save melts to (optional, defaults to the
+                HOI4_MELT_FIXTURE environment variable, or else each input file's own content)
+            mb_per_second: Simulated melting speed, relative to the input size (optional, default instant)
+        """
+        self.fixture_path = fixture_path or os.environ.get(FIXTURE_ENV)
+        self.mb_per_second = mb_per_second
+
+    def _simulate_decode(self, file_path: str, timings: StageTimings):
+        with timings.stage("decode"):
+            if self.mb_per_second:
+                time.sleep(os.path.getsize(file_path) / (1024 * 1024) / self.mb_per_second)
+
+    def melt(self, file_path: str, output_path: str, compression: Optional[str] = None) -> StageTimings:
+        timings = StageTimings()
+        with timings.stage("copy"):
+            with open(self.fixture_path or file_path, 'rb') as f:
+                data = f.read()
+        self._simulate_decode(file_path, timings)
+        _ensure_parent_dir(output_path)
+        with timings.stage("write"):
+            with open_binary(output_path, 'wb', compression) as output:
+                output.write(data)
+        return timings
+
+    def iter_lines(self, file_path: str, tee=None) -> Iterator[str]:
+        self._simulate_decode(file_path, StageTimings())
+        with open(self.fixture_path or file_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if tee is not None:
+                    tee.write(line)
+                yield line
+
+    def __repr__(self):
+        return f"FixtureBackend({self.fixture_path!r}, mb_per_second={self.mb_per_second!r})"
+
+BACKENDS = {
+    backend.name: backend for backend in (ExecutableBackend, DecoderBackend, FixtureBackend)
+}
+
+def get_melt_backend(name: Optional[str] = None) -> MeltBackend:
+    """
+    Create a melter backend.
+
+    Args:
+        name: 'executable', 'decoder' or 'fixture' (optional, defaults to the HOI4_MELT_BACKEND
+            environment variable, or else melt.exe where it can run and the decoder elsewhere)
+
+    Returns:
+        The backend
+    """
+    name = name or os.environ.get(BACKEND_ENV)
+    if name is None:
+        name = "executable" if can_run_melt_executable() else "decoder"
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown melter backend '{name}', expected one of {', '.join(BACKENDS)}")
+    return BACKENDS[name]()
@@ -0,0 +1,167 @@
+import os
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from src.utils import instrument
+from src.utils.melter import is_binary_file, melt_save_file, ensure_melted_saves_dir
+from src.utils.save_extract import file_content_hash
+from src.utils.compression import COMPRESSION_SUFFIXES, check_compression, compressed_path, open_text
+
+logger = logging.getLogger(__name__)
+
+# Melt caches of this process, kept across tasks so file fingerprints are hashed once per process
+_shared_caches = {}
+_shared_lock = threading.Lock()
+
+class MeltCache:
+    """
+    Melted saves memoized by content hash.
+
+    Each distinct save is melted once: the melted text is kept on disk under its
+    content hash (so it survives restarts and renamed copies of a save), and the
+    decoded text of the most recently used saves is kept in memory so several
+    scans of one save share a single read.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_buffers: int = 2, compression: Optional[str] = None):
+        """
+        Args:
+            cache_dir: Directory for melted files (optional, defaults to melted_saves/cache)
+            max_buffers: Number of decoded save texts kept in memory
+            compression: Store new melts compressed with 'gzip', 'lzma' or 'zstd' (optional).
+                Melts stored with any compression are reused.
+        """
+        if compression is not None:
+            check_compression(compression)
+        self.cache_dir = cache_dir or os.path.join(ensure_melted_saves_dir(), "cache")
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.compression = compression
+        self.max_buffers = max_buffers
+        self._fingerprints = {}  # (path, size, mtime) -> content hash
+        self._buffers = OrderedDict()  # (content hash, melted) -> decoded text
+        self._key_locks = {}  # path or content hash -> lock held while it is hashed, melted or read
+        self._lock = threading.Lock()
+        self.melts = 0
+        self.hits = 0
+
+    def _key_lock(self, key) -> threading.Lock:
+        """
+        The lock of one path or content hash.
+
+        Hashing, melting and reading run under these, so callers working on the
+        same save wait for each other while other saves go ahead; the shared lock
+        only guards the dictionaries.
+        """
+        with self._lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = self._key_locks[key] = threading.Lock()
+            return lock
+
+    def fingerprint(self, file_path: str) -> str:
+        """Content hash of a file, hashed only once while its size and mtime are unchanged."""
+        stat = os.stat(file_path)
+        key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            if key in self._fingerprints:
+                return self._fingerprints[key]
+        with self._key_lock(key):
+            with self._lock:
+                if key in self._fingerprints:
+                    return self._fingerprints[key]
+            with instrument.span("read.hash"):
+                content_hash = file_content_hash(file_path)
+            instrument.count("bytes.hashed", stat.st_size)
+            with self._lock:
+                self._fingerprints[key] = content_hash
+            return content_hash
+
+    def melted_path(self, file_path: str) -> str:
+        """
+        Get a readable text version of a save, melting it only if no melt of the same content exists.
+
+        Args:
+            file_path: Path to the save file
+
+        Returns:
+            Path to the melted file, the original path for text saves, or the
+            original path if melting failed
+        """
+        if not is_binary_file(file_path):
+            return file_path
+
+        content_hash = self.fingerprint(file_path)
+        base_path = os.path.join(self.cache_dir, f"{content_hash}.txt")
+        with self._key_lock(("melt", content_hash)):
+            for cached_path in [base_path] + [base_path + suffix for suffix in COMPRESSION_SUFFIXES.values()]:
+                if os.path.exists(cached_path):
+                    with self._lock:
+                        self.hits += 1
+                    logger.info(f"Using cached melt of {file_path}: {cached_path}")
+                    return cached_path
+
+            # Melt next to the final name, so an interrupted melt is never mistaken for a cached one;
+            # the process and thread ids keep other workers melting the same save apart
+            output_path = compressed_path(base_path, self.compression)
+            partial_path = f"{output_path}.{os.getpid()}.{threading.get_ident()}.partial"
+            success, melted_path = melt_save_file(file_path, partial_path, compression=self.compression)
+            if not success:
+                return file_path
+            os.replace(melted_path, output_path)
+            with self._lock:
+                self.melts += 1
+            return output_path
+
+    def read_text(self, file_path: str, melt: bool = True) -> str:
+        """
+        Get the text of a save, melting it if needed.
+
+        The decoded text is shared by every caller until it drops out of the
+        in-memory buffers.
+
+        Args:
+            file_path: Path to the save file
+            melt: Whether to melt binary saves (otherwise the raw file is decoded)
+
+        Returns:
+            The save's text
+        """
+        key = (self.fingerprint(file_path), melt)
+        with self._key_lock(("read",) + key):
+            with self._lock:
+                if key in self._buffers:
+                    self._buffers.move_to_end(key)
+                    return self._buffers[key]
+
+            readable_path = self.melted_path(file_path) if melt else file_path
+            with open_text(readable_path, encoding='utf-8', errors='ignore') as f:
+                text = f.read()
+            with self._lock:
+                self._buffers[key] = text
+                while len(self._buffers) > self.max_buffers:
+                    self._buffers.popitem(last=False)
+            return text
+
+    def release(self):
+        """Drop the in-memory texts, keeping the melted files."""
+        with self._lock:
+            self._buffers.clear()
+
+def shared_melt_cache(cache_dir: str, compression: Optional[str] = None) -> MeltCache:
+    """
+    The MeltCache of a directory for this process, without in-memory texts.
+
+    Every caller in a process (GUI tabs, loader threads, pool workers) shares
+    one instance per directory, so a save is never melted twice at once.
+
+    Args:
+        cache_dir: Directory for melted files
+        compression: Compression of new melts, see MeltCache (optional)
+    """
+    key = (os.path.abspath(cache_dir), compression)
+    with _shared_lock:
+        if key not in _shared_caches:
+            _shared_caches[key] = MeltCache(cache_dir, max_buffers=0, compression=compression)
+        return _shared_caches[key]
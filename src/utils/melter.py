@@ -1,11 +1,18 @@
 import os
-import subprocess
+import time
+import hashlib
+import concurrent.futures
 import tempfile
-import shutil
-import uuid
 import logging
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Iterator, NamedTuple, Optional, Tuple
+from pyradox.filetype.txt import game_encodings, readlines
+from src.utils import instrument
+from src.utils.compression import COMPRESSION_MAGIC, check_compression, compressed_path, detect_compression, open_text
+from src.utils.melt_backends import (
+    MeltBackend, ExecutableBackend, DecoderBackend, STAGES,
+    find_melt_executable, can_run_melt_executable, get_melt_backend, parse_lines
+)
 
 # Configure logging
 logging.basicConfig(
@@ -14,10 +21,23 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+class MeltResult(NamedTuple):
+    """Outcome of melting one file in a batch."""
+    file_path: str
+    status: str  # "melted", "skipped" (already text) or "failed"
+    output_path: str
+    size: int  # Bytes of the input file
+    seconds: float
+    error: Optional[str] = None
+    stages: Optional[dict] = None  # Seconds per stage (copy, spawn, decode, write)
+
 def is_binary_file(file_path: str) -> bool:
     """
     Determine if a file is binary by checking the first few bytes.
     
+    Compressed melted saves (gzip, lzma or zstd) count as text, since they do not
+    need melting.
+    
     Args:
         file_path: Path to the file to check
         
@@ -27,6 +47,8 @@ def is_binary_file(file_path: str) -> bool:
     try:
         with open(file_path, 'rb') as f:
             header = f.read(10)
+            if any(header.startswith(magic) for magic in COMPRESSION_MAGIC.values()):
+                return False
             is_text = all(b >= 32 and b <= 126 or b in (9, 10, 13) for b in header)
             return not is_text
     except Exception as e:
@@ -34,44 +56,32 @@ def is_binary_file(file_path: str) -> bool:
         # If we can't check, assume it's binary to be safe
         return True
 
-def find_melt_executable() -> Optional[str]:
+def melt_with_decoder(file_path: str, output_path: str, compression: Optional[str] = None) -> Tuple[bool, str]:
     """
-    Find the melt.exe executable in various locations.
+    Melt a HOI4 save file with the native Python decoder.
     
+    Args:
+        file_path: Path to the save file to melt
+        output_path: Path where the melted file should be saved
+        compression: Compression of the melted file, as for melt_save_file (optional)
+        
     Returns:
-        Path to melt.exe if found, None otherwise
+        Tuple of (success, path), as melt_save_file
     """
-    # Check in current directory
-    melt_path = os.path.abspath("melt.exe")
-    if os.path.exists(melt_path):
-        logger.info(f"Found melt.exe in current directory: {melt_path}")
-        return melt_path
-    
-    # Check in script directory
-    script_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    melt_path = os.path.join(script_dir, "melt.exe")
-    if os.path.exists(melt_path):
-        logger.info(f"Found melt.exe in script directory: {melt_path}")
-        return melt_path
-    
-    # Check in system PATH
-    from shutil import which
-    melt_in_path = which("melt.exe") or which("melt")
-    if melt_in_path:
-        logger.info(f"Found melt.exe in PATH: {melt_in_path}")
-        return melt_in_path
-    
-    logger.error("melt.exe not found in application directory or PATH")
-    return None
+    return melt_save_file(file_path, output_path, compression=compression, backend=DecoderBackend())
 
-def melt_save_file(file_path: str, output_path: Optional[str] = None, temp_dir: Optional[str] = None) -> Tuple[bool, str]:
+def melt_save_file(file_path: str, output_path: Optional[str] = None, temp_dir: Optional[str] = None,
+                   compression: Optional[str] = None, backend: Optional[MeltBackend] = None) -> Tuple[bool, str]:
     """
-    Melt a HOI4 save file using melt.exe.
+    Melt a HOI4 save file using melt.exe, or the native decoder where melt.exe cannot run.
     
     Args:
         file_path: Path to the save file to melt
         output_path: Path where the melted file should be saved (optional)
         temp_dir: Directory to use for temporary files (optional)
+        compression: Write the melted file compressed with 'gzip', 'lzma' or 'zstd' (optional,
+            defaults to the compression implied by the suffix of output_path)
+        backend: Melter backend to use (optional, defaults to get_melt_backend())
         
     Returns:
         Tuple of (success, path) where:
@@ -85,112 +95,74 @@ def melt_save_file(file_path: str, output_path: Optional[str] = None, temp_dir:
     
     logger.info(f"File appears to be binary, attempting to melt: {file_path}")
     
-    # Find melt.exe
-    melt_path = find_melt_executable()
-    if not melt_path:
-        return False, file_path
-    
     # Create output file path if not provided
     if not output_path:
         # Use temp directory if provided, otherwise create one
         if not temp_dir:
             temp_dir = tempfile.mkdtemp(prefix="hoi4_melted_")
         
-        output_path = os.path.join(temp_dir, os.path.basename(file_path) + ".melted")
+        output_path = compressed_path(os.path.join(temp_dir, os.path.basename(file_path) + ".melted"), compression)
     
     try:
-        # Create temporary files with unique names to avoid path issues
-        temp_input_file = os.path.join(tempfile.gettempdir(), f"hoi4_melt_input_{uuid.uuid4().hex}.hoi4")
-        temp_output_file = os.path.join(tempfile.gettempdir(), f"hoi4_melt_output_{uuid.uuid4().hex}.txt")
-        
-        # Copy original file to temp location
-        logger.info(f"Copying file to temp location: {temp_input_file}")
-        shutil.copy2(file_path, temp_input_file)
-        
-        # Fix file paths - convert forward slashes to backslashes for Windows
-        win_melt_path = os.path.normpath(melt_path).replace('/', '\\')
-        win_temp_input = os.path.normpath(temp_input_file).replace('/', '\\')
-        win_temp_output = os.path.normpath(temp_output_file).replace('/', '\\')
-        
-        # Create a temporary batch file to run the command
-        batch_file = os.path.join(tempfile.gettempdir(), f"run_melt_{uuid.uuid4().hex}.bat")
-        with open(batch_file, 'w') as f:
-            # The command in batch format
-            f.write(f'@echo off\n')
-            f.write(f'"{win_melt_path}" melt --unknown-key stringify --to-stdout "{win_temp_input}" > "{win_temp_output}"\n')
-            f.write(f'exit %ERRORLEVEL%\n')
-        
-        # Log the batch file contents
-        logger.info(f"Created batch file: {batch_file}")
-        with open(batch_file, 'r') as f:
-            logger.debug(f"Batch file contents:\n{f.read()}")
-        
-        # Run the batch file
-        logger.info(f"Running batch file: {batch_file}")
-        
-        result = subprocess.run(batch_file, shell=True, capture_output=True, text=True)
-        
-        # Log detailed subprocess results
-        logger.debug(f"Return code: {result.returncode}")
-        logger.debug(f"STDOUT: {result.stdout}")
-        logger.debug(f"STDERR: {result.stderr}")
-        
-        # Check if there was an error code (accept both 0 and 1 as success based on Java code)
-        if result.returncode != 0 and result.returncode != 1:
-            error_msg = f"Melt.exe returned error code {result.returncode}. Error: {result.stderr}"
-            logger.error(error_msg)
-            
-            # Clean up temp files
-            try:
-                os.remove(temp_input_file)
-                os.remove(batch_file)
-                if os.path.exists(temp_output_file):
-                    os.remove(temp_output_file)
-            except Exception as e:
-                logger.warning(f"Error cleaning up temp files: {str(e)}")
-                
-            return False, file_path
-        
-        # If the temp output file exists, copy it to the final destination
-        if os.path.exists(temp_output_file) and os.path.getsize(temp_output_file) > 0:
-            logger.info(f"Melting successful. Copying from temp file to final destination: {output_path}")
-            
-            # Create the directory for the output file if it doesn't exist
-            output_dir = os.path.dirname(output_path)
-            if output_dir and not os.path.exists(output_dir):
-                os.makedirs(output_dir)
-            
-            shutil.copy2(temp_output_file, output_path)
-            
-            # Clean up temp files
-            try:
-                os.remove(temp_input_file)
-                os.remove(temp_output_file)
-                os.remove(batch_file)
-            except Exception as e:
-                logger.warning(f"Error cleaning up temp files: {str(e)}")
-            
-            return True, output_path
-        else:
-            error_msg = f"Melt didn't produce output. Stderr: {result.stderr}"
-            logger.error(error_msg)
-            logger.error(f"Expected output file {temp_output_file} not found or empty")
-            
-            # Clean up temp files
-            try:
-                os.remove(temp_input_file)
-                os.remove(batch_file)
-                if os.path.exists(temp_output_file):
-                    os.remove(temp_output_file)
-            except Exception as e:
-                logger.warning(f"Error cleaning up temp files: {str(e)}")
-                
-            return False, file_path
-                
+        backend = backend or get_melt_backend()
+        with instrument.span("melt"):
+            timings = backend.melt(file_path, output_path, compression)
     except Exception as e:
-        error_msg = f"Error executing melt.exe: {str(e)}"
-        logger.exception(error_msg)
+        logger.exception(f"Error melting {file_path}: {str(e)}")
         return False, file_path
+    _record_melt_stages(timings, os.path.getsize(file_path))
+    
+    logger.info(f"Melted {file_path} to {output_path} with {backend!r} "
+                f"({', '.join(f'{stage} {seconds:.2f}s' for stage, seconds in timings.items())})")
+    return True, output_path
+
+def iter_melt_executable_lines(file_path: str, melt_path: str, tee=None) -> Iterator[str]:
+    """
+    Run melt.exe with its output on a pipe and yield the melted text line by line.
+    
+    melt.exe keeps melting while the caller consumes lines, so both run at the same time.
+    
+    Args:
+        file_path: Path to the binary save file
+        melt_path: Path to melt.exe
+        tee: Open text file that also receives every line (optional)
+        
+    Yields:
+        Lines of melted text
+    """
+    return ExecutableBackend(melt_path).iter_lines(file_path, tee)
+
+def parse_save_stream(file_path: str, tee_path: Optional[str] = None, backend: Optional[MeltBackend] = None):
+    """
+    Parse a HOI4 save file, melting binary saves on the fly.
+    
+    Binary saves are either piped from melt.exe straight into the lexer, or decoded
+    in-process into parser tokens by the native decoder. No melted file is written
+    or read back unless tee_path is given.
+    
+    Compressed melted saves are decompressed as a stream while parsing.
+    
+    Args:
+        file_path: Path to the save file
+        tee_path: Path to also write the melted text to, compressed if the name ends
+            in .gz, .xz or .zst (optional, binary saves only)
+        backend: Melter backend to use (optional, defaults to get_melt_backend())
+        
+    Returns:
+        Parsed save (pyradox Tree)
+    """
+    if not is_binary_file(file_path):
+        if detect_compression(file_path):
+            with open_text(file_path, encoding='utf_8_sig') as f:
+                return parse_lines(f, file_path)
+        with instrument.span("read"):
+            lines = readlines(file_path, game_encodings['HoI4'])
+        instrument.count("bytes.read", os.path.getsize(file_path))
+        return parse_lines(lines, file_path)
+    
+    backend = backend or get_melt_backend()
+    logger.info(f"Parsing binary save with {backend!r}: {file_path}")
+    return backend.parse(file_path, tee_path=tee_path)
 
 def ensure_melted_saves_dir(base_dir: Optional[str] = None) -> str:
     """
@@ -232,35 +204,171 @@ def melt_to_directory(file_path: str, output_dir: Optional[str] = None) -> Tuple
     
     return melt_save_file(file_path, output_path)
 
-def melt_multiple_files(file_paths: list, output_dir: Optional[str] = None) -> dict:
+def _record_melt_stages(stages: dict, size: int):
+    """Add the stage timings of one melt to the instrumentation spans (melt.copy, melt.decode...)."""
+    for stage, seconds in stages.items():
+        instrument.record(f"melt.{stage}", seconds)
+    instrument.count("bytes.melted", size)
+
+def _melt_one(backend: MeltBackend, file_path: str, output_path: str, compression: Optional[str] = None) -> MeltResult:
+    """Melt one file and time it. Runs in a worker of iter_melt_files."""
+    start = time.perf_counter()
+    size = os.path.getsize(file_path)
+    try:
+        stages = backend.melt(file_path, output_path, compression)
+    except Exception as e:
+        logger.exception(f"Error melting {file_path}")
+        return MeltResult(file_path, "failed", file_path, size, time.perf_counter() - start, str(e))
+    return MeltResult(file_path, "melted", output_path, size, time.perf_counter() - start, stages=dict(stages))
+
+def _batch_output_names(file_paths: list) -> list:
+    """
+    Name the melted file of each save in a batch (<name>.hoi4 -> <name>.hoi4.txt).
+
+    Saves with the same name from different directories (e.g. the autosave.hoi4
+    of two campaigns) would be melted into the same file at the same time, so
+    every name that occurs more than once also gets a short hash of the save's
+    absolute path, plus a counter if the same path is listed twice.
     """
-    Melt multiple HOI4 save files and save them to a specific directory.
+    counts = {}
+    for file_path in file_paths:
+        name = os.path.basename(file_path)
+        counts[name] = counts.get(name, 0) + 1
+
+    names = []
+    taken = set()
+    for file_path in file_paths:
+        name = os.path.basename(file_path)
+        if counts[name] > 1:
+            digest = hashlib.sha1(os.path.abspath(file_path).encode('utf-8')).hexdigest()[:8]
+            name = f"{name}.{digest}"
+        unique_name = name
+        index = 1
+        while unique_name in taken:
+            index += 1
+            unique_name = f"{name}.{index}"
+        taken.add(unique_name)
+        names.append(unique_name + ".txt")
+    return names
+
+def iter_melt_files(file_paths: list, output_dir: Optional[str] = None, jobs: Optional[int] = None,
+                    compression: Optional[str] = None, backend: Optional[MeltBackend] = None) -> Iterator[MeltResult]:
+    """
+    Melt many HOI4 save files concurrently, yielding each result as soon as it completes.
+    
+    Text files are recognised from their first bytes and skipped without being queued.
+    Each save is melted to <name>.txt in output_dir; saves that share a name get
+    distinct files (see _batch_output_names).
+    The pool type comes from the backend: melt.exe runs as its own process, so it is
+    driven from a thread pool; the native decoder runs in Python and gets a process pool.
     
     Args:
         file_paths: List of paths to the save files to melt
         output_dir: Directory where the melted files should be saved (optional)
+        jobs: Maximum number of files melted at once (optional, defaults to the core count)
+        compression: Compress the melted files with 'gzip', 'lzma' or 'zstd' (optional)
+        backend: Melter backend to use (optional, defaults to get_melt_backend())
         
-    Returns:
-        Dictionary mapping original file paths to result tuples (success, melted_path)
+    Yields:
+        MeltResult for each file, skipped files first, then in order of completion
     """
     if output_dir is None:
         output_dir = ensure_melted_saves_dir()
+    if compression is not None:
+        check_compression(compression)
+    jobs = jobs or os.cpu_count() or 1
+    backend = backend or get_melt_backend()
     
-    results = {}
+    to_melt = []
     for file_path in file_paths:
-        logger.info(f"Processing file: {file_path}")
-        
-        # Skip if file is already text
         if not is_binary_file(file_path):
             logger.info(f"Skipping {file_path}: already in text format")
-            results[file_path] = (True, file_path)
-            continue
+            yield MeltResult(file_path, "skipped", file_path, os.path.getsize(file_path), 0.0)
+        else:
+            to_melt.append(file_path)
+    if not to_melt:
+        return
+    
+    executor_class = concurrent.futures.ProcessPoolExecutor if backend.pool == "process" \
+        else concurrent.futures.ThreadPoolExecutor
+    logger.info(f"Melting {len(to_melt)} files with {min(jobs, len(to_melt))} {backend.pool} workers using {backend!r}")
+    with executor_class(max_workers=min(jobs, len(to_melt))) as executor:
+        futures = [
+            executor.submit(_melt_one, backend, file_path,
+                            compressed_path(os.path.join(output_dir, name), compression), compression)
+            for file_path, name in zip(to_melt, _batch_output_names(to_melt))
+        ]
+        for future in concurrent.futures.as_completed(futures):
+            result = future.result()
+            # Recorded here rather than in the worker, which may be another process
+            if result.status == "melted":
+                instrument.record("melt", result.seconds)
+                _record_melt_stages(result.stages, result.size)
+            yield result
+
+def summarize_melt_results(results: list, elapsed: float) -> dict:
+    """
+    Summarize a batch of melt results.
+    
+    Args:
+        results: List of MeltResult
+        elapsed: Wall-clock seconds the batch took
         
-        # Melt the file
-        output_path = os.path.join(output_dir, os.path.basename(file_path) + ".txt")
-        success, melted_path = melt_save_file(file_path, output_path)
-        results[file_path] = (success, melted_path)
+    Returns:
+        Dictionary with counts per status, melted bytes, wall-clock and summed
+        per-file seconds, summed seconds per stage, throughput in MB/s and the
+        failed results
+    """
+    melted = [result for result in results if result.status == "melted"]
+    failures = [result for result in results if result.status == "failed"]
+    melted_bytes = sum(result.size for result in melted)
+    stages = {}
+    for result in melted:
+        for stage, seconds in (result.stages or {}).items():
+            stages[stage] = stages.get(stage, 0.0) + seconds
+    return {
+        'files': len(results),
+        'melted': len(melted),
+        'skipped': sum(result.status == "skipped" for result in results),
+        'failed': len(failures),
+        'melted_bytes': melted_bytes,
+        'elapsed': elapsed,
+        'worker_seconds': sum(result.seconds for result in results),
+        'stages': {stage: stages[stage] for stage in STAGES if stage in stages},
+        'mb_per_second': melted_bytes / (1024 * 1024) / elapsed if elapsed > 0 else 0.0,
+        'failures': failures,
+    }
+
+def format_melt_summary(summary: dict) -> str:
+    """Format a summary from summarize_melt_results as one line."""
+    text = (f"{summary['melted']} melted, {summary['skipped']} skipped, {summary['failed']} failed "
+            f"in {summary['elapsed']:.1f}s ({summary['melted_bytes'] / (1024 * 1024):.1f} MB, "
+            f"{summary['mb_per_second']:.1f} MB/s")
+    if summary['elapsed'] > 0 and summary['melted']:
+        text += f", {summary['worker_seconds'] / summary['elapsed']:.1f}x parallel"
+    text += ")"
+    if summary.get('stages'):
+        text += "; " + ", ".join(f"{stage} {seconds:.1f}s" for stage, seconds in summary['stages'].items())
+    return text
+
+def melt_multiple_files(file_paths: list, output_dir: Optional[str] = None, jobs: Optional[int] = None,
+                        compression: Optional[str] = None, backend: Optional[MeltBackend] = None) -> dict:
+    """
+    Melt multiple HOI4 save files concurrently and save them to a specific directory.
     
+    Args:
+        file_paths: List of paths to the save files to melt
+        output_dir: Directory where the melted files should be saved (optional)
+        jobs: Maximum number of files melted at once (optional, defaults to the core count)
+        compression: Compress the melted files with 'gzip', 'lzma' or 'zstd' (optional)
+        backend: Melter backend to use (optional, defaults to get_melt_backend())
+        
+    Returns:
+        Dictionary mapping original file paths to result tuples (success, melted_path)
+    """
+    results = {}
+    for result in iter_melt_files(file_paths, output_dir, jobs, compression, backend):
+        results[result.file_path] = (result.status != "failed", result.output_path)
     return results
 
 # Command-line interface if run directly
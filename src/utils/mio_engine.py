@@ -0,0 +1,275 @@
+import os
+import time
+import pickle
+import hashlib
+import logging
+import concurrent.futures
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+from src.utils import instrument
+from src.utils.melter import is_binary_file
+from src.utils.melt_cache import shared_melt_cache
+from src.utils.equipment_index import EquipmentIndex
+from src.utils.extractors import EquipmentExtractor, ExtractorPipeline, HeaderExtractor, OrganisationExtractor
+
+logger = logging.getLogger(__name__)
+
+class SaveResult(NamedTuple):
+    """What was read from one save: plain data only, so it can come back from a worker process."""
+    file_path: str
+    save_date: Optional[str]
+    # Equipment name -> (id, type)
+    equipment: dict
+    # Organisation records of the requested tags (see src/utils/mio_scanner.py), None when cached entries were loaded
+    organisations: Optional[list]
+    # Entries loaded from the results cache, or None
+    cached_entries: Optional[list]
+    # Where the results of this save are cached, or None without a results cache
+    cache_path: Optional[str]
+    seconds: float
+    error: Optional[str] = None
+    # Instrumentation snapshot of a worker process (see src/utils/instrument.py), or None
+    stats: Optional[dict] = None
+
+class SaveEntries(NamedTuple):
+    """Production entries of one save, resolved from its SaveResult (see merge_save_result)."""
+    result: SaveResult
+    # The save date, or UNKNOWN_DATE
+    save_date: str
+    # Entry dicts, see build_entries
+    entries: list
+    # Whether the entries were loaded from the results cache
+    from_cache: bool
+
+UNKNOWN_DATE = "Unknown Date"
+
+def default_save_extractors(tags: Optional[Iterable[str]] = None) -> list:
+    """The header, equipment and organisation extractors, the latter restricted to tags."""
+    return [HeaderExtractor(), EquipmentExtractor(), OrganisationExtractor(tags)]
+
+def results_cache_key(extractors: Iterable) -> str:
+    """
+    Short hash of the extractors (and so the country tags) a results cache entry was built with.
+
+    Part of the cache file name, so runs with other tags or extractors never read each other's entries.
+    """
+    keys = sorted(f"{type(extractor).__module__}.{extractor.cache_key()}" for extractor in extractors)
+    return hashlib.sha1("\n".join(keys).encode('utf-8')).hexdigest()[:12]
+
+def process_save(file_path: str, melt_cache_dir: str, results_cache_dir: Optional[str] = None,
+                 melt: bool = True, compression: Optional[str] = None,
+                 extractors: Optional[list] = None, collect_stats: bool = False) -> SaveResult:
+    """
+    Melt (once per distinct content) and extract one save.
+
+    Runs in a worker process, so everything it returns is plain data.
+
+    Args:
+        file_path: Path to the save
+        melt_cache_dir: Directory of melted saves, shared by all workers
+        results_cache_dir: Directory of pickled results, see SaveResult.cached_entries (optional)
+        melt: Whether to melt binary saves
+        compression: Compression of new melts (optional)
+        extractors: Extractors to run (optional, defaults to default_save_extractors())
+        collect_stats: Return this process's instrumentation records in SaveResult.stats,
+            for workers whose records would otherwise be lost
+
+    Returns:
+        SaveResult, with error set instead of raising
+    """
+    start = time.perf_counter()
+    cache_path = None
+    if collect_stats:
+        instrument.reset()
+    try:
+        melt_cache = shared_melt_cache(melt_cache_dir, compression)
+        pipeline = ExtractorPipeline(extractors if extractors is not None else default_save_extractors())
+
+        cached_entries = None
+        if results_cache_dir is not None:
+            cache_name = f"{melt_cache.fingerprint(file_path)}.{results_cache_key(pipeline.extractors)}.cache"
+            cache_path = os.path.join(results_cache_dir, cache_name)
+            if os.path.exists(cache_path):
+                try:
+                    with instrument.span("read.cache"), open(cache_path, 'rb') as cache_file:
+                        cached_entries = pickle.load(cache_file)
+                except Exception as e:
+                    logger.warning(f"Cache error for {file_path}: {e}. Re-processing file.")
+
+        readable_path = file_path
+        if melt and is_binary_file(file_path):
+            readable_path = melt_cache.melted_path(file_path)
+            # melted_path falls back to the binary save, which the extractors would read as garbage text
+            if readable_path == file_path:
+                raise RuntimeError(f"Couldn't melt {file_path}")
+        # The organisation scan is skipped when cached results can be used
+        names = [extractor.name for extractor in pipeline.extractors
+                 if cached_entries is None or extractor.name != OrganisationExtractor.name]
+        results = pipeline.run(readable_path, names)
+        return SaveResult(file_path, results["header"]["date"], results["equipment"],
+                          results.get("organisations"), cached_entries, cache_path,
+                          time.perf_counter() - start,
+                          stats=instrument.snapshot() if collect_stats else None)
+    except Exception as e:
+        logger.exception(f"Error processing {file_path}")
+        return SaveResult(file_path, None, {}, None, None, cache_path, time.perf_counter() - start, str(e),
+                          stats=instrument.snapshot() if collect_stats else None)
+
+def iter_process_saves(file_paths: Iterable[str], melt_cache_dir: str, results_cache_dir: Optional[str] = None,
+                       melt: bool = True, compression: Optional[str] = None,
+                       extractors: Optional[list] = None, jobs: Optional[int] = None) -> Iterator[SaveResult]:
+    """
+    Process saves in a process pool, yielding each result as soon as it finishes.
+
+    Args:
+        file_paths: Paths to the saves
+        melt_cache_dir: Directory of melted saves
+        results_cache_dir: Directory of pickled results (optional)
+        melt: Whether to melt binary saves
+        compression: Compression of new melts (optional)
+        extractors: Extractors to run, picklable (optional, defaults to default_save_extractors())
+        jobs: Number of worker processes (optional, defaults to the core count; 1 processes in this process)
+
+    Yields:
+        SaveResult for each save, in completion order
+    """
+    file_paths = list(file_paths)
+    jobs = min(jobs or os.cpu_count() or 1, max(len(file_paths), 1))
+    args = (melt_cache_dir, results_cache_dir, melt, compression, extractors)
+    if jobs == 1:
+        for file_path in file_paths:
+            yield process_save(file_path, *args)
+        return
+
+    collect_stats = instrument.is_enabled()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(process_save, file_path, *args, collect_stats) for file_path in file_paths]
+        try:
+            for future in concurrent.futures.as_completed(futures):
+                result = future.result()
+                instrument.merge(result.stats)
+                yield result
+        finally:
+            for future in futures:
+                future.cancel()
+
+def save_date_key(save_date: Optional[str]) -> tuple:
+    """
+    Sort key putting save dates like 1939.11.7.1 in chronological order, unknown dates last.
+    """
+    try:
+        return (0, tuple(int(part) for part in save_date.split(".")))
+    except (AttributeError, ValueError):
+        return (1, (), save_date or "")
+
+def sort_by_save_date(results: Iterable[SaveResult]) -> list:
+    """Sort save results chronologically, keeping the given order among equal dates."""
+    return sorted(results, key=lambda result: save_date_key(result.save_date))
+
+def org_display_name(org_name: str, tag: Optional[str] = None) -> str:
+    """
+    Display name of an organisation key, e.g. SOV_tula_arms_plant_organization -> Tula Arms Plant.
+
+    Args:
+        org_name: Organisation key
+        tag: Country tag prefix to drop (optional)
+    """
+    if tag and org_name.startswith(f"{tag}_"):
+        org_name = org_name[len(tag) + 1:]
+    return org_name.replace("_organization", "").replace("_", " ").title()
+
+def build_entries(organisations: Iterable[dict], equipment_index: EquipmentIndex,
+                  tags: Optional[Iterable[str]] = None) -> list:
+    """
+    Flatten organisation records into production entries with equipment names.
+
+    Each entry is a dict of org_name (display name), org_key, tag, equipment_id,
+    equipment_type, equipment_name, date and units (all strings, as cached by the
+    MIO reader). The first entry of each organisation has is_first_entry set;
+    an organisation without history gets one entry with "N/A" values.
+
+    Args:
+        organisations: Organisation records (see src/utils/mio_scanner.py)
+        equipment_index: Index used to name equipment ("Unknown" when missing)
+        tags: Only include organisations of these country tags (optional, default all)
+
+    Returns:
+        List of entry dicts
+    """
+    tags = set(tags) if tags is not None else None
+    entries = []
+    for org in organisations:
+        if tags is not None and org["tag"] not in tags:
+            continue
+        base = {"org_name": org_display_name(org["name"], org["tag"]), "org_key": org["name"], "tag": org["tag"]}
+        if not org["history"]:
+            entries.append({**base, "equipment_id": "N/A", "equipment_type": "N/A",
+                            "date": "N/A", "units": "N/A", "is_first_entry": True})
+            continue
+        for position, entry in enumerate(org["history"]):
+            equipment_id = str(entry["equipment_id"])
+            equipment_type = str(entry["equipment_type"])
+            equipment_name = equipment_index.lookup(equipment_id, equipment_type) or "Unknown"
+            instrument.trace("%s: equipment %s/%s -> %s", org["name"], equipment_id, equipment_type, equipment_name)
+            entry_data = {
+                **base,
+                "equipment_id": equipment_id,
+                "equipment_type": equipment_type,
+                "equipment_name": equipment_name,
+                "date": entry["date"] or "Initial",
+                "units": str(entry["units"]),
+            }
+            if position == 0:
+                entry_data["is_first_entry"] = True
+            entries.append(entry_data)
+    return entries
+
+def write_cached_entries(cache_path: str, entries: list) -> bool:
+    """Pickle a save's entries to the results cache; returns False (and logs) on failure."""
+    try:
+        with instrument.span("cache write"), open(cache_path, 'wb') as cache_file:
+            pickle.dump(entries, cache_file)
+        return True
+    except Exception as e:
+        logger.warning(f"Couldn't save cache {cache_path}: {e}")
+        return False
+
+def merge_save_result(result: SaveResult, equipment_index: EquipmentIndex,
+                      tags: Optional[Iterable[str]] = None) -> SaveEntries:
+    """
+    Turn one save's result into production entries.
+
+    The save's equipment mappings are merged into equipment_index first, so
+    merging results in save-date order (see sort_by_save_date) resolves names as
+    if the saves were read one by one. Cached entries (keyed by the extractors,
+    see results_cache_key) are used as they are, restricted to tags; otherwise
+    the entries are built and written to the results cache.
+
+    Args:
+        result: Result of process_save
+        equipment_index: Index of the equipment names seen so far, updated in place
+        tags: Country tags to include (optional, default all)
+
+    Returns:
+        SaveEntries
+
+    Raises:
+        RuntimeError: If the save could not be processed
+    """
+    if result.error is not None:
+        raise RuntimeError(result.error)
+    save_date = result.save_date
+    if save_date is None:
+        logger.warning(f"Could not extract date from {result.file_path}")
+        save_date = UNKNOWN_DATE
+    equipment_index.update(result.equipment)
+    if result.cached_entries is not None:
+        entries = result.cached_entries
+        if tags is not None:
+            tags = set(tags)
+            entries = [entry for entry in entries if entry.get("tag") in tags]
+        return SaveEntries(result, save_date, entries, True)
+    entries = build_entries(result.organisations or [], equipment_index, tags)
+    if result.cache_path is not None and entries:
+        write_cached_entries(result.cache_path, entries)
+    return SaveEntries(result, save_date, entries, False)
@@ -0,0 +1,273 @@
+import os
+import csv
+import json
+import pickle
+import shutil
+import hashlib
+import sqlite3
+import logging
+from typing import Iterable, Optional
+
+from src.utils.save_files import file_signature
+
+logger = logging.getLogger(__name__)
+
+# Columns of the rows written by the batch tool, one row per production entry
+ROW_FIELDS = ("file", "save_date", "tag", "org_key", "organisation",
+              "equipment_id", "equipment_type", "equipment_name", "date", "units")
+
+# Output format by file suffix
+FORMAT_SUFFIXES = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson", ".db": "sqlite", ".sqlite": "sqlite"}
+
+def entry_rows(file_path: str, save_date: str, entries: Iterable[dict]) -> list:
+    """
+    Output rows of a save's production entries (see src/utils/mio_engine.build_entries).
+
+    Returns:
+        List of dicts with the keys of ROW_FIELDS
+    """
+    return [{
+        "file": file_path,
+        "save_date": save_date,
+        "tag": entry.get("tag"),
+        "org_key": entry.get("org_key"),
+        "organisation": entry["org_name"],
+        "equipment_id": entry["equipment_id"],
+        "equipment_type": entry["equipment_type"],
+        "equipment_name": entry.get("equipment_name"),
+        "date": entry["date"],
+        "units": entry["units"],
+    } for entry in entries]
+
+class RowWriter:
+    """
+    Writes the rows of one save at a time to an output file.
+
+    Output is appended to, so a resumed run adds to what the interrupted run
+    wrote; with append=False the file is started over.
+    """
+
+    def __init__(self, output_path: str, append: bool = True):
+        self.output_path = output_path
+        if not append and os.path.exists(output_path):
+            os.remove(output_path)
+
+    def write_save(self, file_path: str, rows: list):
+        """Write the rows of one save, durably enough that the save can be marked as done afterwards."""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class CsvRowWriter(RowWriter):
+    """CSV with a header row (written once, when the file is new)."""
+
+    def __init__(self, output_path: str, append: bool = True):
+        super().__init__(output_path, append)
+        new_file = not os.path.exists(output_path) or os.path.getsize(output_path) == 0
+        self._file = open(output_path, 'a', newline='', encoding='utf-8')
+        self._writer = csv.DictWriter(self._file, fieldnames=ROW_FIELDS)
+        if new_file:
+            self._writer.writeheader()
+
+    def write_save(self, file_path: str, rows: list):
+        self._writer.writerows(rows)
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+class NdjsonRowWriter(RowWriter):
+    """One JSON object per line."""
+
+    def __init__(self, output_path: str, append: bool = True):
+        super().__init__(output_path, append)
+        self._file = open(output_path, 'a', encoding='utf-8')
+
+    def write_save(self, file_path: str, rows: list):
+        for row in rows:
+            self._file.write(json.dumps(row, ensure_ascii=False))
+            self._file.write("\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+class SqliteRowWriter(RowWriter):
+    """
+    A production table in a SQLite database.
+
+    Each save's rows replace any earlier rows of the same file in one
+    transaction, so re-processing a save never duplicates it.
+    """
+
+    def __init__(self, output_path: str, append: bool = True):
+        super().__init__(output_path, append)
+        self.conn = sqlite3.connect(output_path)
+        columns = ", ".join(f"{field} TEXT" for field in ROW_FIELDS)
+        self.conn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS production ({columns});
+            CREATE INDEX IF NOT EXISTS idx_production_file ON production (file);
+            CREATE INDEX IF NOT EXISTS idx_production_org ON production (tag, org_key);
+        """)
+
+    def write_save(self, file_path: str, rows: list):
+        placeholders = ", ".join("?" for _ in ROW_FIELDS)
+        with self.conn:
+            self.conn.execute("DELETE FROM production WHERE file = ?", (file_path,))
+            self.conn.executemany(f"INSERT INTO production VALUES ({placeholders})",
+                                  [tuple(row[field] for field in ROW_FIELDS) for row in rows])
+
+    def close(self):
+        self.conn.close()
+
+# Row writers by output format
+WRITERS = {
+    "csv": CsvRowWriter,
+    "ndjson": NdjsonRowWriter,
+    "sqlite": SqliteRowWriter,
+}
+
+def guess_format(output_path: str) -> str:
+    """
+    Output format of a path from its suffix.
+
+    Raises:
+        ValueError: If the suffix is not one of FORMAT_SUFFIXES
+    """
+    suffix = os.path.splitext(output_path)[1].lower()
+    if suffix not in FORMAT_SUFFIXES:
+        raise ValueError(f"Can't tell the output format of '{output_path}', expected one of "
+                         f"{', '.join(FORMAT_SUFFIXES)} (or give the format explicitly)")
+    return FORMAT_SUFFIXES[suffix]
+
+def open_writer(output_path: str, output_format: Optional[str] = None, append: bool = True) -> RowWriter:
+    """
+    Open a row writer.
+
+    Args:
+        output_path: Output file
+        output_format: One of WRITERS (optional, guessed from the suffix of output_path)
+        append: Add to an existing output instead of starting over
+
+    Returns:
+        RowWriter
+    """
+    output_format = output_format or guess_format(output_path)
+    if output_format not in WRITERS:
+        raise ValueError(f"Unknown output format '{output_format}', expected one of {', '.join(WRITERS)}")
+    return WRITERS[output_format](output_path, append)
+
+class RunManifest:
+    """
+    The saves a batch run has already read and written, so an interrupted run can resume.
+
+    Kept as JSON lines, one appended (and flushed) per finished save. A save is
+    done when its path and (size, mtime) signature match, so a save that was
+    overwritten since is processed again. A save that was being written when the
+    run stopped is not in the manifest and is processed again; the CSV and NDJSON
+    writers may then hold its rows twice, the SQLite writer replaces them.
+
+    Saves that were read but not written yet (the batch tool writes in save-date
+    order once every save is read) are recorded too, with their extraction
+    result pickled in <manifest>.reads/, so a restart does not read them again.
+    """
+
+    def __init__(self, manifest_path: str, resume: bool = True):
+        """
+        Args:
+            manifest_path: Path to the manifest
+            resume: Load the existing manifest; otherwise start a new one
+        """
+        self.manifest_path = manifest_path
+        self.reads_dir = f"{manifest_path}.reads"
+        self.done = {}  # absolute path -> manifest record
+        self.reads = {}  # absolute path -> manifest record of a save read but not written
+        if resume and os.path.exists(manifest_path):
+            with open(manifest_path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A line cut short by the interruption
+                        continue
+                    if "read" in record:
+                        self.reads[record["path"]] = record
+                    else:
+                        self.done[record["path"]] = record
+                        self.reads.pop(record["path"], None)
+        elif os.path.isdir(self.reads_dir):
+            shutil.rmtree(self.reads_dir)
+        self._file = open(manifest_path, 'a' if resume else 'w', encoding='utf-8')
+
+    def _matches(self, record: Optional[dict], file_path: str) -> bool:
+        signature = file_signature(file_path)
+        return record is not None and signature is not None and tuple(record["signature"]) == signature
+
+    def _append(self, record: dict):
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+
+    def is_done(self, file_path: str) -> bool:
+        return self._matches(self.done.get(os.path.abspath(file_path)), file_path)
+
+    def mark_read(self, file_path: str, result) -> bool:
+        """
+        Record a save as read, keeping its result (anything picklable, e.g. a SaveResult) until it is written.
+
+        Returns:
+            True if the result was stored
+        """
+        path = os.path.abspath(file_path)
+        name = hashlib.sha1(path.encode('utf-8')).hexdigest() + ".pickle"
+        try:
+            os.makedirs(self.reads_dir, exist_ok=True)
+            with open(os.path.join(self.reads_dir, name), 'wb') as f:
+                pickle.dump(result, f)
+        except Exception as e:
+            logger.warning(f"Couldn't keep the result of {file_path}: {e}")
+            return False
+        record = {"path": path, "signature": file_signature(file_path), "read": name}
+        self.reads[path] = record
+        self._append(record)
+        return True
+
+    def read_result(self, file_path: str):
+        """The result kept by mark_read for an unchanged save, or None."""
+        record = self.reads.get(os.path.abspath(file_path))
+        if not self._matches(record, file_path):
+            return None
+        try:
+            with open(os.path.join(self.reads_dir, record["read"]), 'rb') as f:
+                return pickle.load(f)
+        except Exception as e:
+            logger.warning(f"Couldn't load the kept result of {file_path}: {e}")
+            return None
+
+    def mark_done(self, file_path: str, **info):
+        """Record a save as written, with extra information such as its date or row count."""
+        path = os.path.abspath(file_path)
+        record = {"path": path, "signature": file_signature(file_path), **info}
+        self.done[path] = record
+        self._append(record)
+        read = self.reads.pop(path, None)
+        if read is not None:
+            try:
+                os.remove(os.path.join(self.reads_dir, read["read"]))
+            except OSError:
+                pass
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
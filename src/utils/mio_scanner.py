@@ -0,0 +1,225 @@
+import re
+import logging
+from typing import Iterable, Iterator, Optional
+
+from src.utils.compression import open_text
+
+logger = logging.getLogger(__name__)
+
+# Everything up to and including the next brace, stepping over quoted strings
+# (which may contain braces) without returning to Python for each token
+NEXT_BRACE = re.compile(r'[^"{}]*(?:"[^"]*"[^"{}]*)*([{}])')
+
+# Tokens inside an organisation block
+_TOKEN = re.compile(r'"[^"]*"|[{}=]|[^\s{}="]+')
+
+# How far back from a brace its key is looked for
+_KEY_WINDOW = 256
+
+def block_key(text: str, brace: int) -> Optional[str]:
+    """The key of the block opening at brace (`key = {`), or None for an anonymous block."""
+    head = text[max(0, brace - _KEY_WINDOW):brace].rstrip()
+    if not head.endswith('='):
+        return None
+    words = head[:-1].split()
+    if not words:
+        return None
+    key = words[-1].rpartition('{')[2].rpartition('}')[2]
+    if not key or '"' in key or '=' in key:
+        return None
+    return key
+
+def skip_block(text: str, pos: int) -> int:
+    """Find the end of the block whose opening brace ends at pos, only matching braces."""
+    depth = 1
+    for match in NEXT_BRACE.finditer(text, pos):
+        if match.group(1) == '{':
+            depth += 1
+        else:
+            depth -= 1
+            if not depth:
+                return match.end()
+    return len(text)
+
+def _parse_block(text: str, pos: int) -> tuple:
+    """
+    Parse the block whose opening brace ends at pos.
+
+    Returns:
+        (items, end) where items is a list of (key, value) pairs, values being
+        strings or nested item lists (key None for bare list values), and end is
+        the position after the closing brace
+    """
+    root = []
+    stack = [root]
+    key = None
+    after_equals = False
+    for match in _TOKEN.finditer(text, pos):
+        token = match.group()
+        if token == '=':
+            after_equals = True
+        elif token == '{':
+            block = []
+            if after_equals:
+                stack[-1].append((key, block))
+            else:
+                if key is not None:
+                    stack[-1].append((None, key))
+                stack[-1].append((None, block))
+            stack.append(block)
+            key = None
+            after_equals = False
+        elif token == '}':
+            if key is not None:
+                stack[-1].append((None, key))
+                key = None
+            stack.pop()
+            if not stack:
+                return root, match.end()
+        elif after_equals:
+            stack[-1].append((key, token))
+            key = None
+            after_equals = False
+        else:
+            if key is not None:
+                stack[-1].append((None, key))
+            key = token
+    # Unterminated block: keep what was read
+    return root, len(text)
+
+def _unquote(value):
+    if isinstance(value, str) and len(value) >= 2 and value[0] == '"' and value[-1] == '"':
+        return value[1:-1]
+    return value
+
+def _number(value, number_type=float):
+    try:
+        return number_type(value)
+    except (TypeError, ValueError):
+        return None
+
+def _first(items: list, key: str):
+    for item_key, value in items:
+        if item_key == key:
+            return value
+    return None
+
+def _organisation_record(tag: str, name: str, items: list) -> dict:
+    """Build an organisation record, in the shape of save_extract.extract_organisation."""
+    id_block = _first(items, 'id')
+    traits = []
+    for queued, trait_key in ((False, 'unlocked'), (True, 'queued_trait')):
+        for key, block in items:
+            if key == trait_key and isinstance(block, list):
+                trait = _first(block, 'trait')
+                if isinstance(trait, str):
+                    traits.append((_unquote(trait), queued))
+
+    history = []
+    for key, entry in items:
+        if key != 'history' or not isinstance(entry, list):
+            continue
+        equipment = _first(entry, 'equipment')
+        if not isinstance(equipment, list):
+            continue
+        data = _first(entry, 'data')
+        if not isinstance(data, list):
+            data = []
+        date = _first(data, 'date')
+        history.append({
+            'equipment_id': _number(_first(equipment, 'id'), int),
+            'equipment_type': _number(_first(equipment, 'type'), int),
+            'date': _unquote(date) if isinstance(date, str) else None,
+            'units': _number(_first(data, 'units'), int) or 0,
+        })
+
+    return {
+        'tag': tag,
+        'name': name,
+        'org_id': _number(_first(id_block, 'id'), int) if isinstance(id_block, list) else None,
+        'funds': _number(_first(items, 'funds')),
+        'size': _number(_first(items, 'size'), int),
+        'research_bonus': _number(_first(items, 'research_bonus')),
+        'traits': traits,
+        'history': history,
+    }
+
+def _on_organisation_path(stack: list) -> bool:
+    """Whether a block opened under stack can lead to industrial_organisations, so its key is needed."""
+    if not stack:
+        return True
+    if stack[0] == 'countries':
+        # countries={ TAG={ production={ industrial_organisations={
+        return len(stack) < 3 or (len(stack) == 3 and stack[2] == 'production')
+    # A production block on its own
+    return stack == ['production']
+
+def _owner_tag(stack: list, org_name: str) -> str:
+    # countries={ TAG={ production={ industrial_organisations={ ... the tag is 3 levels up.
+    # Without the countries block (a cut-out production block), fall back to the name prefix.
+    if len(stack) >= 3 and stack[-3] is not None and stack[-2] == 'production':
+        return stack[-3]
+    return org_name.split('_', 1)[0]
+
+def iter_organisations(text: str, tags: Optional[Iterable[str]] = None) -> Iterator[dict]:
+    """
+    Scan save text for industrial organisations in a single pass.
+
+    Braces are matched across the whole text once; only organisation blocks are
+    tokenized, and the scan continues after each one, so no part of the text is
+    read twice.
+
+    Args:
+        text: Melted save text (or any part of it containing production blocks)
+        tags: Only emit organisations of these country tags (optional, default all)
+
+    Yields:
+        Organisation records with tag, name, org_id, funds, size, research_bonus,
+        traits [(trait, queued)] and history [{equipment_id, equipment_type, date, units}]
+    """
+    tags = set(tags) if tags is not None else None
+    stack = []
+    pos = 0
+    search = NEXT_BRACE.search
+    while True:
+        match = search(text, pos)
+        if match is None:
+            break
+        pos = match.end()
+        if match.group(1) == '}':
+            if stack:
+                stack.pop()
+            continue
+
+        in_organisations = bool(stack) and stack[-1] == 'industrial_organisations'
+        if not in_organisations and not _on_organisation_path(stack):
+            pos = skip_block(text, pos)
+            continue
+        key = block_key(text, match.start(1))
+        if in_organisations and key is not None:
+            tag = _owner_tag(stack, key)
+            if tags is None or tag in tags:
+                items, pos = _parse_block(text, pos)
+                yield _organisation_record(tag, key, items)
+            else:
+                pos = skip_block(text, pos)
+            continue
+        stack.append(key)
+
+def scan_organisations(text: str, tags: Optional[Iterable[str]] = None) -> list:
+    """List the industrial organisations in save text; see iter_organisations."""
+    return list(iter_organisations(text, tags))
+
+def scan_file(file_path: str, tags: Optional[Iterable[str]] = None) -> list:
+    """
+    List the industrial organisations in a melted save file (optionally compressed).
+
+    Args:
+        file_path: Path to the melted save
+        tags: Only return organisations of these country tags (optional, default all)
+
+    Returns:
+        Organisation records, see iter_organisations
+    """
+    with open_text(file_path, encoding='utf-8', errors='ignore') as f:
+        return scan_organisations(f.read(), tags)
@@ -0,0 +1,198 @@
+import os
+import json
+import hashlib
+import logging
+from typing import Optional
+
+import pyradox
+from src.utils.melter import is_binary_file, parse_save_stream
+
+logger = logging.getLogger(__name__)
+
+def file_content_hash(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Compute the SHA-1 hash of a file's content.
+
+    Args:
+        file_path: Path to the file
+        chunk_size: Number of bytes read at a time
+
+    Returns:
+        Hex digest of the file content
+    """
+    digest = hashlib.sha1()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _to_str(value) -> Optional[str]:
+    """Convert a parsed value to a string, keeping None as None."""
+    if value is None:
+        return None
+    return str(value)
+
+def _to_number(value, number_type=float):
+    """Convert a parsed value to a number, returning None if it is not numeric."""
+    try:
+        return number_type(value)
+    except (TypeError, ValueError):
+        return None
+
+def extract_equipment(tree) -> list:
+    """
+    Extract equipment id -> name mappings from a parsed save.
+
+    Args:
+        tree: Parsed save (pyradox Tree)
+
+    Returns:
+        List of (equipment_id, equipment_type, name) tuples
+    """
+    equipment = []
+    equipments = tree['equipments']
+    if not isinstance(equipments, pyradox.Tree):
+        return equipment
+
+    for name, items in equipments.items():
+        if not isinstance(items, pyradox.Tree):
+            continue
+        id_block = items['id']
+        if isinstance(id_block, pyradox.Tree):
+            equipment_id = _to_number(id_block['id'], int)
+            equipment_type = _to_number(id_block['type'], int)
+            if equipment_id is not None and equipment_type is not None:
+                equipment.append((equipment_id, equipment_type, str(name)))
+    return equipment
+
+def extract_organisation(tag: str, name: str, org) -> dict:
+    """
+    Extract one industrial organisation from its parsed block.
+
+    Args:
+        tag: Country tag owning the organisation
+        name: Organisation key, e.g. SOV_tula_arms_plant_organization
+        org: Parsed organisation block (pyradox Tree)
+
+    Returns:
+        Organisation record with funds, size, research_bonus, traits and history
+    """
+    id_block = org['id']
+    traits = []
+    for queued, key in ((False, 'unlocked'), (True, 'queued_trait')):
+        for trait_block in org.find_all(key):
+            if isinstance(trait_block, pyradox.Tree) and trait_block['trait'] is not None:
+                traits.append((str(trait_block['trait']), queued))
+
+    history = []
+    for entry in org.find_all('history'):
+        if not isinstance(entry, pyradox.Tree):
+            continue
+        equipment = entry['equipment']
+        data = entry['data']
+        if not isinstance(equipment, pyradox.Tree):
+            continue
+        history.append({
+            'equipment_id': _to_number(equipment['id'], int),
+            'equipment_type': _to_number(equipment['type'], int),
+            'date': _to_str(data['date']) if isinstance(data, pyradox.Tree) else None,
+            'units': (_to_number(data['units'], int) or 0) if isinstance(data, pyradox.Tree) else 0,
+        })
+
+    return {
+        'tag': tag,
+        'name': name,
+        'org_id': _to_number(id_block['id'], int) if isinstance(id_block, pyradox.Tree) else None,
+        'funds': _to_number(org['funds']),
+        'size': _to_number(org['size'], int),
+        'research_bonus': _to_number(org['research_bonus']),
+        'traits': traits,
+        'history': history,
+    }
+
+def extract_from_tree(tree) -> dict:
+    """
+    Extract the data kept in the save store from a parsed save.
+
+    Args:
+        tree: Parsed save (pyradox Tree)
+
+    Returns:
+        Dictionary with header fields, countries, organisations and equipment
+    """
+    countries = []
+    organisations = []
+
+    countries_block = tree['countries']
+    if isinstance(countries_block, pyradox.Tree):
+        for tag, country in countries_block.items():
+            if not isinstance(country, pyradox.Tree):
+                continue
+            tag = str(tag)
+            countries.append(tag)
+            production = country['production']
+            if not isinstance(production, pyradox.Tree):
+                continue
+            orgs = production['industrial_organisations']
+            if not isinstance(orgs, pyradox.Tree):
+                continue
+            for org_name, org in orgs.items():
+                if isinstance(org, pyradox.Tree):
+                    organisations.append(extract_organisation(tag, str(org_name), org))
+
+    return {
+        'date': _to_str(tree['date']),
+        'player': _to_str(tree['player']),
+        'game_unique_id': _to_str(tree['game_unique_id']),
+        'countries': countries,
+        'organisations': organisations,
+        'equipment': extract_equipment(tree),
+    }
+
+def snapshot_sections(tree) -> list:
+    """
+    Serialize each top-level section of a parsed save for the snapshot store.
+
+    Dates and colors become strings, as in the JSON export. Texts are written
+    deterministically, so equal sections in two saves give equal texts.
+
+    Args:
+        tree: Parsed save (pyradox Tree)
+
+    Returns:
+        List of (section, json_text) tuples in save order
+    """
+    return [
+        (str(key), json.dumps(value, default=str, separators=(',', ':'), ensure_ascii=False))
+        for key, value in tree.to_python().items()
+    ]
+
+def extract_save(file_path: str, melted_dir: Optional[str] = None, content_hash: Optional[str] = None,
+                 snapshot: bool = False) -> dict:
+    """
+    Parse (melting binary saves on the fly) and extract a HOI4 save file.
+
+    Args:
+        file_path: Path to the save file
+        melted_dir: Directory to also keep the melted text of a binary save in (optional)
+        content_hash: Hash of the file content if already known (optional)
+        snapshot: Also serialize the whole save for the snapshot store
+
+    Returns:
+        Extracted data (see extract_from_tree) plus 'path' and 'content_hash',
+        and 'sections' (see snapshot_sections) if snapshot is set
+    """
+    if content_hash is None:
+        content_hash = file_content_hash(file_path)
+    tee_path = None
+    if melted_dir is not None and is_binary_file(file_path):
+        tee_path = os.path.join(melted_dir, os.path.basename(file_path) + ".txt")
+    logger.info(f"Parsing {file_path}")
+    tree = parse_save_stream(file_path, tee_path=tee_path)
+
+    result = extract_from_tree(tree)
+    result['path'] = os.path.abspath(file_path)
+    result['content_hash'] = content_hash
+    if snapshot:
+        result['sections'] = snapshot_sections(tree)
+    return result
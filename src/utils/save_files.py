@@ -0,0 +1,41 @@
+import os
+import glob
+import logging
+from typing import Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+def expand_paths(patterns: Iterable[str]) -> list:
+    """
+    Expand files, directories and glob patterns into a sorted list of save files.
+
+    Args:
+        patterns: Save files, directories (all *.hoi4 files in them) or glob patterns
+
+    Returns:
+        Sorted list of distinct paths; missing files are logged and left out
+    """
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            paths.extend(glob.glob(os.path.join(pattern, "*.hoi4")))
+        elif any(ch in pattern for ch in "*?["):
+            paths.extend(glob.glob(pattern))
+        elif os.path.exists(pattern):
+            paths.append(pattern)
+        else:
+            logger.error(f"File not found: {pattern}")
+    return sorted(set(paths))
+
+def file_signature(file_path: str) -> Optional[tuple]:
+    """
+    Get a cheap change signature for a file.
+
+    Returns:
+        (size, mtime) tuple, or None if the file cannot be read
+    """
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime
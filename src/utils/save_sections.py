@@ -0,0 +1,266 @@
+import os
+import re
+import json
+import time
+import logging
+import concurrent.futures
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+from src.utils import instrument
+from src.utils.compression import open_text
+from src.utils.melt_backends import parse_lines
+from src.utils.melt_cache import MeltCache, shared_melt_cache
+from src.utils.melter import is_binary_file
+from src.utils.mio_scanner import NEXT_BRACE, block_key, skip_block
+
+logger = logging.getLogger(__name__)
+
+class SectionsResult(NamedTuple):
+    """Sections of one save loaded by load_save_sections, as returned from a worker process."""
+    file_path: str
+    data: Optional[dict]
+    # Content hash of the file, the same for renamed copies of a save
+    fingerprint: Optional[str]
+    from_cache: bool
+    seconds: float
+    error: Optional[str] = None
+
+# Version of the sections cache format written by write_cached_sections
+SECTIONS_VERSION = 1
+
+# The parts of a save the GUI tabs show: the header, the equipment names and
+# the industrial organisations of every country. "*" matches any key.
+GUI_PATHS = (
+    ("date",),
+    ("player",),
+    ("equipments",),
+    ("countries", "*", "production", "industrial_organisations"),
+)
+
+# key=value pairs between blocks
+_PAIR = re.compile(r'([^\s{}="]+)\s*=\s*("[^"]*"|[^\s{}="]+)')
+
+def _matches(pattern: tuple, path: tuple) -> bool:
+    """Whether a path of keys matches a declared path of the same length."""
+    return len(pattern) == len(path) and all(part == "*" or part == key for part, key in zip(pattern, path))
+
+def _leads_to(pattern: tuple, path: tuple) -> bool:
+    """Whether a declared path lies below a block path."""
+    return len(pattern) > len(path) and _matches(pattern[:len(path)], path)
+
+def _insert(data: dict, path: tuple, value):
+    """Put a value at a path, turning repeated keys into lists as Tree.to_python does."""
+    for key in path[:-1]:
+        data = data.setdefault(key, {})
+    key = path[-1]
+    if key not in data:
+        data[key] = value
+    elif isinstance(data[key], list):
+        data[key].append(value)
+    else:
+        data[key] = [data[key], value]
+
+def _parse(text: str, filename: str) -> dict:
+    """Parse a piece of save text into plain Python data."""
+    return parse_lines(text.splitlines(), filename).to_python()
+
+def _read_values(text: str, stack: tuple, keys: set, data: dict, filename: str):
+    """Add the declared key=value pairs found between the blocks of one level."""
+    pairs = [match.group() for match in _PAIR.finditer(text) if match.group(1) in keys or "*" in keys]
+    if pairs:
+        for key, value in _parse("\n".join(pairs), filename).items():
+            for item in value if isinstance(value, list) else [value]:
+                _insert(data, stack + (key,), item)
+
+def extract_sections(text: str, paths: Iterable[tuple] = GUI_PATHS, filename: str = "<save>") -> dict:
+    """
+    Extract only the declared sections of save text, in the shape of the fully converted save.
+
+    Braces are matched once across the text, as in mio_scanner; only blocks on
+    the way to a declared path are entered, and only the declared blocks and
+    values are parsed, so the rest of the save is never tokenized or converted.
+
+    Args:
+        text: Melted save text
+        paths: Declared paths, tuples of keys from the top level ("*" matches any key)
+        filename: Name used in parse errors
+
+    Returns:
+        Dictionary with the declared sections, nested as in Tree.to_python()
+        (e.g. {"countries": {"SOV": {"production": {"industrial_organisations": {...}}}}})
+    """
+    paths = [tuple(path) for path in paths]
+    data = {}
+    stack = ()
+    # Skip a byte order mark, which would become part of the first key
+    pos = 1 if text.startswith('\ufeff') else 0
+    search = NEXT_BRACE.search
+    while True:
+        match = search(text, pos)
+        brace = match.start(1) if match else len(text)
+        keys = {path[-1] for path in paths if _matches(path[:-1], stack) and len(path) == len(stack) + 1}
+        if keys:
+            _read_values(text[pos:brace], stack, keys, data, filename)
+        if match is None:
+            break
+        pos = match.end()
+        if match.group(1) == '}':
+            stack = stack[:-1]
+            continue
+
+        key = block_key(text, brace)
+        path = stack + (key,)
+        if key is not None and any(_matches(pattern, path) for pattern in paths):
+            end = skip_block(text, pos)
+            _insert(data, path, _parse(f"{key}={text[brace:end]}", filename)[key])
+            pos = end
+        elif key is not None and any(_leads_to(pattern, path) for pattern in paths):
+            stack = path
+        else:
+            pos = skip_block(text, pos)
+    return data
+
+def read_sections(file_path: str, melt_cache=None, paths: Iterable[tuple] = GUI_PATHS) -> dict:
+    """
+    Extract the declared sections of a save file (see extract_sections).
+
+    Args:
+        file_path: Path to the save (binary, text or compressed melted text)
+        melt_cache: MeltCache to melt binary saves through (optional, defaults to a MeltCache in melted_saves/cache)
+        paths: Declared paths
+
+    Returns:
+        Dictionary with the declared sections
+
+    Raises:
+        RuntimeError: If a binary save could not be melted
+    """
+    readable_path = file_path
+    if is_binary_file(file_path):
+        if melt_cache is None:
+            melt_cache = MeltCache(max_buffers=0)
+        readable_path = melt_cache.melted_path(file_path)
+        if readable_path == file_path:
+            raise RuntimeError(f"Couldn't melt {file_path}")
+    with instrument.span("read"), open_text(readable_path, encoding='utf-8', errors='ignore') as f:
+        text = f.read()
+    instrument.count("bytes.read", len(text))
+    with instrument.span("extract"):
+        return extract_sections(text, paths, file_path)
+
+def sections_path(cache_path: str) -> str:
+    """Path of the sections cache of a save's cache entry (cache/<hash>.json -> cache/<hash>.sections.json)."""
+    return os.path.splitext(cache_path)[0] + ".sections.json"
+
+def load_cached_sections(cache_path: str, paths: Iterable[tuple] = GUI_PATHS) -> Optional[dict]:
+    """
+    Read sections written by write_cached_sections.
+
+    Args:
+        cache_path: Path of the sections cache
+        paths: Declared paths the sections must have been extracted with
+
+    Returns:
+        The sections, or None if the cache is missing, unreadable or was written for other paths
+    """
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        with instrument.span("read.cache"), open(cache_path, encoding='utf-8') as f:
+            cached = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring sections cache {cache_path}: {e}")
+        return None
+    if cached.get("version") != SECTIONS_VERSION or cached.get("paths") != [list(path) for path in paths]:
+        return None
+    return cached.get("data")
+
+def write_cached_sections(cache_path: str, data: dict, paths: Iterable[tuple] = GUI_PATHS) -> bool:
+    """
+    Store extracted sections, with the paths they were extracted with.
+
+    Args:
+        cache_path: Path of the sections cache
+        data: Sections, see extract_sections
+        paths: Declared paths used for data
+
+    Returns:
+        True if the cache was written
+    """
+    try:
+        with instrument.span("cache write"), open(cache_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": SECTIONS_VERSION, "paths": [list(path) for path in paths], "data": data}, f)
+        return True
+    except (OSError, TypeError, ValueError) as e:
+        logger.warning(f"Couldn't save sections cache {cache_path}: {e}")
+        return False
+
+def load_save_sections(file_path: str, cache_path: Optional[str], melt_cache_dir: str,
+                       paths: Iterable[tuple] = GUI_PATHS) -> SectionsResult:
+    """
+    Load the declared sections of a save from its sections cache, or extract and cache them.
+
+    JSON exports of a save (see read_with_pyradox.save_to_json) are read as they are.
+    Runs in a worker process, so everything it returns is plain data.
+
+    Args:
+        file_path: Path to the save or JSON export
+        cache_path: The save's cache entry, see sections_path (optional, None to not cache)
+        melt_cache_dir: Directory binary saves are melted into, shared by all workers
+        paths: Declared paths
+
+    Returns:
+        SectionsResult, with error set instead of raising
+    """
+    start = time.perf_counter()
+    try:
+        melt_cache = shared_melt_cache(melt_cache_dir)
+        fingerprint = melt_cache.fingerprint(file_path)
+        if file_path.lower().endswith('.json'):
+            with open(file_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return SectionsResult(file_path, data, fingerprint, False, time.perf_counter() - start)
+
+        cached_path = sections_path(cache_path) if cache_path is not None else None
+        data = load_cached_sections(cached_path, paths) if cached_path is not None else None
+        from_cache = data is not None
+        if not from_cache:
+            data = read_sections(file_path, melt_cache, paths)
+            if cached_path is not None:
+                write_cached_sections(cached_path, data, paths)
+        return SectionsResult(file_path, data, fingerprint, from_cache, time.perf_counter() - start)
+    except Exception as e:
+        logger.exception(f"Error loading {file_path}")
+        return SectionsResult(file_path, None, None, False, time.perf_counter() - start, str(e))
+
+def iter_load_sections(tasks: Iterable[tuple], melt_cache_dir: str, paths: Iterable[tuple] = GUI_PATHS,
+                       jobs: Optional[int] = None) -> Iterator[SectionsResult]:
+    """
+    Load many saves with load_save_sections in a process pool, yielding each as soon as it is ready.
+
+    Args:
+        tasks: (file_path, cache_path) pairs
+        melt_cache_dir: Directory binary saves are melted into
+        paths: Declared paths
+        jobs: Number of worker processes (optional, defaults to the core count; 1 loads in this process)
+
+    Yields:
+        SectionsResult for each task, in completion order
+    """
+    tasks = list(tasks)
+    paths = [tuple(path) for path in paths]
+    jobs = min(jobs or os.cpu_count() or 1, max(len(tasks), 1))
+    if jobs == 1:
+        for file_path, cache_path in tasks:
+            yield load_save_sections(file_path, cache_path, melt_cache_dir, paths)
+        return
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(load_save_sections, file_path, cache_path, melt_cache_dir, paths)
+                   for file_path, cache_path in tasks]
+        try:
+            for future in concurrent.futures.as_completed(futures):
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
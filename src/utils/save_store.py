@@ -0,0 +1,595 @@
+import os
+import re
+import json
+import time
+import zlib
+import hashlib
+import sqlite3
+import logging
+from typing import Iterable, Optional
+
+import pyradox
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_NAME = "hoi4_stats.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS saves (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    content_hash TEXT NOT NULL UNIQUE,
+    campaign TEXT,
+    player TEXT,
+    save_date TEXT,
+    date_key INTEGER,
+    month TEXT,
+    ingested_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS countries (
+    save_id INTEGER NOT NULL REFERENCES saves(id) ON DELETE CASCADE,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (save_id, tag)
+);
+CREATE TABLE IF NOT EXISTS organisations (
+    id INTEGER PRIMARY KEY,
+    save_id INTEGER NOT NULL REFERENCES saves(id) ON DELETE CASCADE,
+    tag TEXT NOT NULL,
+    name TEXT NOT NULL,
+    org_id INTEGER,
+    funds REAL,
+    size INTEGER,
+    research_bonus REAL
+);
+CREATE TABLE IF NOT EXISTS organisation_traits (
+    organisation_id INTEGER NOT NULL REFERENCES organisations(id) ON DELETE CASCADE,
+    trait TEXT NOT NULL,
+    queued INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS history (
+    organisation_id INTEGER NOT NULL REFERENCES organisations(id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    equipment_id INTEGER,
+    equipment_type INTEGER,
+    date TEXT,
+    units INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS equipment (
+    save_id INTEGER NOT NULL REFERENCES saves(id) ON DELETE CASCADE,
+    equipment_id INTEGER NOT NULL,
+    equipment_type INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    PRIMARY KEY (save_id, equipment_id, equipment_type)
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    save_id INTEGER PRIMARY KEY REFERENCES saves(id) ON DELETE CASCADE,
+    campaign TEXT,
+    parent_save_id INTEGER REFERENCES snapshots(save_id)
+);
+CREATE TABLE IF NOT EXISTS snapshot_sections (
+    save_id INTEGER NOT NULL REFERENCES snapshots(save_id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    section TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    data BLOB,
+    PRIMARY KEY (save_id, section)
+);
+CREATE INDEX IF NOT EXISTS idx_saves_campaign_date ON saves (campaign, date_key);
+CREATE INDEX IF NOT EXISTS idx_organisations_save_tag ON organisations (save_id, tag);
+CREATE INDEX IF NOT EXISTS idx_organisations_tag_name ON organisations (tag, name);
+CREATE INDEX IF NOT EXISTS idx_traits_organisation ON organisation_traits (organisation_id);
+CREATE INDEX IF NOT EXISTS idx_history_organisation ON history (organisation_id, seq);
+CREATE INDEX IF NOT EXISTS idx_history_equipment ON history (equipment_id, equipment_type);
+CREATE INDEX IF NOT EXISTS idx_snapshots_campaign ON snapshots (campaign, save_id);
+"""
+
+# Kinds of snapshot section rows: the whole section, a patch against the
+# same section of the parent snapshot, or no change from the parent.
+SECTION_FULL = "full"
+SECTION_PATCH = "patch"
+SECTION_SAME = "same"
+
+def default_db_path(base_dir: Optional[str] = None) -> str:
+    """
+    Get the default path of the save store database.
+
+    Args:
+        base_dir: Directory containing the database (optional, defaults to the project directory)
+
+    Returns:
+        Path to the database file
+    """
+    if base_dir is None:
+        base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    return os.path.join(base_dir, DEFAULT_DB_NAME)
+
+def _compress_json(text: str) -> bytes:
+    """Compress a JSON text for storage in a snapshot section."""
+    return zlib.compress(text.encode('utf-8'), 6)
+
+def date_key(save_date: Optional[str]) -> Optional[int]:
+    """
+    Convert a HOI4 date string like "1940.11.1.1" to a sortable integer.
+
+    Returns:
+        YYYYMMDDHH as an integer, or None if the date cannot be read
+    """
+    if not save_date:
+        return None
+    match = re.match(r'^(\d+)\.(\d+)\.(\d+)(?:\.(\d+))?$', save_date)
+    if not match:
+        return None
+    year, month, day, hour = match.groups()
+    return ((int(year) * 100 + int(month)) * 100 + int(day)) * 100 + int(hour or 0)
+
+def date_month(save_date: Optional[str]) -> Optional[str]:
+    """Convert a HOI4 date string to a "YYYY-MM" month label."""
+    key = date_key(save_date)
+    if key is None:
+        return None
+    return f"{key // 1000000:04d}-{key // 10000 % 100:02d}"
+
+class SaveStore:
+    """
+    SQLite store of data extracted from many saves.
+
+    Each save is identified by the hash of its content, so ingesting the same
+    file twice is a no-op. Saves from the same campaign share the
+    game_unique_id from the save header.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or default_db_path()
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript(SCHEMA)
+        # Latest snapshot of each campaign: {campaign: (save_id, {section: (digest, json_text)})}
+        self._snapshot_heads = {}
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def has_save(self, content_hash: str) -> bool:
+        """Check whether a save with this content hash was already ingested."""
+        row = self.conn.execute("SELECT 1 FROM saves WHERE content_hash = ?", (content_hash,)).fetchone()
+        return row is not None
+
+    def ingest(self, extracted: dict) -> int:
+        """
+        Add one extracted save (see save_extract.extract_save) to the store.
+
+        All rows are inserted in a single transaction with batched inserts.
+
+        Returns:
+            The id of the save row (the existing one if this content was already ingested)
+        """
+        existing = self.conn.execute(
+            "SELECT id FROM saves WHERE content_hash = ?", (extracted['content_hash'],)
+        ).fetchone()
+        if existing is not None:
+            logger.info(f"Already ingested: {extracted.get('path')}")
+            return existing['id']
+
+        save_date = extracted.get('date')
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO saves (path, content_hash, campaign, player, save_date, date_key, month, ingested_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (extracted.get('path'), extracted['content_hash'], extracted.get('game_unique_id'),
+                 extracted.get('player'), save_date, date_key(save_date), date_month(save_date), time.time())
+            )
+            save_id = cursor.lastrowid
+
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO countries (save_id, tag) VALUES (?, ?)",
+                ((save_id, tag) for tag in extracted.get('countries', []))
+            )
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO equipment (save_id, equipment_id, equipment_type, name) VALUES (?, ?, ?, ?)",
+                ((save_id, equipment_id, equipment_type, name)
+                 for equipment_id, equipment_type, name in extracted.get('equipment', []))
+            )
+
+            traits = []
+            history = []
+            for org in extracted.get('organisations', []):
+                cursor = self.conn.execute(
+                    "INSERT INTO organisations (save_id, tag, name, org_id, funds, size, research_bonus) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (save_id, org['tag'], org['name'], org.get('org_id'), org.get('funds'),
+                     org.get('size'), org.get('research_bonus'))
+                )
+                organisation_id = cursor.lastrowid
+                traits.extend((organisation_id, trait, int(queued)) for trait, queued in org.get('traits', []))
+                history.extend(
+                    (organisation_id, seq, entry.get('equipment_id'), entry.get('equipment_type'),
+                     entry.get('date'), entry.get('units') or 0)
+                    for seq, entry in enumerate(org.get('history', []))
+                )
+
+            self.conn.executemany(
+                "INSERT INTO organisation_traits (organisation_id, trait, queued) VALUES (?, ?, ?)", traits
+            )
+            self.conn.executemany(
+                "INSERT INTO history (organisation_id, seq, equipment_id, equipment_type, date, units) "
+                "VALUES (?, ?, ?, ?, ?, ?)", history
+            )
+
+            # In the same transaction, so a save is never stored without its snapshot
+            if 'sections' in extracted:
+                head = self._insert_snapshot(save_id, extracted.get('game_unique_id'), extracted['sections'])
+        if 'sections' in extracted:
+            self._snapshot_heads[extracted.get('game_unique_id')] = head[:2]
+
+        logger.info(f"Ingested {extracted.get('path')} as save {save_id}")
+        return save_id
+
+    def store_snapshot(self, save_id: int, campaign: Optional[str], sections: list) -> int:
+        """
+        Store a whole save as a delta against the previous snapshot of its campaign.
+
+        The first snapshot of a campaign is stored in full. Later ones store, per
+        top-level section, nothing if the section is unchanged, a patch (see
+        pyradox.diff.make_patch) if it changed, or the whole section if it is new.
+        Only changed sections are decoded and diffed. The previous snapshot is the
+        latest one by game date that is not after this save, so saves ingested
+        out of order still get deltas against an earlier game date.
+
+        Args:
+            save_id: Id of the save row
+            campaign: game_unique_id of the save
+            sections: List of (section, json_text) tuples (see save_extract.snapshot_sections)
+
+        Returns:
+            Number of compressed bytes written
+        """
+        with self.conn:
+            head = self._insert_snapshot(save_id, campaign, sections)
+        self._snapshot_heads[campaign] = head[:2]
+        return head[2]
+
+    def _insert_snapshot(self, save_id: int, campaign: Optional[str], sections: list) -> tuple:
+        """
+        Insert the rows of store_snapshot in the caller's transaction.
+
+        Returns:
+            (save_id, {section: (digest, json_text)}, size); the first two are the campaign's head once committed
+        """
+        date_key = self.conn.execute("SELECT date_key FROM saves WHERE id = ?", (save_id,)).fetchone()
+        parent_id, parent_sections = self._snapshot_head(campaign, date_key[0] if date_key is not None else None)
+        head = {}
+        rows = []
+        for seq, (section, text) in enumerate(sections):
+            digest = hashlib.sha1(text.encode('utf-8')).digest()
+            head[section] = (digest, text)
+            parent = parent_sections.get(section)
+            if parent is None:
+                rows.append((save_id, seq, section, SECTION_FULL, _compress_json(text)))
+            elif parent[0] == digest:
+                rows.append((save_id, seq, section, SECTION_SAME, None))
+            else:
+                patch = pyradox.diff.make_patch(json.loads(parent[1]), json.loads(text))
+                rows.append((save_id, seq, section, SECTION_PATCH, _compress_json(json.dumps(patch, separators=(',', ':')))))
+
+        self.conn.execute(
+            "INSERT INTO snapshots (save_id, campaign, parent_save_id) VALUES (?, ?, ?)",
+            (save_id, campaign, parent_id)
+        )
+        self.conn.executemany(
+            "INSERT INTO snapshot_sections (save_id, seq, section, kind, data) VALUES (?, ?, ?, ?, ?)", rows
+        )
+
+        size = sum(len(row[4]) for row in rows if row[4] is not None)
+        logger.info(f"Stored snapshot of save {save_id}: {size} bytes, "
+                    f"{sum(row[3] == SECTION_SAME for row in rows)}/{len(rows)} sections unchanged")
+        return save_id, head, size
+
+    def _snapshot_head(self, campaign: Optional[str], before_key: Optional[int] = None) -> tuple:
+        """
+        Get (save_id, {section: (digest, json_text)}) of the latest snapshot of a campaign by game date.
+
+        Args:
+            campaign: game_unique_id of the campaign
+            before_key: Only consider snapshots whose date_key is not after this one (optional)
+        """
+        row = self.conn.execute(
+            "SELECT snapshots.save_id FROM snapshots JOIN saves ON saves.id = snapshots.save_id "
+            "WHERE snapshots.campaign IS ? AND (? IS NULL OR saves.date_key <= ?) "
+            "ORDER BY saves.date_key DESC, snapshots.save_id DESC LIMIT 1",
+            (campaign, before_key, before_key)
+        ).fetchone()
+        if row is None:
+            return None, {}
+        cached = self._snapshot_heads.get(campaign)
+        if cached is not None and cached[0] == row['save_id']:
+            return cached
+        head = {}
+        for section, value in self.load_snapshot(row['save_id']).items():
+            text = json.dumps(value, separators=(',', ':'), ensure_ascii=False)
+            head[section] = (hashlib.sha1(text.encode('utf-8')).digest(), text)
+        return row['save_id'], head
+
+    def _snapshot_chain(self, save_id: int) -> list:
+        """Get the snapshot save ids from the campaign's base snapshot up to save_id."""
+        chain = []
+        while save_id is not None:
+            chain.append(save_id)
+            row = self.conn.execute(
+                "SELECT parent_save_id FROM snapshots WHERE save_id = ?", (save_id,)
+            ).fetchone()
+            if row is None:
+                raise KeyError(f"No snapshot stored for save {save_id}")
+            save_id = row['parent_save_id']
+        chain.reverse()
+        return chain
+
+    def _apply_section_rows(self, values: dict, rows) -> dict:
+        """Apply one snapshot's section rows to the section values of its parent."""
+        result = {}
+        for row in rows:
+            if row['kind'] == SECTION_FULL:
+                result[row['section']] = json.loads(zlib.decompress(row['data']))
+            elif row['kind'] == SECTION_SAME:
+                result[row['section']] = values[row['section']]
+            else:
+                patch = json.loads(zlib.decompress(row['data']))
+                result[row['section']] = pyradox.diff.apply_patch(values[row['section']], patch)
+        return result
+
+    def load_snapshot(self, save_id: int, sections: Optional[Iterable[str]] = None) -> dict:
+        """
+        Rebuild a stored save by applying deltas from its campaign's base snapshot.
+
+        Args:
+            save_id: Id of the save
+            sections: Only rebuild these top-level sections (optional)
+
+        Returns:
+            Dictionary of {section: value}, as a JSON export of the save would contain
+        """
+        query = "SELECT section, kind, data FROM snapshot_sections WHERE save_id = ?"
+        if sections is not None:
+            sections = list(sections)
+            if not sections:
+                return {}
+            query += f" AND section IN ({','.join('?' * len(sections))})"
+        query += " ORDER BY seq"
+
+        values = {}
+        for chain_id in self._snapshot_chain(save_id):
+            rows = self.conn.execute(query, [chain_id] + (sections or []))
+            values = self._apply_section_rows(values, rows)
+        return values
+
+    def section_history(self, section: str, campaign: Optional[str] = None):
+        """
+        Iterate over one top-level section across all snapshots of a campaign.
+
+        Only this section's deltas are read and applied, once each, so no full
+        save is rebuilt. Each delta is applied to the value of its own parent
+        snapshot, and snapshots are visited in game date order, so saves ingested
+        out of order come out right. Values are kept only until every snapshot
+        based on them has been rebuilt.
+
+        Yields:
+            (save dict, value) tuples; value is None where the save has no such section
+        """
+        snapshots = self.conn.execute(
+            "SELECT sn.save_id, sn.parent_save_id, s.path, s.save_date, s.campaign "
+            "FROM snapshots sn JOIN saves s ON s.id = sn.save_id "
+            "WHERE sn.campaign IS ? ORDER BY s.date_key, sn.save_id", (campaign,)
+        ).fetchall()
+        parents = {snapshot['save_id']: snapshot['parent_save_id'] for snapshot in snapshots}
+        children = {}
+        for parent_id in parents.values():
+            children[parent_id] = children.get(parent_id, 0) + 1
+        values = {}
+        yielded = set()
+
+        def release(save_id):
+            if children.get(save_id, 0) == 0 and save_id in yielded:
+                values.pop(save_id, None)
+
+        def value_of(save_id):
+            if save_id in values:
+                return values[save_id]
+            parent_id = parents.get(save_id)
+            parent_value = value_of(parent_id) if parent_id is not None else None
+            rows = self.conn.execute(
+                "SELECT section, kind, data FROM snapshot_sections WHERE save_id = ? AND section = ?",
+                (save_id, section)
+            )
+            values[save_id] = self._apply_section_rows({section: parent_value}, rows).get(section)
+            if parent_id is not None:
+                children[parent_id] -= 1
+                release(parent_id)
+            return values[save_id]
+
+        for snapshot in snapshots:
+            value = value_of(snapshot['save_id'])
+            yielded.add(snapshot['save_id'])
+            release(snapshot['save_id'])
+            yield {key: snapshot[key] for key in ('save_id', 'path', 'save_date', 'campaign')}, value
+
+    def snapshot_sizes(self) -> list:
+        """Compressed bytes stored per campaign, split into full sections and patches."""
+        query = """
+            SELECT sn.campaign, COUNT(DISTINCT sn.save_id) AS snapshots,
+                   COALESCE(SUM(CASE WHEN ss.kind = 'full' THEN LENGTH(ss.data) END), 0) AS full_bytes,
+                   COALESCE(SUM(CASE WHEN ss.kind = 'patch' THEN LENGTH(ss.data) END), 0) AS patch_bytes
+            FROM snapshots sn JOIN snapshot_sections ss ON ss.save_id = sn.save_id
+            GROUP BY sn.campaign ORDER BY sn.campaign
+        """
+        return [dict(row) for row in self.conn.execute(query)]
+
+    def list_saves(self, campaign: Optional[str] = None) -> list:
+        """List ingested saves in date order, optionally for one campaign."""
+        query = "SELECT id, path, campaign, player, save_date, month FROM saves"
+        params = ()
+        if campaign is not None:
+            query += " WHERE campaign = ?"
+            params = (campaign,)
+        query += " ORDER BY campaign, date_key"
+        return [dict(row) for row in self.conn.execute(query, params)]
+
+    def equipment_names(self, save_id: int) -> dict:
+        """Get the (equipment_id, equipment_type) -> name mapping of one save."""
+        rows = self.conn.execute(
+            "SELECT equipment_id, equipment_type, name FROM equipment WHERE save_id = ?", (save_id,)
+        )
+        return {(row['equipment_id'], row['equipment_type']): row['name'] for row in rows}
+
+    def organisation_history(self, save_ids: Iterable[int], country: Optional[str] = None) -> list:
+        """
+        Get the history rows of the organisations in the given saves.
+
+        Returns:
+            List of dicts with save, organisation and history columns, in save date order
+        """
+        save_ids = list(save_ids)
+        if not save_ids:
+            return []
+        placeholders = ",".join("?" * len(save_ids))
+        query = (
+            "SELECT s.id AS save_id, s.save_date, o.tag, o.name, o.funds, o.size, o.research_bonus, "
+            "h.seq, h.equipment_id, h.equipment_type, h.date, h.units, e.name AS equipment_name "
+            "FROM organisations o JOIN saves s ON s.id = o.save_id "
+            "LEFT JOIN history h ON h.organisation_id = o.id "
+            "LEFT JOIN equipment e ON e.save_id = o.save_id AND e.equipment_id = h.equipment_id "
+            "AND e.equipment_type = h.equipment_type "
+            f"WHERE o.save_id IN ({placeholders})"
+        )
+        params = save_ids
+        if country is not None:
+            query += " AND o.tag = ?"
+            params = save_ids + [country.upper()]
+        query += " ORDER BY s.date_key, o.tag, o.name, h.seq"
+        return [dict(row) for row in self.conn.execute(query, params)]
+
+    def units_per_organisation_per_month(self, campaign: Optional[str] = None, country: Optional[str] = None) -> list:
+        """
+        Units produced by each organisation between consecutive saves, labelled by month.
+
+        Units are the sum of the organisation's history entries in each save;
+        the first save of a campaign has no previous value and is left out.
+
+        Returns:
+            List of dicts with campaign, month, tag, name and units_produced
+        """
+        conditions = []
+        params = []
+        if campaign is not None:
+            conditions.append("s.campaign = ?")
+            params.append(campaign)
+        if country is not None:
+            conditions.append("o.tag = ?")
+            params.append(country.upper())
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = f"""
+            WITH totals AS (
+                SELECT s.campaign, s.date_key, s.month, o.tag, o.name, COALESCE(SUM(h.units), 0) AS units
+                FROM organisations o
+                JOIN saves s ON s.id = o.save_id
+                LEFT JOIN history h ON h.organisation_id = o.id
+                {where}
+                GROUP BY o.id
+            ),
+            deltas AS (
+                SELECT campaign, month, tag, name,
+                       units - LAG(units) OVER (PARTITION BY campaign, tag, name ORDER BY date_key) AS units_produced
+                FROM totals
+            )
+            SELECT campaign, month, tag, name, SUM(units_produced) AS units_produced
+            FROM deltas
+            WHERE units_produced IS NOT NULL
+            GROUP BY campaign, month, tag, name
+            ORDER BY campaign, month, tag, name
+        """
+        return [dict(row) for row in self.conn.execute(query, params)]
+
+    def build_compare_data(self, save_id: int) -> dict:
+        """
+        Rebuild the subset of a save used by the comparison views.
+
+        Returns:
+            Dictionary shaped like a converted save: countries -> tag -> production ->
+            industrial_organisations -> name -> history, plus equipments and date
+        """
+        save = self.conn.execute("SELECT save_date FROM saves WHERE id = ?", (save_id,)).fetchone()
+        countries = {}
+        organisations = {}
+        for row in self.conn.execute(
+            "SELECT id, tag, name, org_id, funds, size, research_bonus FROM organisations WHERE save_id = ?",
+            (save_id,)
+        ):
+            orgs = countries.setdefault(row['tag'], {}).setdefault('production', {}).setdefault(
+                'industrial_organisations', {})
+            org = {
+                'id': {'id': row['org_id']},
+                'funds': row['funds'],
+                'size': row['size'],
+                'research_bonus': row['research_bonus'],
+                'history': [],
+            }
+            orgs[row['name']] = org
+            organisations[row['id']] = org
+
+        for row in self.conn.execute(
+            "SELECT h.organisation_id, h.equipment_id, h.equipment_type, h.date, h.units FROM history h "
+            "JOIN organisations o ON o.id = h.organisation_id WHERE o.save_id = ? ORDER BY h.organisation_id, h.seq",
+            (save_id,)
+        ):
+            data = {'units': row['units']}
+            if row['date'] is not None:
+                data['date'] = row['date']
+            organisations[row['organisation_id']]['history'].append({
+                'equipment': {'id': row['equipment_id'], 'type': row['equipment_type']},
+                'data': data,
+            })
+
+        equipments = {
+            name: {'id': {'id': equipment_id, 'type': equipment_type}}
+            for (equipment_id, equipment_type), name in self.equipment_names(save_id).items()
+        }
+        return {
+            'date': save['save_date'] if save else None,
+            'countries': countries,
+            'equipments': equipments,
+        }
+
+    def mio_entries(self, save_id: int, country: str = "SOV") -> dict:
+        """
+        Get one country's organisation history in the entry format used by the MIO reader.
+
+        Returns:
+            Dictionary of {org_name: [entry dicts]} with string ids and units
+        """
+        result = {}
+        for row in self.organisation_history([save_id], country):
+            entries = result.setdefault(row['name'], [])
+            if row['seq'] is None:
+                entries.append({
+                    "org_name": row['name'],
+                    "equipment_id": "N/A",
+                    "equipment_type": "N/A",
+                    "date": "N/A",
+                    "units": "N/A",
+                })
+                continue
+            entries.append({
+                "org_name": row['name'],
+                "equipment_id": str(row['equipment_id']),
+                "equipment_type": str(row['equipment_type']),
+                "equipment_name": row['equipment_name'] or "Unknown",
+                "date": row['date'] or "Initial",
+                "units": str(row['units']),
+            })
+        return result
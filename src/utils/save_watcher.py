@@ -0,0 +1,148 @@
+import os
+import glob
+import time
+import logging
+import threading
+import concurrent.futures
+from typing import Callable, Optional
+
+from src.utils.save_extract import extract_save, file_content_hash
+from src.utils.save_files import file_signature
+from src.utils.save_store import SaveStore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATTERN = "autosave_*.hoi4"
+
+class SaveWatcher:
+    """
+    Polls a save directory and ingests new or changed saves into the save store.
+
+    A file is only picked up once its (size, mtime) signature has been the same
+    for two consecutive polls, so saves that HOI4 is still writing are skipped.
+    Hashing and extraction run in a worker pool; files whose content hash is
+    already stored or in progress are not extracted again. Files that fail are
+    retried on later polls.
+    """
+
+    def __init__(self, directory: str, db_path: Optional[str] = None, pattern: str = DEFAULT_PATTERN,
+                 interval: float = 30.0, jobs: Optional[int] = None, snapshot: bool = False,
+                 on_ingested: Optional[Callable[[int, dict], None]] = None):
+        """
+        Args:
+            directory: Save directory to watch
+            db_path: Path to the save store database (optional)
+            pattern: Glob pattern of the saves to watch
+            interval: Seconds between polls
+            jobs: Number of worker processes (optional, defaults to the core count)
+            snapshot: Also store each save as a delta-compressed snapshot
+            on_ingested: Called with (save_id, extracted) after each save is stored
+        """
+        self.directory = directory
+        self.db_path = db_path
+        self.pattern = pattern
+        self.interval = interval
+        self.jobs = jobs or os.cpu_count() or 1
+        self.snapshot = snapshot
+        self.on_ingested = on_ingested
+
+        self._candidates = {}  # {path: signature seen on the previous poll}
+        self._processed = {}  # {path: signature that was handled}
+        self._in_flight_hashes = set()
+        self._pending = {}  # {future: (stage, path, signature, content hash of an extract)}
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def scan(self) -> list:
+        """
+        Find saves that are new or changed and have stopped changing.
+
+        Returns:
+            List of (path, signature) tuples ready to be processed
+        """
+        ready = []
+        seen = {}
+        for file_path in glob.glob(os.path.join(self.directory, self.pattern)):
+            signature = file_signature(file_path)
+            if signature is None or self._processed.get(file_path) == signature:
+                continue
+            seen[file_path] = signature
+            if self._candidates.get(file_path) == signature:
+                ready.append((file_path, signature))
+        self._candidates = seen
+        return sorted(ready)
+
+    def poll_once(self, executor, store: SaveStore):
+        """
+        Collect finished work, then queue new or changed saves.
+
+        A save counts as handled only once it is stored (or its content already
+        was); saves that fail to hash, extract or store are retried on later polls.
+        """
+        for future in [f for f in self._pending if f.done()]:
+            stage, file_path, signature, content_hash = self._pending.pop(future)
+            try:
+                result = future.result()
+                if stage == "hash":
+                    self._queue_extract(executor, store, file_path, signature, result)
+                    continue
+                save_id = store.ingest(result)
+            except Exception as e:
+                logger.error(f"Failed to {stage} {file_path}: {str(e)}")
+                continue
+            finally:
+                if stage == "extract":
+                    self._in_flight_hashes.discard(content_hash)
+
+            self._processed[file_path] = signature
+            logger.info(f"Ingested {os.path.basename(file_path)} ({result.get('date')}) as save {save_id}")
+            if self.on_ingested:
+                self.on_ingested(save_id, result)
+
+        for file_path, signature in self.scan():
+            in_progress = any(path == file_path for _, path, _, _ in self._pending.values())
+            if in_progress:
+                continue
+            hash_future = executor.submit(file_content_hash, file_path)
+            self._pending[hash_future] = ("hash", file_path, signature, None)
+
+    def _queue_extract(self, executor, store: SaveStore, file_path: str, signature: tuple, content_hash: str):
+        """Extract a hashed save, unless its content is already stored or being extracted."""
+        if store.has_save(content_hash):
+            logger.info(f"Skipping {os.path.basename(file_path)}: same content already stored")
+            self._processed[file_path] = signature
+            return
+        if content_hash in self._in_flight_hashes:
+            # Picked up again on a later poll, in case the other copy fails
+            logger.info(f"Waiting on {os.path.basename(file_path)}: same content is being extracted")
+            return
+        self._in_flight_hashes.add(content_hash)
+        extract_future = executor.submit(extract_save, file_path, None, content_hash, self.snapshot)
+        self._pending[extract_future] = ("extract", file_path, signature, content_hash)
+
+    def run(self):
+        """Poll until stop() is called. Runs in the calling thread."""
+        logger.info(f"Watching {os.path.join(self.directory, self.pattern)} every {self.interval}s with {self.jobs} workers")
+        with SaveStore(self.db_path) as store, \
+                concurrent.futures.ProcessPoolExecutor(max_workers=self.jobs) as executor:
+            while not self._stop_event.is_set():
+                self.poll_once(executor, store)
+                # Poll faster while work is pending so results are stored promptly
+                wait = min(self.interval, 1.0) if self._pending else self.interval
+                self._stop_event.wait(wait)
+            for future in self._pending:
+                future.cancel()
+
+    def start(self) -> threading.Thread:
+        """Run the watcher on a background daemon thread."""
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        """Stop polling and wait for the background thread to finish."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,324 @@
+import bisect
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterable, Optional, Sequence
+
+def sort_key(value):
+    """Sort key ordering numbers numerically before text, and text case-insensitively."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return (0, value, "")
+    text = str(value)
+    try:
+        return (0, float(text), "")
+    except ValueError:
+        return (1, 0, text.lower())
+
+class TableModel:
+    """
+    Rows of a results table, stored column by column.
+
+    Sorting and filtering only reorder a list of row indices (the view), so the
+    rows themselves are never copied and no widgets are touched. Rows can be
+    appended from a worker thread while the UI reads the view.
+
+    Columns can be indexed (index_column), partitioning the rows by value:
+    equality and prefix filters on an indexed column then start from the
+    matching rows instead of testing every row.
+    """
+
+    def __init__(self, columns: Sequence[str]):
+        """
+        Args:
+            columns: Column names
+        """
+        self.columns = list(columns)
+        self._data = {column: [] for column in self.columns}
+        self._view = []
+        # name -> (column or None, predicate of the column value or of the row, rows() of an index or None)
+        self._filters = {}
+        self._indexes = {}  # column -> (key function, {key: [row indices]})
+        self._prefix_keys = {}  # column -> sorted [(lower-case key text, key)], rebuilt after new keys
+        self._sort_column = None
+        self._sort_reverse = False
+        self._lock = threading.RLock()
+        self._deferred = 0  # Nesting depth of filters(); the view is rebuilt when it returns to 0
+        self._stale = False
+        # Bumped on every change, so views can tell whether they need redrawing
+        self.version = 0
+
+    def __len__(self) -> int:
+        """Number of rows in the view (after filtering)."""
+        return len(self._view)
+
+    @property
+    def total_rows(self) -> int:
+        """Number of rows, ignoring filters."""
+        return len(self._data[self.columns[0]]) if self.columns else 0
+
+    @property
+    def sort_column(self) -> Optional[str]:
+        return self._sort_column
+
+    @property
+    def sort_reverse(self) -> bool:
+        return self._sort_reverse
+
+    def _row(self, index: int) -> tuple:
+        return tuple(self._data[column][index] for column in self.columns)
+
+    def _matches(self, index: int) -> bool:
+        row = None
+        for column, predicate, _ in self._filters.values():
+            if column is not None:
+                if not predicate(self._data[column][index]):
+                    return False
+            else:
+                if row is None:
+                    row = self._row(index)
+                if not predicate(row):
+                    return False
+        return True
+
+    def extend(self, rows: Iterable[Sequence]):
+        """
+        Append rows (sequences of column values).
+
+        New rows that pass the filters are added to the end of the view; the view is
+        re-sorted if a sort is active.
+        """
+        with self._lock:
+            start = self.total_rows
+            for row in rows:
+                for column, value in zip(self.columns, row):
+                    self._data[column].append(value)
+            for column in self._indexes:
+                self._index_rows(column, start)
+            new_rows = [index for index in range(start, self.total_rows) if self._matches(index)]
+            self._view.extend(new_rows)
+            if new_rows and self._sort_column is not None:
+                self._apply_sort()
+            self.version += 1
+
+    def append(self, row: Sequence):
+        """Append one row, see extend()."""
+        self.extend([row])
+
+    def clear(self):
+        """Remove every row, keeping filters and sort order."""
+        with self._lock:
+            for values in self._data.values():
+                values.clear()
+            for _, partitions in self._indexes.values():
+                partitions.clear()
+            self._prefix_keys.clear()
+            self._view = []
+            self.version += 1
+
+    def row(self, position: int) -> tuple:
+        """The row at a position of the view."""
+        with self._lock:
+            return self._row(self._view[position])
+
+    def rows(self, start: int = 0, stop: Optional[int] = None) -> list:
+        """The rows of a slice of the view, e.g. the window shown on screen."""
+        with self._lock:
+            return [self._row(index) for index in self._view[start:stop]]
+
+    def column_values(self, column: str) -> list:
+        """Values of a column in view order."""
+        with self._lock:
+            values = self._data[column]
+            return [values[index] for index in self._view]
+
+    def _index_rows(self, column: str, start: int):
+        key, partitions = self._indexes[column]
+        values = self._data[column]
+        new_keys = False
+        for index in range(start, len(values)):
+            partition_key = key(values[index])
+            partition = partitions.get(partition_key)
+            if partition is None:
+                partitions[partition_key] = partition = []
+                new_keys = True
+            partition.append(index)
+        if new_keys:
+            self._prefix_keys.pop(column, None)
+
+    def index_column(self, column: str, key: Optional[Callable] = None):
+        """
+        Partition the rows by the value of a column, kept up to date as rows are added.
+
+        Args:
+            column: Column name
+            key: Applied to values before partitioning, e.g. str.upper (optional)
+        """
+        with self._lock:
+            self._indexes[column] = (key or (lambda value: value), {})
+            self._prefix_keys.pop(column, None)
+            self._index_rows(column, 0)
+
+    def _partition_rows(self, column: str, keys: Iterable) -> list:
+        partitions = self._indexes[column][1]
+        found = [partitions[key] for key in keys if key in partitions]
+        if len(found) == 1:
+            return found[0]
+        return sorted(index for partition in found for index in partition)
+
+    def _keys_with_prefix(self, column: str, prefix: str) -> list:
+        keys = self._prefix_keys.get(column)
+        if keys is None:
+            keys = self._prefix_keys[column] = sorted((str(key).lower(), key) for key in self._indexes[column][1])
+        prefix = prefix.lower()
+        start = bisect.bisect_left(keys, (prefix,))
+        result = []
+        for text, key in keys[start:]:
+            if not text.startswith(prefix):
+                break
+            result.append(key)
+        return result
+
+    @contextmanager
+    def filters(self):
+        """
+        Change several filters at once, rebuilding the view once at the end:
+        `with model.filters(): model.filter_equals(...); model.filter_prefix(...)`
+        """
+        with self._lock:
+            self._deferred += 1
+            try:
+                yield self
+            finally:
+                self._deferred -= 1
+                if self._deferred == 0 and self._stale:
+                    self._rebuild_view()
+
+    def _rebuild_view(self):
+        if self._deferred:
+            self._stale = True
+            return
+        self._stale = False
+        view = range(self.total_rows)
+        # Indexed filters give their matching rows; start from the fewest
+        for _, _, rows in self._filters.values():
+            if rows is not None:
+                candidates = rows()
+                if len(candidates) < len(view):
+                    view = candidates
+        # Column filters test one column list at a time; row filters need whole rows
+        for column, predicate, _ in self._filters.values():
+            if column is not None:
+                values = self._data[column]
+                view = [index for index in view if predicate(values[index])]
+        if any(column is None for column, _, _ in self._filters.values()):
+            view = [index for index in view if self._matches(index)]
+        self._view = list(view)
+        if self._sort_column is not None:
+            self._apply_sort()
+        self.version += 1
+
+    def _apply_sort(self):
+        values = self._data[self._sort_column]
+        # Stable, so rows with equal values keep their insertion order
+        self._view.sort(key=lambda index: sort_key(values[index]), reverse=self._sort_reverse)
+
+    def sort(self, column: Optional[str], reverse: bool = False):
+        """
+        Sort the view by a column (None restores insertion order).
+
+        Args:
+            column: Column name, or None
+            reverse: Sort descending
+        """
+        with self._lock:
+            self._sort_column = column
+            self._sort_reverse = reverse
+            if column is None:
+                self._view.sort()
+            else:
+                self._apply_sort()
+            self.version += 1
+
+    def set_filter(self, name: str, predicate: Optional[Callable], column: Optional[str] = None,
+                   rows: Optional[Callable] = None):
+        """
+        Add, replace or (with predicate None) remove a named filter.
+
+        Args:
+            name: Name of the filter, e.g. "country"
+            predicate: Called with the row tuple (or the value of column), True to keep the row
+            column: Only pass the value of this column to the predicate (optional)
+            rows: Returns the ascending indices of every row the predicate can keep, e.g. from
+                an index, so other rows are not tested (optional)
+        """
+        with self._lock:
+            if predicate is None:
+                self._filters.pop(name, None)
+            else:
+                self._filters[name] = (column, predicate, rows)
+            self._rebuild_view()
+
+    def filter_equals(self, column: str, value, name: Optional[str] = None, key: Callable = None):
+        """
+        Keep only rows whose column equals value (a value of None or "" removes the filter).
+
+        On an indexed column, the index key is applied to value and the column values,
+        and only the rows of that partition are visited.
+
+        Args:
+            column: Column name
+            value: Value to match
+            name: Name of the filter (optional, defaults to the column name)
+            key: Applied to column values before comparing, e.g. str.upper (optional, not for indexed columns)
+        """
+        if value is None or value == "":
+            self.set_filter(name or column, None)
+        elif column in self._indexes:
+            index_key = self._indexes[column][0]
+            value = index_key(value)
+            self.set_filter(name or column, lambda cell: index_key(cell) == value, column,
+                            rows=lambda: self._partition_rows(column, [value]))
+        elif key is None:
+            self.set_filter(name or column, lambda cell: cell == value, column)
+        else:
+            self.set_filter(name or column, lambda cell: key(cell) == value, column)
+
+    def filter_contains(self, text: str, columns: Optional[Iterable[str]] = None, name: str = "search"):
+        """
+        Keep only rows where any of the columns contains text, case-insensitively ("" removes the filter).
+
+        Args:
+            text: Text to search for
+            columns: Columns to search (optional, default all)
+            name: Name of the filter
+        """
+        if not text:
+            self.set_filter(name, None)
+            return
+        needle = text.lower()
+        positions = [self.columns.index(column) for column in columns] if columns else range(len(self.columns))
+        self.set_filter(name, lambda row: any(needle in str(row[position]).lower() for position in positions))
+
+    def filter_prefix(self, column: str, prefix: str, name: Optional[str] = None):
+        """
+        Keep only rows whose column starts with prefix, case-insensitively ("" removes the filter).
+
+        On an indexed column only the partitions with a matching key are visited, found by
+        bisecting the sorted keys, so each keystroke of a search costs about the size of its result.
+
+        Args:
+            column: Column name
+            prefix: Text the values start with
+            name: Name of the filter (optional, defaults to the column name)
+        """
+        if not prefix:
+            self.set_filter(name or column, None)
+            return
+        needle = prefix.lower()
+        predicate = lambda cell: str(cell).lower().startswith(needle)
+        if column in self._indexes:
+            index_key = self._indexes[column][0]
+            predicate = lambda cell: str(index_key(cell)).lower().startswith(needle)
+            self.set_filter(name or column, predicate, column,
+                            rows=lambda: self._partition_rows(column, self._keys_with_prefix(column, needle)))
+        else:
+            self.set_filter(name or column, predicate, column)
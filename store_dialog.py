@@ -0,0 +1,47 @@
+import tkinter as tk
+from tkinter import ttk, messagebox
+import os
+from src.utils.save_store import SaveStore
+
+def ask_stored_saves(root, db_path=None):
+    """
+    Show a modal dialog listing the saves in the save store and return the chosen ones.
+
+    Args:
+        root: Parent Tk window
+        db_path: Path to the save store database (optional, defaults to the project database)
+
+    Returns:
+        List of save dicts (see SaveStore.list_saves) in date order, empty if cancelled
+    """
+    with SaveStore(db_path) as store:
+        saves = store.list_saves()
+
+    if not saves:
+        messagebox.showinfo("Info", "The save store is empty. Ingest saves with ingest_saves.py first.")
+        return []
+
+    dialog = tk.Toplevel(root)
+    dialog.title("Select Stored Saves")
+    dialog.geometry("500x300")
+    dialog.transient(root)
+    dialog.grab_set()
+
+    listbox = tk.Listbox(dialog, selectmode=tk.MULTIPLE)
+    listbox.pack(fill="both", expand=True, padx=10, pady=10)
+    for save in saves:
+        listbox.insert(tk.END, f"{save['save_date']}  {os.path.basename(save['path'])}  ({save['player']})")
+
+    chosen = []
+
+    def accept():
+        chosen.extend(saves[i] for i in listbox.curselection())
+        dialog.destroy()
+
+    btn_frame = ttk.Frame(dialog)
+    btn_frame.pack(fill="x", padx=10, pady=5)
+    ttk.Button(btn_frame, text="OK", command=accept).pack(side="right", padx=5)
+    ttk.Button(btn_frame, text="Cancel", command=dialog.destroy).pack(side="right", padx=5)
+
+    root.wait_window(dialog)
+    return chosen
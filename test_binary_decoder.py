@@ -0,0 +1,137 @@
+import os
+import math
+import struct
+import tempfile
+import unittest
+import pyradox
+from src.utils.binary_decoder import (
+    decode_date, encode_date, encode_text, iter_tokens, decode_to_text, parse_binary_file, load_token_table
+)
+
+SAMPLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "SOV save file.txt")
+
+FIXTURE_TEXT = """
+date=1939.11.7.1
+player="SOV"
+countries={
+    SOV={
+        production={
+            industrial_organisations={
+                SOV_tula_arms_plant_organization={
+                    id={ id=58 type=74 }
+                    funds=7711.91
+                    research_bonus=0.05
+                    size=13
+                    factory_efficiency=70.40564
+                    active=yes
+                    color=rgb { 10 20 30 }
+                    history={
+                        equipment={ id=4410 type=70 }
+                        data={ date="1939.11.7.1" units=100 }
+                    }
+                }
+            }
+        }
+        flags={ 1 2 3 }
+    }
+}
+"""
+
+TOKENS = {0x2000: 'date', 0x2001: 'player', 0x2002: 'countries', 0x2003: 'production',
+          0x2004: 'industrial_organisations', 0x2005: 'id', 0x2006: 'type', 0x2007: 'funds',
+          0x2008: 'history', 0x2009: 'equipment', 0x200a: 'data', 0x200b: 'units'}
+
+def assert_same_values(test, expected, actual):
+    """Compare converted trees, allowing fixed-point rounding of floats."""
+    if isinstance(expected, dict):
+        test.assertEqual(list(expected), list(actual))
+        for key in expected:
+            assert_same_values(test, expected[key], actual[key])
+    elif isinstance(expected, list):
+        test.assertEqual(len(expected), len(actual))
+        for a, b in zip(expected, actual):
+            assert_same_values(test, a, b)
+    elif isinstance(expected, float):
+        test.assertTrue(math.isclose(expected, actual, abs_tol=1e-4), f"{expected} != {actual}")
+    else:
+        test.assertEqual(expected, actual)
+
+class TestBinaryDecoder(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_fixture(self, data, name="fixture.hoi4"):
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def test_dates(self):
+        """Test conversion between date strings and i32 hours."""
+        for date in ["1936.1.1.12", "1939.11.7.1", "1945.12.31.23", "1940.3.1.0"]:
+            self.assertEqual(decode_date(encode_date(date)), date)
+        self.assertIsNone(decode_date(13))
+        self.assertIsNone(decode_date(-5))
+
+    def test_tokens(self):
+        """Test decoding a hand-written fixture."""
+        data = (b"HOI4bin"
+                + struct.pack('<H', 0x2000) + struct.pack('<H', 0x0001)
+                + struct.pack('<Hi', 0x000c, encode_date("1936.1.1.12"))
+                + struct.pack('<H', 0x3000) + struct.pack('<H', 0x0001)
+                + struct.pack('<HH', 0x000f, 3) + b"SOV"
+                + struct.pack('<Hi', 0x000c, 7) + struct.pack('<H', 0x0001) + struct.pack('<H', 0x0003)
+                + struct.pack('<Hi', 0x000d, 7711910) + struct.pack('<HB', 0x000e, 1)
+                + struct.pack('<Hq', 0x0167, 32768 * 3) + struct.pack('<H', 0x0004))
+        tokens = list(iter_tokens(data, {0x2000: 'date'}))
+        self.assertEqual([(token_type, token_string) for token_type, token_string, _ in tokens], [
+            ('str', 'date'), ('operator', '='), ('time', '1936.1.1.12'),
+            ('str', '__unknown_0x3000'), ('operator', '='), ('str', '"SOV"'),
+            ('int', '7'), ('operator', '='), ('begin', '{'),
+            ('float', '7711.910'), ('bool', 'yes'), ('float', '3.00000'), ('end', '}'),
+        ])
+
+    def test_round_trip(self):
+        """Test that text -> binary -> text and binary -> Tree give the original tree."""
+        expected = pyradox.parse(FIXTURE_TEXT).to_python()
+        path = self.write_fixture(encode_text(FIXTURE_TEXT, TOKENS))
+
+        output_path = decode_to_text(path, os.path.join(self.temp_dir.name, "melted.txt"), TOKENS)
+        with open(output_path, encoding='utf-8') as f:
+            melted = f.read()
+        self.assertTrue(melted.startswith("HOI4txt\n"))
+        assert_same_values(self, expected, pyradox.parse(melted).to_python())
+
+        tree = parse_binary_file(path, TOKENS)
+        assert_same_values(self, expected, tree.to_python())
+        self.assertEqual(str(tree['date']), "1939.11.7.1")
+        self.assertIsInstance(tree['countries']['SOV']['production']['industrial_organisations']
+                              ['SOV_tula_arms_plant_organization']['color'], pyradox.Color)
+
+    def test_sample_save(self):
+        """Test the production block of a real save."""
+        with open(SAMPLE_PATH, encoding='utf-8') as f:
+            text = f.read()
+        expected = pyradox.parse(text).to_python()
+        path = self.write_fixture(encode_text(text, TOKENS))
+        assert_same_values(self, expected, parse_binary_file(path, TOKENS).to_python())
+
+    def test_token_table(self):
+        """Test reading a token table in either column order."""
+        path = os.path.join(self.temp_dir.name, "tokens.txt")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("# comment\n0x2000 date\nplayer 8193\n\nbroken line here\n")
+        self.assertEqual(load_token_table(path), {0x2000: 'date', 0x2001: 'player'})
+
+    def test_compressed_save(self):
+        """Test that compressed saves are reported instead of decoded as garbage."""
+        path = self.write_fixture(b"PK\x03\x04rest")
+        with self.assertRaises(ValueError):
+            parse_binary_file(path, TOKENS)
+
+if __name__ == '__main__':
+    unittest.main()
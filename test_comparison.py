@@ -0,0 +1,138 @@
+import math
+import random
+import unittest
+import numpy as np
+import pyradox
+from src.utils.comparison import ComparisonData, OrgTimeSeries, save_day
+
+def entry(equipment_id, units, equipment_type="70"):
+    return {"equipment_id": equipment_id, "equipment_type": equipment_type, "date": "1939.1.1.1", "units": units}
+
+def diff_changes(previous_entries, entries):
+    """The changes as worked out by a structural diff of the two entry lists."""
+    def history(entry_list):
+        return {"history": [{key: item[key] for key in ("equipment_id", "equipment_type", "units")}
+                            for item in entry_list]}
+
+    def to_units(units):
+        return int(units) if str(units).isdigit() else 0
+
+    if previous_entries is None:
+        return [""] * len(entries)
+    changes = ["0"] * len(entries)
+    for change in pyradox.diff.diff(history(previous_entries), history(entries),
+                                    identity_keys=(("equipment_id", "equipment_type"),)):
+        if change.kind == "added":
+            changes[change.path[1]] = ""
+        elif change.kind == "changed" and change.path[2:] == ("units",):
+            delta = to_units(change.new) - to_units(change.old)
+            changes[change.path[1]] = f"+{delta}" if delta > 0 else str(delta)
+    return ["" if item["equipment_id"] == "N/A" else change for item, change in zip(entries, changes)]
+
+class TestComparisonData(unittest.TestCase):
+
+    def test_changes(self):
+        save_data = {
+            "1940.1.1.1": {"Tula": [entry("1", "150"), entry("2", "10"), entry("1", "5")]},
+            "1939.12.1.1": {"Tula": [entry("1", "100"), entry("1", "5")], "Kirov": [entry("N/A", "N/A")]},
+            "1939.2.1.1": {"Kirov": [entry("3", "1")]},
+        }
+        data = ComparisonData(save_data)
+        self.assertEqual(data.save_dates, ["1939.2.1.1", "1939.12.1.1", "1940.1.1.1"])
+        self.assertEqual(data.organisations, ["Kirov", "Tula"])
+        self.assertEqual(data.changes("Tula", "1939.12.1.1"), ["", ""])
+        # The k-th entry of an equipment is compared with its k-th entry in the previous save
+        self.assertEqual(data.changes("Tula", "1940.1.1.1"), ["+50", "", "0"])
+        self.assertEqual(data.changes("Kirov", "1939.12.1.1"), [""])
+        self.assertIsNone(data.changes("Kirov", "1940.1.1.1"))
+        self.assertFalse(data.has("Kirov", "1940.1.1.1"))
+        self.assertEqual(data.entries("Kirov", "1940.1.1.1"), [])
+
+    def test_matches_structural_diff(self):
+        rng = random.Random(45)
+        save_dates = [f"{1936 + index // 12}.{index % 12 + 1}.1.1" for index in range(30)]
+        save_data = {}
+        for save_date in save_dates:
+            orgs = {}
+            for org in range(8):
+                if rng.random() < 0.2:
+                    continue
+                orgs[f"org{org}"] = [entry(str(rng.randint(1, 6)), str(rng.randint(0, 500)), rng.choice(["70", "71"]))
+                                     for _ in range(rng.randint(0, 10))]
+            save_data[save_date] = orgs
+        data = ComparisonData(save_data)
+        for org in data.organisations:
+            previous = None
+            for save_date in save_dates:
+                if org not in save_data[save_date]:
+                    continue
+                entries = save_data[save_date][org]
+                self.assertEqual(data.changes(org, save_date), diff_changes(previous, entries), (org, save_date))
+                previous = entries
+
+def org(lines, funds=10.0, size=1):
+    """An organisation as converted from a save, with history lines of (equipment_id, units)."""
+    history = [{"equipment": {"id": equipment_id, "type": 70}, "data": {"date": "1939.1.1.1", "units": units}}
+               for equipment_id, units in lines]
+    # A single history entry is converted as a dict
+    return {"history": history[0] if len(history) == 1 else history, "funds": funds, "size": size}
+
+class TestOrgTimeSeries(unittest.TestCase):
+
+    def setUp(self):
+        # Given out of date order
+        self.series = OrgTimeSeries([
+            ("feb", "1939.2.1.1", {"SOV": {"tula": org([(1, 10), (2, 5)], 100.5, 3)}}),
+            ("jan", "1939.1.1.1", {"SOV": {"tula": org([(1, 4)], 50.0, 2)}, "GER": {"krupp": org([], 1.0, 1)}}),
+            ("mar", "1939.3.1.1", {"SOV": {"tula": org([(1, 20), (1, 2)], 120.0, 3)}}),
+        ])
+
+    def assertMatrix(self, matrix, expected):
+        np.testing.assert_allclose(matrix, np.array(expected, dtype=float), equal_nan=True)
+
+    def test_alignment(self):
+        series = self.series
+        self.assertEqual(series.labels, ["jan", "feb", "mar"])
+        self.assertEqual(series.sources, [1, 0, 2])
+        self.assertEqual(series.orgs, [("SOV", "tula"), ("GER", "krupp")])
+        nan = math.nan
+        self.assertMatrix(series.matrix("units"), [[4, 15, 22], [0, nan, nan]])
+        self.assertMatrix(series.matrix("funds"), [[50, 100.5, 120], [1, nan, nan]])
+        # Lines of one equipment in a save add up
+        self.assertEqual(series.equipment, [(("SOV", "tula"), 1, 70), (("SOV", "tula"), 2, 70)])
+        self.assertMatrix(series.matrix("equipment"), [[4, 10, 22], [nan, 5, nan]])
+        self.assertEqual(series.last_seen["equipment"].tolist(), [2, 1])
+        self.assertEqual(series.latest_equipment, [(2, 1, 70), None])
+
+    def test_changes_and_rates(self):
+        nan = math.nan
+        self.assertMatrix(self.series.matrix("units", "change"), [[nan, 11, 7], [nan, nan, nan]])
+        # January has 31 days, February 28
+        self.assertMatrix(self.series.matrix("units", "rate"), [[nan, 11 / 31, 7 / 28], [nan, nan, nan]])
+        self.assertEqual(save_day("1939.1.2.13") - save_day("1939.1.1.1"), 1.5)
+        self.assertTrue(math.isnan(save_day("Unknown Date")))
+        with self.assertRaises(ValueError):
+            self.series.matrix("units", "total")
+
+    def test_matches_per_save_sums(self):
+        rng = random.Random(50)
+        saves = []
+        for index in range(40):
+            orgs = {f"org{number}": org([(rng.randint(1, 4), rng.randint(0, 100)) for _ in range(rng.randint(2, 6))])
+                    for number in range(6) if rng.random() < 0.8}
+            saves.append((f"save{index}", f"{1936 + index // 12}.{index % 12 + 1}.1.1", {"SOV": orgs}))
+        series = OrgTimeSeries(reversed(saves))
+        units = series.matrix("units")
+        changes = series.matrix("units", "change")
+        for row, (_, name) in enumerate(series.orgs):
+            previous = None
+            for column, (_, _, countries) in enumerate(saves):
+                orgs = countries["SOV"]
+                total = sum(entry["data"]["units"] for entry in orgs[name]["history"]) if name in orgs else None
+                self.assertEqual(None if math.isnan(units[row, column]) else units[row, column], total)
+                expected = total - previous if total is not None and previous is not None else None
+                self.assertEqual(None if math.isnan(changes[row, column]) else changes[row, column], expected)
+                previous = total
+
+if __name__ == '__main__':
+    unittest.main()
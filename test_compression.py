@@ -0,0 +1,77 @@
+import os
+import tempfile
+import unittest
+import pyradox
+from src.utils.binary_decoder import encode_text
+from src.utils.compression import (
+    available_compressions, compress_file, compressed_path, detect_compression, open_text
+)
+from src.utils.melter import is_binary_file, melt_save_file, parse_save_stream
+from equipment_name_finder import find_equipment_mappings
+
+SAVE_TEXT = """date=1939.11.7.1
+player="SOV"
+equipment={ infantry_equipment_1={ id={ id=4410 type=70 } } }
+"""
+
+class TestCompression(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.expected = pyradox.parse(SAVE_TEXT).to_python()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.temp_dir.name, name)
+
+    def test_text_round_trip(self):
+        """Test writing and reading text in every available compression."""
+        for compression in available_compressions():
+            path = compressed_path(self.path("melted.txt"), compression)
+            with open_text(path, 'w') as f:
+                f.write(SAVE_TEXT)
+            self.assertEqual(detect_compression(path), compression)
+            self.assertFalse(is_binary_file(path))
+            with open_text(path) as f:
+                self.assertEqual(f.read(), SAVE_TEXT)
+
+    def test_compress_file(self):
+        """Test compressing an existing melted file."""
+        source = self.path("melted.txt")
+        with open(source, 'w', encoding='utf-8') as f:
+            f.write(SAVE_TEXT)
+        self.assertIsNone(detect_compression(source))
+        output = compress_file(source, self.path("melted.txt.xz"))
+        self.assertEqual(detect_compression(output), 'lzma')
+        self.assertEqual(parse_save_stream(output).to_python(), self.expected)
+
+    def test_compressed_melt(self):
+        """Test melting to a compressed file and reading it back with each reader."""
+        save_path = self.path("autosave.hoi4")
+        with open(save_path, 'wb') as f:
+            f.write(encode_text(SAVE_TEXT))
+
+        success, melted_path = melt_save_file(save_path, self.path("autosave.hoi4.txt.gz"), compression='gzip')
+        self.assertTrue(success)
+        self.assertEqual(detect_compression(melted_path), 'gzip')
+        self.assertEqual(parse_save_stream(melted_path).to_python(), self.expected)
+        self.assertEqual(find_equipment_mappings(melted_path), {'infantry_equipment_1': (4410, 70)})
+
+    def test_compressed_tee(self):
+        """Test keeping a compressed melted copy while parsing a binary save."""
+        save_path = self.path("autosave.hoi4")
+        with open(save_path, 'wb') as f:
+            f.write(encode_text(SAVE_TEXT))
+        tee_path = self.path("autosave.hoi4.txt.gz")
+        self.assertEqual(parse_save_stream(save_path, tee_path=tee_path).to_python(), self.expected)
+        self.assertEqual(parse_save_stream(tee_path).to_python(), self.expected)
+
+    def test_unavailable_compression(self):
+        """Test that unknown compressions are rejected."""
+        with self.assertRaises(ValueError):
+            open_text(self.path("melted.txt.bz2"), 'w', compression='bzip2')
+
+if __name__ == '__main__':
+    unittest.main()
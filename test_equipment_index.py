@@ -0,0 +1,69 @@
+import os
+import json
+import tempfile
+import unittest
+from equipment_name_finder import EquipmentIndex
+from src.utils.equipment_index import forget_save_indexes, index_path, save_equipment_index
+from src.utils.localisation import load_localisation, localisation_files
+
+EQUIPMENTS = {
+    'infantry_equipment_1': {'id': {'id': 4410, 'type': 70}},
+    'artillery_equipment_1': [{'id': {'id': 4411, 'type': 70}}, {'id': {'id': 4412, 'type': 70}}],
+    'broken': {'amount': 3},
+}
+
+class TestEquipmentIndex(unittest.TestCase):
+
+    def test_lookup(self):
+        """Test exact lookups, the ID-only fallback and unknown equipment."""
+        index = EquipmentIndex({'infantry_equipment_1': (4410, 70), 'artillery_equipment_1': (4411, 70)})
+        self.assertEqual(index.lookup(4410, 70), 'infantry_equipment_1')
+        self.assertEqual(index.lookup("4411", "70"), 'artillery_equipment_1')
+        self.assertEqual(index.lookup(4411, 71), 'artillery_equipment_1')
+        self.assertIsNone(index.lookup(9999, 70))
+        self.assertIsNone(index.lookup("N/A", "N/A"))
+
+    def test_update_replaces_moved_names(self):
+        """Test that merging a later save's mappings moves a name to its new id."""
+        index = EquipmentIndex({'infantry_equipment_1': (4410, 70)})
+        index.update({'infantry_equipment_1': (5000, 70), 'infantry_equipment_2': (4410, 70)})
+        self.assertEqual(len(index), 2)
+        self.assertEqual(index.lookup(5000, 70), 'infantry_equipment_1')
+        self.assertEqual(index.lookup(4410, 70), 'infantry_equipment_2')
+
+    def test_display_names(self):
+        """Test that an index of a save's equipments section names equipment from the localisation."""
+        index = EquipmentIndex.from_equipments(EQUIPMENTS, {'infantry_equipment_1': "Infantry Equipment I"})
+        self.assertEqual(index.display_name(4410, 70), "Infantry Equipment I")
+        self.assertEqual(index.display_name(4412, 70), 'artillery_equipment_1')
+        self.assertIsNone(index.display_name(1, 70))
+        restored = EquipmentIndex.from_json(json.loads(json.dumps(index.to_json())))
+        self.assertEqual(restored.display_name(4410, 70), "Infantry Equipment I")
+        self.assertEqual(restored.lookup(4411, 70), 'artillery_equipment_1')
+        self.assertEqual(restored.lookup(4412, 70), 'artillery_equipment_1')
+
+    def test_save_index_is_built_once(self):
+        """Test that a save's index is stored next to its cache entry and shared."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_path = os.path.join(temp_dir, "0123abcd.json")
+            try:
+                index = save_equipment_index(cache_path, EQUIPMENTS)
+                self.assertTrue(os.path.exists(index_path(cache_path)))
+                self.assertIs(save_equipment_index(cache_path, {}), index)
+                forget_save_indexes()
+                # Read back from the sidecar, not rebuilt from the (here empty) section
+                self.assertEqual(save_equipment_index(cache_path, {}).lookup(4410, 70), 'infantry_equipment_1')
+            finally:
+                forget_save_indexes()
+
+    def test_bundled_localisation(self):
+        """Test reading the bundled localisation files, the mod's names overriding the game's."""
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+        paths = [path for path in localisation_files(base_dir) if os.path.dirname(path) == base_dir]
+        localisation = load_localisation(paths)
+        self.assertEqual(localisation['infantry_equipment_1'], "1934 SR06 Rifle + 1938 G7 SMG")
+        self.assertEqual(load_localisation([path for path in paths if 'afo' not in path])['infantry_equipment_1'],
+                         "Infantry Equipment I")
+
+if __name__ == '__main__':
+    unittest.main()
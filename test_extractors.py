@@ -0,0 +1,89 @@
+import os
+import tempfile
+import unittest
+from src.utils.compression import open_text
+from src.utils.extractors import Extractor, ExtractorPipeline, SaveBuffer
+from src.utils.mio_scanner import scan_organisations
+
+SAVE_TEXT = """date="1939.11.7.1"
+player="SOV"
+equipments={
+    infantry_equipment_1={
+        id={ id=4410 type=70 }
+    }
+}
+countries={
+    SOV={
+        production={
+            industrial_organisations={
+                SOV_tula_arms_plant_organization={
+                    id={ id=58 type=79 }
+                    funds=7711.91
+                    size=13
+                    history={
+                        equipment={ id=4410 type=70 }
+                        data={ date="1939.11.7.1" units=100 }
+                    }
+                }
+            }
+        }
+    }
+}
+"""
+
+class CountingExtractor(Extractor):
+    name = "lines"
+
+    def extract(self, buffer):
+        return buffer.text.count("\n")
+
+class TestExtractors(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.save_path = os.path.join(self.temp_dir.name, "save.txt")
+        with open(self.save_path, 'w', encoding='utf-8') as f:
+            f.write(SAVE_TEXT)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_default_extractors(self):
+        """Test the header, equipment and organisation extractors over one read."""
+        results = ExtractorPipeline().run(self.save_path)
+        self.assertEqual(results['header'], {'date': '1939.11.7.1', 'player': 'SOV'})
+        self.assertEqual(results['equipment'], {'infantry_equipment_1': (4410, 70)})
+        self.assertEqual(results['organisations'], scan_organisations(SAVE_TEXT))
+
+    def test_compressed_and_in_memory(self):
+        """Test that compressed files and in-memory text give the same results as a mapped file."""
+        compressed_path = self.save_path + ".gz"
+        with open_text(compressed_path, 'w') as f:
+            f.write(SAVE_TEXT)
+        pipeline = ExtractorPipeline()
+        expected = pipeline.run(self.save_path)
+        self.assertEqual(pipeline.run(compressed_path), expected)
+        self.assertEqual(pipeline.run_text(SAVE_TEXT), expected)
+
+    def test_header_only_reads_head(self):
+        """Test that extracting just the header does not decode the whole save."""
+        with SaveBuffer(self.save_path) as buffer:
+            results = ExtractorPipeline().run_buffer(buffer, names=["header"])
+            self.assertEqual(list(results), ['header'])
+            self.assertIsNone(buffer._text)
+
+    def test_register(self):
+        """Test that a registered extractor runs over the shared buffer."""
+        pipeline = ExtractorPipeline()
+        pipeline.register(CountingExtractor())
+        self.assertEqual(pipeline.run(self.save_path)['lines'], SAVE_TEXT.count("\n"))
+
+    def test_empty_file(self):
+        """Test an empty save."""
+        empty_path = os.path.join(self.temp_dir.name, "empty.txt")
+        open(empty_path, 'w').close()
+        results = ExtractorPipeline().run(empty_path)
+        self.assertEqual(results, {'header': {'date': None, 'player': None}, 'equipment': {}, 'organisations': []})
+
+if __name__ == '__main__':
+    unittest.main()
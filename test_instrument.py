@@ -0,0 +1,83 @@
+import os
+import json
+import tempfile
+import unittest
+from src.utils import instrument
+
+class TestInstrument(unittest.TestCase):
+    def setUp(self):
+        self.was_enabled = instrument.is_enabled()
+        instrument.reset()
+
+    def tearDown(self):
+        instrument.enable(self.was_enabled)
+        instrument.reset()
+
+    def test_disabled_records_nothing(self):
+        instrument.enable(False)
+        with instrument.span("parse"):
+            pass
+        instrument.record("melt", 1.0)
+        instrument.count("tokens", 10)
+        report = instrument.snapshot()
+        self.assertEqual(report['spans'], {})
+        self.assertEqual(report['counters'], {})
+        self.assertNotIn(instrument.PROFILE_ENV, os.environ)
+
+    def test_spans_and_counters_add_up(self):
+        instrument.enable()
+        self.assertEqual(os.environ.get(instrument.PROFILE_ENV), "1")
+        for _ in range(3):
+            with instrument.span("parse"):
+                pass
+        instrument.record("melt", 0.5, calls=2)
+        instrument.count("tokens", 10)
+        instrument.count("tokens", 5)
+        report = instrument.snapshot()
+        self.assertEqual(report['spans']['parse']['calls'], 3)
+        self.assertEqual(report['spans']['melt'], {'calls': 2, 'seconds': 0.5})
+        self.assertEqual(report['counters'], {'tokens': 15})
+
+    def test_span_records_on_error(self):
+        instrument.enable()
+        with self.assertRaises(ValueError):
+            with instrument.span("extract.equipment"):
+                raise ValueError()
+        self.assertEqual(instrument.snapshot()['spans']['extract.equipment']['calls'], 1)
+
+    def test_merge_worker_snapshot(self):
+        instrument.enable()
+        instrument.record("read", 1.0)
+        instrument.merge({'spans': {'read': {'calls': 2, 'seconds': 2.0}}, 'counters': {'bytes.read': 100}})
+        instrument.merge(None)
+        report = instrument.snapshot()
+        self.assertEqual(report['spans']['read'], {'calls': 3, 'seconds': 3.0})
+        self.assertEqual(report['counters'], {'bytes.read': 100})
+
+    def test_report_lists_stages_in_pipeline_order(self):
+        report = {
+            'elapsed': 4.0,
+            'spans': {
+                'zzz': {'calls': 1, 'seconds': 0.1},
+                'parse': {'calls': 1, 'seconds': 2.0},
+                'extract.header': {'calls': 1, 'seconds': 0.5},
+                'read': {'calls': 1, 'seconds': 1.0},
+            },
+            'counters': {'tokens': 1234},
+        }
+        lines = instrument.format_report(report).splitlines()
+        names = [line.split()[0] for line in lines[1:5]]
+        self.assertEqual(names, ["read", "parse", "extract.header", "zzz"])
+        self.assertIn("50.0%", lines[2])
+        self.assertIn("1,234", lines[-1])
+
+    def test_export_report(self):
+        instrument.enable()
+        instrument.count("entries", 3)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = instrument.export_report(os.path.join(temp_dir, "profile.json"))
+            with open(path, encoding='utf-8') as f:
+                self.assertEqual(json.load(f)['counters'], {'entries': 3})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import json
+import tempfile
+import unittest
+import pyradox
+from read_with_pyradox import convert_dates, get_types_path, load_json_file, save_to_json
+
+SAMPLE_SAVE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "SOV save file.txt")
+
+def time_paths(value, path=()):
+    """Paths of every Time in loaded data."""
+    if isinstance(value, pyradox.Time):
+        yield path
+    elif isinstance(value, dict):
+        for key, subvalue in value.items():
+            yield from time_paths(subvalue, path + (key,))
+    elif isinstance(value, list):
+        for index, subvalue in enumerate(value):
+            yield from time_paths(subvalue, path + (index,))
+
+class TestJsonExport(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.tree = pyradox.parse_file(SAMPLE_SAVE, game='HoI4', path_relative_to_game=False)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_sidecar_round_trip(self):
+        """Test that the type sidecar brings back the same dates, quoted and nested, as the date pattern."""
+        export_path = os.path.join(self.temp_dir.name, "save.json")
+        self.assertTrue(save_to_json(self.tree, export_path))
+        self.assertTrue(os.path.exists(get_types_path(export_path)))
+
+        with open(export_path, encoding='utf-8') as f:
+            expected = sorted(time_paths(convert_dates(json.load(f))))
+        self.assertGreater(len(expected), 50)
+        self.assertTrue(any(len(path) > 3 for path in expected))
+        self.assertEqual(sorted(time_paths(load_json_file(export_path))), expected)
+        self.assertEqual(sorted(time_paths(load_json_file(export_path, lazy=True).to_python())), expected)
+
+    def test_dict_export(self):
+        """Test that dictionaries, whose dates are already strings, get no sidecar and fall back to the date pattern."""
+        export_path = os.path.join(self.temp_dir.name, "save.json")
+        save_to_json(self.tree, export_path)
+        self.assertTrue(save_to_json(self.tree.to_python(), export_path))
+        self.assertFalse(os.path.exists(get_types_path(export_path)))
+        self.assertGreater(len(list(time_paths(load_json_file(export_path)))), 50)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import os
+import shutil
+import tempfile
+import unittest
+import threading
+import concurrent.futures
+from unittest import mock
+from src.utils.binary_decoder import encode_text
+from src.utils.melt_cache import MeltCache, shared_melt_cache
+from src.utils.melter import melt_save_file
+
+SAVE_TEXT = """date=1939.11.7.1
+player="SOV"
+"""
+
+class TestMeltCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.temp_dir.name, "cache")
+        self.save_path = os.path.join(self.temp_dir.name, "autosave.hoi4")
+        with open(self.save_path, 'wb') as f:
+            f.write(encode_text(SAVE_TEXT))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_melts_each_save_once(self):
+        """Test that copies of a save and repeated reads share one melt and one buffer."""
+        copy_path = os.path.join(self.temp_dir.name, "copy.hoi4")
+        shutil.copy(self.save_path, copy_path)
+
+        cache = MeltCache(self.cache_dir)
+        melted_path = cache.melted_path(self.save_path)
+        self.assertEqual(cache.melted_path(copy_path), melted_path)
+        self.assertEqual((cache.melts, cache.hits), (1, 1))
+
+        text = cache.read_text(self.save_path)
+        self.assertIn('player="SOV"', text)
+        self.assertIs(cache.read_text(copy_path), text)
+        self.assertEqual(cache.melts, 1)
+
+    def test_persists_across_instances(self):
+        """Test that a new cache reuses melts from an earlier run."""
+        melted_path = MeltCache(self.cache_dir).melted_path(self.save_path)
+        cache = MeltCache(self.cache_dir)
+        self.assertEqual(cache.melted_path(self.save_path), melted_path)
+        self.assertEqual((cache.melts, cache.hits), (0, 1))
+
+    def test_compressed_cache(self):
+        """Test storing melts compressed and reusing them from an uncompressed cache."""
+        cache = MeltCache(self.cache_dir, compression='gzip')
+        melted_path = cache.melted_path(self.save_path)
+        self.assertTrue(melted_path.endswith(".txt.gz"))
+        self.assertIn('player="SOV"', cache.read_text(self.save_path))
+
+        cache = MeltCache(self.cache_dir)
+        self.assertEqual(cache.melted_path(self.save_path), melted_path)
+        self.assertEqual(cache.melts, 0)
+
+    def test_text_save(self):
+        """Test that text saves are read in place without melting."""
+        text_path = os.path.join(self.temp_dir.name, "melted.txt")
+        with open(text_path, 'w', encoding='utf-8') as f:
+            f.write(SAVE_TEXT)
+        cache = MeltCache(self.cache_dir)
+        self.assertEqual(cache.melted_path(text_path), text_path)
+        self.assertEqual(cache.read_text(text_path), SAVE_TEXT)
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
+    def test_melts_other_saves_concurrently(self):
+        """Test that a slow melt only holds up callers waiting for the same save."""
+        other_path = os.path.join(self.temp_dir.name, "other.hoi4")
+        with open(other_path, 'wb') as f:
+            f.write(encode_text(SAVE_TEXT.replace("SOV", "GER")))
+        cache = MeltCache(self.cache_dir)
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_melt(file_path, output_path, compression=None):
+            if file_path == self.save_path:
+                started.set()
+                release.wait(5)
+            return melt_save_file(file_path, output_path, compression=compression)
+
+        with mock.patch("src.utils.melt_cache.melt_save_file", side_effect=slow_melt):
+            with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
+                slow = [executor.submit(cache.melted_path, self.save_path) for _ in range(2)]
+                self.assertTrue(started.wait(5))
+                fast = executor.submit(cache.read_text, other_path)
+                self.assertIn('player="GER"', fast.result(timeout=5))
+                self.assertFalse(any(future.done() for future in slow))
+                release.set()
+                self.assertEqual(len({future.result(timeout=5) for future in slow}), 1)
+        self.assertEqual((cache.melts, cache.hits), (2, 1))
+
+    def test_shared_cache(self):
+        cache = shared_melt_cache(self.cache_dir)
+        self.assertIs(shared_melt_cache(os.path.join(self.cache_dir, ".")), cache)
+        self.assertEqual(cache.max_buffers, 0)
+        self.assertIsNot(shared_melt_cache(self.cache_dir, "gzip"), cache)
+
+if __name__ == '__main__':
+    unittest.main()
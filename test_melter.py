@@ -0,0 +1,152 @@
+import os
+import sys
+import stat
+import tempfile
+import unittest
+import pyradox
+from src.utils.binary_decoder import encode_text
+from src.utils.melt_backends import ExecutableBackend, FixtureBackend
+from src.utils.melter import (
+    iter_melt_executable_lines, parse_save_stream, iter_melt_files, summarize_melt_results, melt_multiple_files
+)
+
+SAVE_TEXT = """date=1939.11.7.1
+player="SOV"
+countries={
+    SOV={
+        production={ industrial_organisations={ SOV_tula_arms_plant_organization={ funds=7711.91 size=13 } } }
+    }
+}
+"""
+
+class TestMeltStreaming(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.expected = pyradox.parse(SAVE_TEXT).to_python()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_file(self, name, content, mode='w'):
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, mode) as f:
+            f.write(content)
+        return path
+
+    def test_binary_save_with_tee(self):
+        """Test parsing a binary save on the fly while keeping the melted text."""
+        save_path = self.write_file("autosave.hoi4", encode_text(SAVE_TEXT), 'wb')
+        tee_path = os.path.join(self.temp_dir.name, "melted", "autosave.hoi4.txt")
+
+        tree = parse_save_stream(save_path, tee_path=tee_path)
+        self.assertEqual(tree.to_python(), self.expected)
+        self.assertEqual(pyradox.parse_file(tee_path, game='HoI4', path_relative_to_game=False).to_python(),
+                         self.expected)
+
+    def test_text_save(self):
+        """Test that text saves are parsed directly."""
+        save_path = self.write_file("autosave.txt", SAVE_TEXT)
+        self.assertEqual(parse_save_stream(save_path).to_python(), self.expected)
+
+    @unittest.skipIf(sys.platform == 'win32', "uses a shell script in place of melt.exe")
+    def test_melt_executable_pipe(self):
+        """Test streaming a melter's stdout into the parser, with a tee."""
+        text_path = self.write_file("melted_source.txt", SAVE_TEXT)
+        # Stands in for melt.exe: prints the already melted text given as the last argument
+        fake_melt = self.write_file("fake_melt.sh", '#!/bin/sh\ncat "$5"\n')
+        os.chmod(fake_melt, os.stat(fake_melt).st_mode | stat.S_IEXEC)
+
+        with open(os.path.join(self.temp_dir.name, "tee.txt"), 'w', encoding='utf-8') as tee:
+            lines = iter_melt_executable_lines(text_path, fake_melt, tee)
+            tree = pyradox.parse_stream(lines, text_path)
+        self.assertEqual(tree.to_python(), self.expected)
+        with open(os.path.join(self.temp_dir.name, "tee.txt"), encoding='utf-8') as f:
+            self.assertEqual(f.read(), SAVE_TEXT)
+
+    @unittest.skipIf(sys.platform == 'win32', "uses a shell script in place of melt.exe")
+    def test_melt_executable_error(self):
+        """Test that a failing melter raises instead of returning a partial tree."""
+        fake_melt = self.write_file("failing_melt.sh", '#!/bin/sh\necho broken >&2\nexit 3\n')
+        os.chmod(fake_melt, os.stat(fake_melt).st_mode | stat.S_IEXEC)
+        with self.assertRaises(RuntimeError):
+            list(iter_melt_executable_lines("missing.hoi4", fake_melt))
+
+    @unittest.skipIf(sys.platform == 'win32', "uses a shell script in place of melt.exe")
+    def test_executable_backend(self):
+        """Test melting to a file through a melter executable, with stage timings."""
+        text_path = self.write_file("melted_source.txt", SAVE_TEXT)
+        fake_melt = self.write_file("fake_melt.sh", '#!/bin/sh\ncat "$5"\n')
+        os.chmod(fake_melt, os.stat(fake_melt).st_mode | stat.S_IEXEC)
+        output_path = os.path.join(self.temp_dir.name, "out", "melted.txt")
+
+        timings = ExecutableBackend(fake_melt, copy_input=True).melt(text_path, output_path)
+        self.assertEqual(set(timings), {"copy", "spawn", "decode", "write"})
+        with open(output_path, encoding='utf-8') as f:
+            self.assertEqual(f.read(), SAVE_TEXT)
+
+        failing_melt = self.write_file("failing_melt.sh", '#!/bin/sh\necho partial\nexit 3\n')
+        os.chmod(failing_melt, os.stat(failing_melt).st_mode | stat.S_IEXEC)
+        with self.assertRaises(RuntimeError):
+            ExecutableBackend(failing_melt).melt(text_path, output_path)
+        self.assertFalse(os.path.exists(output_path))
+
+    def test_fixture_backend_batch(self):
+        """Test a batch through the stand-in melter, which melts every save to a fixture."""
+        fixture_path = self.write_file("fixture.txt", SAVE_TEXT)
+        save_paths = [self.write_file(f"autosave_{i}.hoi4", encode_text(SAVE_TEXT), 'wb') for i in range(4)]
+        backend = FixtureBackend(fixture_path)
+
+        results = list(iter_melt_files(save_paths, os.path.join(self.temp_dir.name, "out"), jobs=4, backend=backend))
+        self.assertEqual(sorted(result.file_path for result in results), save_paths)
+        for result in results:
+            self.assertEqual(result.status, "melted")
+            self.assertEqual(set(result.stages), {"copy", "decode", "write"})
+        self.assertEqual(set(summarize_melt_results(results, 1.0)['stages']), {"copy", "decode", "write"})
+        self.assertEqual(parse_save_stream(save_paths[0], backend=backend).to_python(), self.expected)
+
+    def test_batch_melt(self):
+        """Test melting a batch concurrently, skipping text saves and reporting failures."""
+        binary_paths = [self.write_file(f"autosave_{i}.hoi4", encode_text(SAVE_TEXT), 'wb') for i in range(3)]
+        text_path = self.write_file("melted.hoi4", SAVE_TEXT)
+        broken_path = self.write_file("compressed.hoi4", b"PK\x03\x04rest", 'wb')
+        output_dir = os.path.join(self.temp_dir.name, "out")
+        os.makedirs(output_dir)
+
+        results = list(iter_melt_files(binary_paths + [text_path, broken_path], output_dir, jobs=2))
+        by_path = {result.file_path: result for result in results}
+        self.assertEqual(results[0].file_path, text_path)
+        self.assertEqual(by_path[text_path].status, "skipped")
+        self.assertEqual(by_path[broken_path].status, "failed")
+        for path in binary_paths:
+            self.assertEqual(by_path[path].status, "melted")
+            self.assertEqual(by_path[path].output_path, os.path.join(output_dir, os.path.basename(path) + ".txt"))
+            self.assertEqual(pyradox.parse_file(by_path[path].output_path, game='HoI4',
+                                                path_relative_to_game=False).to_python(), self.expected)
+
+        summary = summarize_melt_results(results, 1.0)
+        self.assertEqual((summary['files'], summary['melted'], summary['skipped'], summary['failed']), (5, 3, 1, 1))
+        self.assertEqual(summary['failures'], [by_path[broken_path]])
+        self.assertEqual(summary['melted_bytes'], sum(os.path.getsize(path) for path in binary_paths))
+
+        self.assertEqual(melt_multiple_files([text_path, broken_path], output_dir, jobs=1),
+                         {text_path: (True, text_path), broken_path: (False, broken_path)})
+
+    def test_batch_same_names(self):
+        """Test that saves with the same name from different campaigns are melted to different files."""
+        texts = {}
+        for campaign, text in (("campaign_a", SAVE_TEXT), ("campaign_b", SAVE_TEXT.replace("1939", "1941"))):
+            os.makedirs(os.path.join(self.temp_dir.name, campaign))
+            texts[self.write_file(os.path.join(campaign, "autosave.hoi4"), encode_text(text), 'wb')] = text
+        output_dir = os.path.join(self.temp_dir.name, "out")
+
+        # The same save listed twice gets its own file as well
+        results = list(iter_melt_files(list(texts) * 2, output_dir, jobs=4))
+        self.assertEqual(len({result.output_path for result in results}), 4)
+        for result in results:
+            expected = pyradox.parse(texts[result.file_path]).to_python()
+            self.assertEqual(pyradox.parse_file(result.output_path, game='HoI4',
+                                                path_relative_to_game=False).to_python(), expected)
+
+if __name__ == '__main__':
+    unittest.main()
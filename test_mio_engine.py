@@ -0,0 +1,105 @@
+import os
+import pickle
+import tempfile
+import unittest
+from unittest import mock
+from src.utils.binary_decoder import encode_text
+from src.utils.equipment_index import EquipmentIndex
+from src.utils.mio_engine import (
+    default_save_extractors, iter_process_saves, merge_save_result, org_display_name, save_date_key, sort_by_save_date
+)
+from test_extractors import SAVE_TEXT
+
+class TestMioEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.melt_dir = os.path.join(self.temp_dir.name, "melted")
+        self.results_dir = os.path.join(self.temp_dir.name, "results")
+        os.makedirs(self.results_dir)
+        self.save_paths = []
+        for index, date in enumerate(["1940.3.1.1", "1939.11.7.1", "1941.1.1.1"]):
+            save_path = os.path.join(self.temp_dir.name, f"autosave_{index}.txt")
+            with open(save_path, 'w', encoding='utf-8') as f:
+                f.write(SAVE_TEXT.replace("1939.11.7.1", date, 1))
+            self.save_paths.append(save_path)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_process_pool(self):
+        """Test that saves processed in worker processes come back as plain data, sortable by save date."""
+        results = list(iter_process_saves(self.save_paths, self.melt_dir, self.results_dir,
+                                          extractors=default_save_extractors(["SOV"]), jobs=2))
+        self.assertEqual(sorted(result.file_path for result in results), sorted(self.save_paths))
+        self.assertTrue(all(result.error is None for result in results))
+        self.assertEqual([result.save_date for result in sort_by_save_date(results)],
+                         ["1939.11.7.1", "1940.3.1.1", "1941.1.1.1"])
+        for result in results:
+            self.assertEqual(result.equipment, {'infantry_equipment_1': (4410, 70)})
+            self.assertEqual([org['name'] for org in result.organisations], ['SOV_tula_arms_plant_organization'])
+            self.assertIsNone(result.cached_entries)
+
+    def test_results_cache(self):
+        """Test that cached entries are loaded in place of the organisation scan."""
+        result = next(iter_process_saves(self.save_paths[:1], self.melt_dir, self.results_dir, jobs=1))
+        with open(result.cache_path, 'wb') as f:
+            pickle.dump([{'org_name': 'Tula Arms Plant'}], f)
+        cached = next(iter_process_saves(self.save_paths[:1], self.melt_dir, self.results_dir, jobs=1))
+        self.assertEqual(cached.cached_entries, [{'org_name': 'Tula Arms Plant'}])
+        self.assertIsNone(cached.organisations)
+        self.assertEqual(cached.equipment, result.equipment)
+
+        # Runs with other tags or extractors have their own cache entries
+        for extractors in (default_save_extractors(["GER"]), default_save_extractors()[:2]):
+            other = next(iter_process_saves(self.save_paths[:1], self.melt_dir, self.results_dir,
+                                            extractors=extractors, jobs=1))
+            self.assertNotEqual(other.cache_path, result.cache_path)
+            self.assertIsNone(other.cached_entries)
+        same = next(iter_process_saves(self.save_paths[:1], self.melt_dir, self.results_dir,
+                                       extractors=default_save_extractors(["SOV", "GER"]), jobs=1))
+        self.assertEqual(same.cache_path, next(iter_process_saves(
+            self.save_paths[:1], self.melt_dir, self.results_dir,
+            extractors=default_save_extractors(("GER", "SOV")), jobs=1)).cache_path)
+
+    def test_merge_save_result(self):
+        """Test that results become named production entries, written to and then read from the results cache."""
+        index = EquipmentIndex()
+        result = next(iter_process_saves(self.save_paths[:1], self.melt_dir, self.results_dir, jobs=1))
+        merged = merge_save_result(result, index, ["SOV"])
+        self.assertFalse(merged.from_cache)
+        self.assertEqual(merged.save_date, "1940.3.1.1")
+        self.assertEqual(merged.entries[0], {
+            "org_name": "Tula Arms Plant", "org_key": "SOV_tula_arms_plant_organization", "tag": "SOV",
+            "equipment_id": "4410", "equipment_type": "70", "equipment_name": "infantry_equipment_1",
+            "date": "1939.11.7.1", "units": "100", "is_first_entry": True,
+        })
+        self.assertEqual(merge_save_result(result, index, ["GER"]).entries, [])
+
+        cached = next(iter_process_saves(self.save_paths[:1], self.melt_dir, self.results_dir, jobs=1))
+        merged_cached = merge_save_result(cached, EquipmentIndex(), ["SOV"])
+        self.assertTrue(merged_cached.from_cache)
+        self.assertEqual(merged_cached.entries, merged.entries)
+        self.assertEqual(merge_save_result(cached, EquipmentIndex(), ["GER"]).entries, [])
+        self.assertEqual(org_display_name("SOV_tula_arms_plant_organization", "SOV"), "Tula Arms Plant")
+
+    def test_errors(self):
+        """Test that a failing save is reported rather than raised."""
+        missing_path = os.path.join(self.temp_dir.name, "missing.hoi4")
+        result = next(iter_process_saves([missing_path], self.melt_dir, jobs=1))
+        self.assertIsNotNone(result.error)
+        with self.assertRaises(RuntimeError):
+            merge_save_result(result, EquipmentIndex())
+        self.assertLess(save_date_key("1939.1.1.1"), save_date_key(None))
+
+        # A binary save that fails to melt is an error, not garbage decoded as text
+        binary_path = os.path.join(self.temp_dir.name, "autosave.hoi4")
+        with open(binary_path, 'wb') as f:
+            f.write(encode_text(SAVE_TEXT))
+        with mock.patch("src.utils.melt_cache.melt_save_file", return_value=(False, binary_path)):
+            result = next(iter_process_saves([binary_path], self.melt_dir, jobs=1))
+        self.assertIn("Couldn't melt", result.error)
+        self.assertEqual(result.equipment, {})
+
+if __name__ == '__main__':
+    unittest.main()
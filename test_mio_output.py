@@ -0,0 +1,119 @@
+import os
+import csv
+import json
+import sqlite3
+import tempfile
+import unittest
+from src.utils.mio_output import ROW_FIELDS, RunManifest, entry_rows, guess_format, open_writer
+
+ENTRIES = [
+    {"org_name": "Tula Arms Plant", "org_key": "SOV_tula_arms_plant_organization", "tag": "SOV",
+     "equipment_id": "4410", "equipment_type": "70", "equipment_name": "infantry_equipment_1",
+     "date": "1939.11.7.1", "units": "100", "is_first_entry": True},
+    {"org_name": "Tula Arms Plant", "org_key": "SOV_tula_arms_plant_organization", "tag": "SOV",
+     "equipment_id": "4410", "equipment_type": "70", "equipment_name": "infantry_equipment_1",
+     "date": "1939.12.1.1", "units": "50"},
+]
+
+class TestMioOutput(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.save_path = os.path.join(self.temp_dir.name, "autosave.hoi4")
+        with open(self.save_path, 'w', encoding='utf-8') as f:
+            f.write("date=1939.11.7.1")
+        self.rows = entry_rows(self.save_path, "1939.11.7.1", ENTRIES)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def output(self, name):
+        return os.path.join(self.temp_dir.name, name)
+
+    def test_csv_appends_below_one_header(self):
+        path = self.output("out.csv")
+        for _ in range(2):
+            with open_writer(path) as writer:
+                writer.write_save(self.save_path, self.rows)
+        with open(path, newline='', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(tuple(rows[0]), ROW_FIELDS)
+        self.assertEqual(rows[1]["units"], "50")
+
+        with open_writer(path, append=False) as writer:
+            writer.write_save(self.save_path, self.rows[:1])
+        with open(path, newline='', encoding='utf-8') as f:
+            self.assertEqual(len(list(csv.DictReader(f))), 1)
+
+    def test_ndjson(self):
+        path = self.output("out.jsonl")
+        with open_writer(path) as writer:
+            writer.write_save(self.save_path, self.rows)
+        with open(path, encoding='utf-8') as f:
+            rows = [json.loads(line) for line in f]
+        self.assertEqual(rows, self.rows)
+
+    def test_sqlite_replaces_rows_of_a_save(self):
+        path = self.output("out.db")
+        for _ in range(2):
+            with open_writer(path) as writer:
+                writer.write_save(self.save_path, self.rows)
+        conn = sqlite3.connect(path)
+        try:
+            rows = conn.execute("SELECT organisation, units FROM production ORDER BY date").fetchall()
+        finally:
+            conn.close()
+        self.assertEqual(rows, [("Tula Arms Plant", "100"), ("Tula Arms Plant", "50")])
+
+    def test_guess_format(self):
+        self.assertEqual(guess_format("out.NDJSON"), "ndjson")
+        self.assertEqual(guess_format("out.sqlite"), "sqlite")
+        with self.assertRaises(ValueError):
+            guess_format("out.txt")
+
+    def test_manifest_resume(self):
+        path = self.output("out.manifest.jsonl")
+        with RunManifest(path) as manifest:
+            self.assertFalse(manifest.is_done(self.save_path))
+            manifest.mark_done(self.save_path, rows=2)
+        # A line cut short by an interrupted run is ignored
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write('{"path": "autosave_2')
+        with RunManifest(path) as manifest:
+            self.assertTrue(manifest.is_done(self.save_path))
+        with RunManifest(path, resume=False) as manifest:
+            self.assertFalse(manifest.is_done(self.save_path))
+
+    def test_manifest_notices_changed_saves(self):
+        path = self.output("out.manifest.jsonl")
+        with RunManifest(path) as manifest:
+            manifest.mark_done(self.save_path)
+        with open(self.save_path, 'a', encoding='utf-8') as f:
+            f.write("\nplayer=\"SOV\"")
+        with RunManifest(path) as manifest:
+            self.assertFalse(manifest.is_done(self.save_path))
+
+    def test_manifest_keeps_reads(self):
+        path = self.output("out.manifest.jsonl")
+        result = {"file_path": self.save_path, "date": "1936.1.1"}
+        with RunManifest(path) as manifest:
+            self.assertTrue(manifest.mark_read(self.save_path, result))
+        with RunManifest(path) as manifest:
+            self.assertEqual(manifest.read_result(self.save_path), result)
+            self.assertFalse(manifest.is_done(self.save_path))
+            manifest.mark_done(self.save_path)
+            self.assertEqual(os.listdir(manifest.reads_dir), [])
+        with RunManifest(path) as manifest:
+            self.assertIsNone(manifest.read_result(self.save_path))
+
+        # A save changed since it was read is read again
+        with RunManifest(path, resume=False) as manifest:
+            manifest.mark_read(self.save_path, result)
+        with open(self.save_path, 'a', encoding='utf-8') as f:
+            f.write("\nplayer=\"SOV\"")
+        with RunManifest(path) as manifest:
+            self.assertIsNone(manifest.read_result(self.save_path))
+
+if __name__ == '__main__':
+    unittest.main()
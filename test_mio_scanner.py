@@ -0,0 +1,84 @@
+import os
+import tempfile
+import unittest
+import pyradox
+from src.utils.compression import open_text
+from src.utils.mio_scanner import scan_organisations, scan_file
+from src.utils.save_extract import extract_from_tree
+
+SAMPLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "SOV save file.txt")
+
+SAVE_TEXT = """date=1939.11.7.1
+player="SOV"
+states={ 1={ name="Braces { in } strings" owner="FRA" } }
+countries={
+    SOV={
+        production={
+            industrial_organisations={
+                SOV_tula_arms_plant_organization={
+                    id={ id=58 type=79 }
+                    name="Tula {arms}"
+                    funds=7711.91
+                    size=13
+                    research_bonus=0.05
+                    unlocked={ trait="mio_trait_a" }
+                    queued_trait={ trait="mio_trait_b" }
+                    allowed_policies={ policy_a policy_b }
+                    history={
+                        equipment={ id=4410 type=70 }
+                        data={ date="1939.11.7.1" units=100 }
+                    }
+                    history={
+                        equipment={ id=4411 type=70 }
+                        data={ units=5 }
+                    }
+                }
+            }
+        }
+    }
+    GER={
+        production={
+            industrial_organisations={
+                generic_infantry_organization={ id={ id=3 type=79 } funds=10.5 size=2 }
+            }
+        }
+    }
+}
+"""
+
+class TestMioScanner(unittest.TestCase):
+
+    def test_matches_parser(self):
+        """Test that the scanner finds the same organisations as extraction from a parsed save."""
+        expected = extract_from_tree(pyradox.parse(SAVE_TEXT))['organisations']
+        self.assertEqual(scan_organisations(SAVE_TEXT), expected)
+        self.assertEqual([(org['tag'], org['name']) for org in expected],
+                         [('SOV', 'SOV_tula_arms_plant_organization'), ('GER', 'generic_infantry_organization')])
+        self.assertEqual(expected[0]['traits'], [('mio_trait_a', False), ('mio_trait_b', True)])
+
+    def test_tag_filter(self):
+        """Test scanning for one country."""
+        self.assertEqual([org['name'] for org in scan_organisations(SAVE_TEXT, tags=['GER'])],
+                         ['generic_infantry_organization'])
+
+    def test_sample_production_block(self):
+        """Test a production block cut out of a real save, tagged from the organisation names."""
+        with open(SAMPLE_PATH, encoding='utf-8') as f:
+            text = f.read()
+        organisations = scan_organisations(text)
+        self.assertEqual(len(organisations), 22)
+        self.assertEqual({org['tag'] for org in organisations}, {'SOV'})
+        wrapped = "countries={ SOV={ " + text + " } }"
+        self.assertEqual(scan_organisations(wrapped),
+                         extract_from_tree(pyradox.parse(wrapped))['organisations'])
+
+    def test_compressed_file(self):
+        """Test scanning a compressed melted file."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "melted.txt.gz")
+            with open_text(path, 'w') as f:
+                f.write(SAVE_TEXT)
+            self.assertEqual(scan_file(path), scan_organisations(SAVE_TEXT))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import os
+import json
+import tempfile
+import unittest
+import pyradox
+from src.utils.save_sections import (
+    GUI_PATHS, extract_sections, iter_load_sections, load_cached_sections, read_sections, sections_path,
+    write_cached_sections
+)
+from test_mio_scanner import SAVE_TEXT
+
+EQUIPMENTS_TEXT = """
+equipments={
+    infantry_equipment_1={ id={ id=4410 type=70 } name="Infantry Equipment I" }
+    artillery_equipment_1={ id={ id=4411 type=70 } }
+}
+game_unique_id="abc"
+"""
+
+def full_conversion(text):
+    """The GUI sections as picked out of the fully converted save."""
+    data = pyradox.parse(text).to_python()
+    sections = {key: data[key] for key in ("date", "player", "equipments") if key in data}
+    countries = {}
+    for tag, country in data.get("countries", {}).items():
+        orgs = country.get("production", {}).get("industrial_organisations")
+        if orgs is not None:
+            countries[tag] = {"production": {"industrial_organisations": orgs}}
+    if countries:
+        sections["countries"] = countries
+    return sections
+
+class TestSaveSections(unittest.TestCase):
+
+    def test_matches_full_conversion(self):
+        text = SAVE_TEXT + EQUIPMENTS_TEXT
+        sections = extract_sections(text)
+        self.assertEqual(sections, full_conversion(text))
+        self.assertEqual(sections["player"], "SOV")
+        self.assertNotIn("states", sections)
+        self.assertNotIn("game_unique_id", sections)
+        self.assertEqual(extract_sections("\ufeff" + text), sections)
+
+    def test_declared_paths(self):
+        sections = extract_sections(SAVE_TEXT, [("countries", "GER", "production")])
+        self.assertEqual(list(sections["countries"]), ["GER"])
+        self.assertEqual(list(sections["countries"]["GER"]["production"]["industrial_organisations"]),
+                         ["generic_infantry_organization"])
+        # Values below the top level, next to braces inside strings
+        self.assertEqual(extract_sections(SAVE_TEXT, [("states", "*", "owner")]), {"states": {"1": {"owner": "FRA"}}})
+
+    def test_cache(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            save_path = os.path.join(temp_dir, "autosave.hoi4")
+            with open(save_path, 'w', encoding='utf-8') as f:
+                f.write(SAVE_TEXT + EQUIPMENTS_TEXT)
+            sections = read_sections(save_path)
+            cache_path = sections_path(os.path.join(temp_dir, "0123.json"))
+            self.assertTrue(cache_path.endswith("0123.sections.json"))
+            self.assertIsNone(load_cached_sections(cache_path))
+            self.assertTrue(write_cached_sections(cache_path, sections))
+            self.assertEqual(load_cached_sections(cache_path), json.loads(json.dumps(sections)))
+            # Sections extracted for other paths are not used
+            self.assertIsNone(load_cached_sections(cache_path, GUI_PATHS[:2]))
+
+    def test_iter_load_sections(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            tasks = []
+            for name in ("autosave.hoi4", "copy.hoi4"):
+                save_path = os.path.join(temp_dir, name)
+                with open(save_path, 'w', encoding='utf-8') as f:
+                    f.write(SAVE_TEXT + EQUIPMENTS_TEXT)
+                tasks.append((save_path, os.path.join(temp_dir, f"{name}.json")))
+            export_path = os.path.join(temp_dir, "export.json")
+            with open(export_path, 'w', encoding='utf-8') as f:
+                json.dump({"date": "1936.1.1.12"}, f)
+            tasks.append((export_path, None))
+            tasks.append((os.path.join(temp_dir, "missing.hoi4"), None))
+            melt_dir = os.path.join(temp_dir, "melted")
+
+            for jobs in (1, 2):
+                results = {os.path.basename(result.file_path): result
+                           for result in iter_load_sections(tasks, melt_dir, jobs=jobs)}
+                self.assertEqual(set(results), {"autosave.hoi4", "copy.hoi4", "export.json", "missing.hoi4"})
+                self.assertIsNotNone(results["missing.hoi4"].error)
+                self.assertEqual(results["export.json"].data, {"date": "1936.1.1.12"})
+                # Copies of a save have the same fingerprint, and the second run comes from the sections cache
+                self.assertEqual(results["autosave.hoi4"].fingerprint, results["copy.hoi4"].fingerprint)
+                self.assertEqual(results["autosave.hoi4"].from_cache, jobs == 2)
+                self.assertEqual(results["autosave.hoi4"].data["player"], "SOV")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+import os
+import tempfile
+import unittest
+import pyradox
+from src.utils.save_extract import snapshot_sections
+from src.utils.save_store import SaveStore, date_key, date_month
+
+def make_save(content_hash, date, units):
+    """Build an extracted save with one organisation."""
+    return {
+        'path': f"{content_hash}.hoi4",
+        'content_hash': content_hash,
+        'date': date,
+        'player': 'SOV',
+        'game_unique_id': 'campaign-1',
+        'countries': ['SOV', 'GER'],
+        'equipment': [(4410, 70, 'infantry_equipment_1')],
+        'organisations': [{
+            'tag': 'SOV',
+            'name': 'SOV_tula_arms_plant_organization',
+            'org_id': 58,
+            'funds': 7711.91,
+            'size': 13,
+            'research_bonus': 0.05,
+            'traits': [('mio_strengthend_straps_and_triggers', False)],
+            'history': [{'equipment_id': 4410, 'equipment_type': 70, 'date': '1939.11.7.1', 'units': units}],
+        }],
+    }
+
+class TestSaveStore(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.store = SaveStore(os.path.join(self.temp_dir.name, "test.db"))
+
+    def tearDown(self):
+        self.store.close()
+        self.temp_dir.cleanup()
+
+    def test_date_key(self):
+        """Test conversion of save dates to sortable keys."""
+        self.assertEqual(date_key("1940.11.1.1"), 1940110101)
+        self.assertLess(date_key("1940.2.1.1"), date_key("1940.11.1.1"))
+        self.assertEqual(date_month("1940.2.1.1"), "1940-02")
+        self.assertIsNone(date_key("Unknown Date"))
+
+    def test_ingest_is_idempotent(self):
+        """Test that ingesting the same content twice keeps one save."""
+        first = self.store.ingest(make_save("a", "1940.10.1.1", 100))
+        second = self.store.ingest(make_save("a", "1940.10.1.1", 100))
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.store.list_saves()), 1)
+
+    def test_units_per_month(self):
+        """Test units produced between consecutive saves."""
+        self.store.ingest(make_save("b", "1940.11.1.1", 250))
+        self.store.ingest(make_save("a", "1940.10.1.1", 100))
+        rows = self.store.units_per_organisation_per_month(country="SOV")
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['month'], "1940-11")
+        self.assertEqual(rows[0]['units_produced'], 150)
+
+    def test_build_compare_data(self):
+        """Test rebuilding the comparison view data from the store."""
+        save_id = self.store.ingest(make_save("a", "1940.10.1.1", 100))
+        data = self.store.build_compare_data(save_id)
+        org = data['countries']['SOV']['production']['industrial_organisations']['SOV_tula_arms_plant_organization']
+        self.assertEqual(org['history'][0]['data']['units'], 100)
+        self.assertIn('infantry_equipment_1', data['equipments'])
+
+        entries = self.store.mio_entries(save_id)
+        self.assertEqual(entries['SOV_tula_arms_plant_organization'][0]['equipment_name'], 'infantry_equipment_1')
+
+    def test_snapshots(self):
+        """Test that snapshots are stored as deltas and rebuilt exactly."""
+        texts = [
+            'date=1940.10.1.1 player="SOV" flags={ a=1 } history={ units=100 }',
+            'date=1940.11.1.1 player="SOV" flags={ a=1 } history={ units=250 }',
+            'date=1940.12.1.1 player="SOV" flags={ a=1 } history={ units=250 } new_section=yes',
+        ]
+        save_ids = []
+        for i, text in enumerate(texts):
+            save = make_save(str(i), f"1940.{10 + i}.1.1", 100)
+            save['sections'] = snapshot_sections(pyradox.parse(text))
+            save_ids.append(self.store.ingest(save))
+
+        kinds = [row['kind'] for row in self.store.conn.execute(
+            "SELECT kind FROM snapshot_sections WHERE save_id = ? ORDER BY seq", (save_ids[2],))]
+        self.assertEqual(kinds, ['patch', 'same', 'same', 'same', 'full'])
+
+        # A new store instance has no cached head and rebuilds it from the deltas
+        reopened = SaveStore(self.store.db_path)
+        self.assertEqual(reopened.load_snapshot(save_ids[1]),
+                         {'date': '1940.11.1.1', 'player': 'SOV', 'flags': {'a': 1}, 'history': {'units': 250}})
+        self.assertEqual(reopened.load_snapshot(save_ids[2], ['history', 'new_section']),
+                         {'history': {'units': 250}, 'new_section': True})
+        history = [value for save, value in reopened.section_history('history', 'campaign-1')]
+        self.assertEqual(history, [{'units': 100}, {'units': 250}, {'units': 250}])
+        reopened.close()
+
+    def test_snapshot_order_and_atomicity(self):
+        """Test that snapshot parents follow the game date and that a failed snapshot stores nothing."""
+        late = make_save("late", "1941.1.1.1", 100)
+        late['sections'] = [('flag', '1')]
+        early = make_save("early", "1940.1.1.1", 100)
+        early['sections'] = [('flag', 'true')]
+        late_id = self.store.ingest(late)
+        early_id = self.store.ingest(early)
+        parent = self.store.conn.execute("SELECT parent_save_id FROM snapshots WHERE save_id = ?", (early_id,)).fetchone()
+        self.assertIsNone(parent[0])
+        middle = make_save("middle", "1940.6.1.1", 100)
+        middle['sections'] = [('flag', '1')]
+        middle_id = self.store.ingest(middle)
+        parent = self.store.conn.execute("SELECT parent_save_id FROM snapshots WHERE save_id = ?", (middle_id,)).fetchone()
+        self.assertEqual(parent[0], early_id)
+        # true -> 1 is a change, even though True == 1
+        self.assertIs(self.store.load_snapshot(middle_id)['flag'], 1)
+        with SaveStore(self.store.db_path) as reopened:
+            self.assertIs(reopened.load_snapshot(late_id)['flag'], 1)
+
+        broken = make_save("broken", "1941.2.1.1", 100)
+        broken['sections'] = [('flag', 'not json')]
+        with self.assertRaises(ValueError):
+            self.store.ingest(broken)
+        self.assertFalse(self.store.has_save("broken"))
+
+    def test_section_history_out_of_order(self):
+        """Test that section history applies each delta to its own parent, in game date order."""
+        for content_hash, date, value in (("a", "1940.1.1.1", '{"u":1}'), ("c", "1940.3.1.1", '{"u":1,"y":5}'),
+                                          ("b", "1940.2.1.1", '{"u":1}')):
+            save = make_save(content_hash, date, 100)
+            save['sections'] = [('production', value)]
+            self.store.ingest(save)
+        history = [(save['save_date'], value) for save, value in self.store.section_history('production', 'campaign-1')]
+        self.assertEqual(history, [("1940.1.1.1", {'u': 1}), ("1940.2.1.1", {'u': 1}), ("1940.3.1.1", {'u': 1, 'y': 5})])
+        for save in self.store.list_saves('campaign-1'):
+            self.assertEqual(self.store.load_snapshot(save['id'])['production'], dict(history)[save['save_date']])
+
+if __name__ == '__main__':
+    unittest.main()
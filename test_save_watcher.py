@@ -0,0 +1,86 @@
+import os
+import time
+import tempfile
+import unittest
+import concurrent.futures
+from unittest import mock
+from src.utils.save_store import SaveStore
+from src.utils.save_files import file_signature
+from src.utils.save_watcher import SaveWatcher
+from test_mio_scanner import SAVE_TEXT
+
+class TestSaveWatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.store = SaveStore(os.path.join(self.temp_dir.name, "test.db"))
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+        self.ingested = []
+        self.watcher = SaveWatcher(self.temp_dir.name, on_ingested=lambda save_id, result: self.ingested.append(result))
+
+    def tearDown(self):
+        self.executor.shutdown()
+        self.store.close()
+        self.temp_dir.cleanup()
+
+    def write_save(self, name, text=SAVE_TEXT):
+        file_path = os.path.join(self.temp_dir.name, name)
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        return file_path
+
+    def poll(self, times=1):
+        """Poll, waiting for the work queued by each poll to finish."""
+        for _ in range(times):
+            self.watcher.poll_once(self.executor, self.store)
+            concurrent.futures.wait(list(self.watcher._pending))
+
+    def test_scan_waits_for_stable_signature(self):
+        file_path = self.write_save("autosave_1.hoi4")
+        self.write_save("other.hoi4")
+        self.assertEqual(self.watcher.scan(), [])
+        self.assertEqual(self.watcher.scan(), [(file_path, file_signature(file_path))])
+
+        # A save that is still being written starts over
+        with open(file_path, 'a', encoding='utf-8') as f:
+            f.write("\n")
+        os.utime(file_path, (time.time() + 10, time.time() + 10))
+        self.assertEqual(self.watcher.scan(), [])
+        self.assertEqual(len(self.watcher.scan()), 1)
+
+    def test_ingests_once_per_content(self):
+        self.write_save("autosave_1.hoi4")
+        self.write_save("autosave_2.hoi4")
+        self.poll(4)
+        self.assertEqual(len(self.ingested), 1)
+        self.assertEqual(len(self.store.list_saves()), 1)
+        self.assertEqual(self.watcher._in_flight_hashes, set())
+        # Both files are handled, so nothing is queued again
+        self.poll(2)
+        self.assertEqual(len(self.ingested), 1)
+        self.assertEqual(self.watcher._pending, {})
+
+    def test_retries_failed_extract(self):
+        self.write_save("autosave_1.hoi4")
+        with mock.patch("src.utils.save_watcher.extract_save", side_effect=ValueError("truncated save")):
+            self.poll(4)
+        self.assertEqual(self.ingested, [])
+        self.assertEqual(self.watcher._in_flight_hashes, set())
+
+        # A copy with the same content is not skipped, and the failed save is retried without changing
+        self.write_save("autosave_2.hoi4")
+        self.poll(4)
+        self.assertEqual(len(self.ingested), 1)
+        self.assertEqual(len(self.store.list_saves()), 1)
+
+    def test_retries_failed_ingest(self):
+        self.write_save("autosave_1.hoi4")
+        with mock.patch.object(self.store, "ingest", side_effect=RuntimeError("database is locked")):
+            self.poll(4)
+        self.assertEqual(self.ingested, [])
+        self.assertEqual(self.watcher._in_flight_hashes, set())
+        self.poll(3)
+        self.assertEqual(len(self.ingested), 1)
+
+if __name__ == '__main__':
+    unittest.main()
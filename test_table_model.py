@@ -0,0 +1,93 @@
+import unittest
+from src.utils.table_model import TableModel
+
+ROWS = [
+    ("SOV_tula_arms_plant_organization", "SOV", "1939.11.7.1", "infantry_equipment_1", 100),
+    ("GER_mauser_organization", "GER", "1939.10.1.1", "infantry_equipment_1", 20),
+    ("SOV_kirov_organization", "sov", "1940.1.1.1", "light_tank_equipment_1", 5),
+]
+
+class TestTableModel(unittest.TestCase):
+
+    def setUp(self):
+        self.model = TableModel(["Organization", "Country", "Date", "Equipment", "Amount"])
+        self.model.extend(ROWS)
+
+    def test_rows(self):
+        """Test reading windows of rows."""
+        self.assertEqual(len(self.model), 3)
+        self.assertEqual(self.model.rows(1, 2), [ROWS[1]])
+        self.assertEqual(self.model.row(2), ROWS[2])
+        self.assertEqual(self.model.column_values("Amount"), [100, 20, 5])
+
+    def test_sort(self):
+        """Test numeric and text sorting, and restoring insertion order."""
+        self.model.sort("Amount")
+        self.assertEqual(self.model.column_values("Amount"), [5, 20, 100])
+        self.model.sort("Organization", reverse=True)
+        self.assertEqual(self.model.row(0), ROWS[0])
+        self.model.sort(None)
+        self.assertEqual(self.model.rows(), ROWS)
+
+    def test_filter(self):
+        """Test equality and text filters, and that appended rows respect them."""
+        self.model.filter_equals("Country", "SOV", key=str.upper)
+        self.assertEqual(self.model.rows(), [ROWS[0], ROWS[2]])
+        self.model.filter_contains("light")
+        self.assertEqual(self.model.rows(), [ROWS[2]])
+        self.model.filter_contains("")
+        self.model.sort("Amount")
+        self.model.append(("SOV_gaz_organization", "SOV", "1940.2.1.1", "truck_equipment", 1))
+        self.model.append(("ITA_organization", "ITA", "1940.2.1.1", "truck_equipment", 2))
+        self.assertEqual(self.model.column_values("Amount"), [1, 5, 100])
+        self.assertEqual(self.model.total_rows, 5)
+        self.model.filter_equals("Country", "")
+        self.assertEqual(len(self.model), 5)
+
+    def test_indexed_filters(self):
+        """Test equality and prefix filters on indexed columns, including rows added afterwards."""
+        self.model.index_column("Country", key=str.upper)
+        self.model.index_column("Organization")
+        self.model.filter_equals("Country", "sov")
+        self.assertEqual(self.model.rows(), [ROWS[0], ROWS[2]])
+        self.model.filter_prefix("Organization", "sov_K")
+        self.assertEqual(self.model.rows(), [ROWS[2]])
+        self.model.append(("SOV_kolomna_organization", "SOV", "1940.2.1.1", "artillery_equipment_1", 7))
+        self.model.append(("GER_krupp_organization", "GER", "1940.2.1.1", "artillery_equipment_1", 8))
+        self.assertEqual(self.model.column_values("Amount"), [5, 7])
+        self.model.filter_prefix("Organization", "")
+        self.model.filter_equals("Country", "GER")
+        self.assertEqual(self.model.column_values("Amount"), [20, 8])
+        self.model.filter_prefix("Equipment", "ARTILLERY")
+        self.assertEqual(self.model.column_values("Amount"), [8])
+
+    def test_batched_filters(self):
+        """Test that filters changed together rebuild the view once."""
+        self.model.index_column("Country", key=str.upper)
+        version = self.model.version
+        with self.model.filters():
+            self.model.filter_equals("Country", "SOV")
+            self.model.filter_prefix("Equipment", "light")
+            self.assertEqual(len(self.model), 3)
+        self.assertEqual(self.model.version, version + 1)
+        self.assertEqual(self.model.rows(), [ROWS[2]])
+
+    def test_clear(self):
+        """Test that clearing keeps the sort order for new rows."""
+        self.model.sort("Amount")
+        version = self.model.version
+        self.model.clear()
+        self.assertGreater(self.model.version, version)
+        self.model.extend(ROWS)
+        self.assertEqual(self.model.column_values("Amount"), [5, 20, 100])
+
+    def test_clear_indexes(self):
+        """Test that clearing empties the indexes."""
+        self.model.index_column("Country", key=str.upper)
+        self.model.clear()
+        self.model.extend(ROWS[1:])
+        self.model.filter_equals("Country", "SOV")
+        self.assertEqual(self.model.rows(), [ROWS[2]])
+
+if __name__ == '__main__':
+    unittest.main()
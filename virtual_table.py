@@ -0,0 +1,157 @@
+import tkinter as tk
+from tkinter import ttk
+from typing import Optional, Sequence
+
+from src.utils.table_model import TableModel
+
+class VirtualTable(ttk.Frame):
+    """
+    A table that only creates widgets for the rows on screen.
+
+    Rows live in a TableModel; the Treeview holds one item per visible line and
+    scrolling rewrites their values from the model. Sorting (click a heading)
+    and filtering work on the model, so tables of any length stay responsive.
+    """
+
+    # Used when the theme does not report a row height
+    DEFAULT_ROW_HEIGHT = 20
+
+    def __init__(self, parent, columns: Sequence[str], headings: Optional[Sequence[str]] = None,
+                 widths: Optional[Sequence[int]] = None, model: Optional[TableModel] = None,
+                 height: int = 20, sortable: bool = True):
+        """
+        Args:
+            parent: Parent widget
+            columns: Column names
+            headings: Heading texts (optional, defaults to the column names)
+            widths: Column widths in pixels (optional)
+            model: Model to show (optional, defaults to a new empty TableModel)
+            height: Initial number of visible rows
+            sortable: Sort by a column when its heading is clicked
+        """
+        super().__init__(parent)
+        self.columns = list(columns)
+        self.headings = list(headings) if headings else list(self.columns)
+        self.model = model or TableModel(self.columns)
+        self.sortable = sortable
+        self.first = 0
+        self.visible_rows = height
+        self._rendered_version = None
+        self._refresh_pending = False
+
+        self.tree = ttk.Treeview(self, columns=self.columns, show="headings", height=height, selectmode="browse")
+        for index, column in enumerate(self.columns):
+            command = (lambda column=column: self.toggle_sort(column)) if sortable else ""
+            self.tree.heading(column, text=self.headings[index], anchor=tk.W, command=command)
+            self.tree.column(column, anchor=tk.W, width=widths[index] if widths else 100)
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", lambda event: self.scroll(-3))
+        self.tree.bind("<Button-5>", lambda event: self.scroll(3))
+        self.tree.bind("<Prior>", lambda event: self.scroll(-self.visible_rows))
+        self.tree.bind("<Next>", lambda event: self.scroll(self.visible_rows))
+        self.tree.bind("<Home>", lambda event: self.scroll_to(0))
+        self.tree.bind("<End>", lambda event: self.scroll_to(len(self.model)))
+
+    def _row_height(self) -> int:
+        row_height = ttk.Style().lookup("Treeview", "rowheight")
+        try:
+            return int(row_height) or self.DEFAULT_ROW_HEIGHT
+        except (TypeError, ValueError):
+            return self.DEFAULT_ROW_HEIGHT
+
+    def _on_resize(self, event):
+        # The heading takes about one row
+        rows = max(1, event.height // self._row_height() - 1)
+        if rows != self.visible_rows:
+            self.visible_rows = rows
+            self._render(force=True)
+
+    def _on_mousewheel(self, event):
+        self.scroll(-3 if event.delta > 0 else 3)
+        return "break"
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == tk.MOVETO:
+            self.scroll_to(int(float(amount) * len(self.model)))
+        elif unit == tk.PAGES:
+            self.scroll(int(amount) * self.visible_rows)
+        else:
+            self.scroll(int(amount))
+
+    def scroll(self, rows: int):
+        """Scroll by a number of rows (negative scrolls up)."""
+        self.scroll_to(self.first + rows)
+
+    def scroll_to(self, first: int):
+        """Show the view from a row position on."""
+        first = max(0, min(first, len(self.model) - self.visible_rows))
+        if first != self.first:
+            self.first = first
+            self._render(force=True)
+
+    def _render(self, force: bool = False):
+        if not force and self._rendered_version == self.model.version:
+            return
+        self.first = max(0, min(self.first, len(self.model) - self.visible_rows))
+        rows = self.model.rows(self.first, self.first + self.visible_rows)
+        items = self.tree.get_children()
+        # Reuse the items on screen, only adding or removing the difference
+        for index, row in enumerate(rows):
+            values = ["" if value is None else value for value in row]
+            if index < len(items):
+                self.tree.item(items[index], values=values)
+            else:
+                self.tree.insert("", tk.END, iid=f"row{index}", values=values)
+        if len(items) > len(rows):
+            self.tree.delete(*items[len(rows):])
+
+        total = len(self.model)
+        if total:
+            self.scrollbar.set(self.first / total, min(1.0, (self.first + len(rows)) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+        self._rendered_version = self.model.version
+
+    def refresh(self):
+        """Redraw the visible rows if the model changed."""
+        self._refresh_pending = False
+        self._render()
+        self._update_headings()
+
+    def refresh_later(self):
+        """Redraw once the UI is idle; repeated calls (e.g. while rows stream in) coalesce into one redraw."""
+        if not self._refresh_pending:
+            self._refresh_pending = True
+            self.after_idle(self.refresh)
+
+    def _update_headings(self):
+        for index, column in enumerate(self.columns):
+            text = self.headings[index]
+            if column == self.model.sort_column:
+                text += " ▼" if self.model.sort_reverse else " ▲"
+            self.tree.heading(column, text=text)
+
+    def toggle_sort(self, column: str):
+        """Sort by a column, ascending first and descending on the next click."""
+        reverse = self.model.sort_column == column and not self.model.sort_reverse
+        self.model.sort(column, reverse)
+        self.refresh()
+
+    def clear(self):
+        """Remove every row."""
+        self.model.clear()
+        self.first = 0
+        self.refresh()
+
+    def selected_row(self) -> Optional[tuple]:
+        """The row of the selected line, or None."""
+        selection = self.tree.selection()
+        if not selection:
+            return None
+        position = self.first + self.tree.index(selection[0])
+        return self.model.row(position) if position < len(self.model) else None